@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmarks for the Notion scripts against the local stand-in.
+
+Runs create_page, update_page, sync-problem-to-notion.py and the create-*
+CLIs over a fixed corpus built from knowledge/ and factory/ (small, 500-block
+and 5,000-block documents) and records per case:
+- wall time
+- API requests (from the stand-in's accounting)
+- bytes sent
+- peak Python memory (tracemalloc)
+
+Results are compared with a JSON baseline; the run fails when request counts
+or latency regress beyond the tolerances.
+
+Usage:
+    # Run and compare with benchmarks/baseline.json
+    python3 benchmark.py
+
+    # Only the 500-block corpus, with 50ms simulated latency
+    python3 benchmark.py --corpus medium --latency 50
+
+    # Accept the current numbers as the new baseline
+    python3 benchmark.py --update-baseline
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+from typing import Optional, Dict, List, Any, Callable
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+
+# Keep benchmark runs away from the real cache (mirror, users, index)
+os.environ["NOTION_CACHE_DIR"] = tempfile.mkdtemp(prefix="notion-bench-")
+os.environ.setdefault("NOTION_TOKEN", "benchmark")
+# The stand-in does not rate limit; the shared limiter would only add sleeps
+os.environ["NOTION_RATE_LIMIT"] = "0"
+
+import notion_client
+from notion_client import get_notion_token, create_page, update_page, markdown_to_blocks, title_property, DATABASES
+from notion_standin import StandinServer, StandinConfig
+from notion_cli import load_script
+
+
+REPO_DIR = os.path.abspath(os.path.join(SCRIPTS_DIR, "..", ".."))
+CORPUS_DIRS = [os.path.join(REPO_DIR, "knowledge"), os.path.join(REPO_DIR, "factory")]
+CORPUS_SIZES = {"small": None, "medium": 500, "large": 5000}  # target block counts
+BASELINE_PATH = os.path.join(SCRIPTS_DIR, "benchmarks", "baseline.json")
+
+# Cases under a few hundred ms are dominated by noise; allow this much absolute slack
+LATENCY_SLACK_SECONDS = 0.25
+
+
+def run_cli(module, argv: List[str], stdin: str = None) -> str:
+    """Run a script's main() in-process with the given argv; return its stdout."""
+    stdout = io.StringIO()
+    saved_argv, saved_stdin = sys.argv, sys.stdin
+    sys.argv = [module.__file__] + argv
+    if stdin is not None:
+        sys.stdin = io.StringIO(stdin)
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+            module.main()
+    except SystemExit as e:
+        if e.code:
+            raise RuntimeError(f"{os.path.basename(module.__file__)} exited with {e.code}")
+    finally:
+        sys.argv, sys.stdin = saved_argv, saved_stdin
+    return stdout.getvalue()
+
+
+def _corpus_files() -> List[str]:
+    files = []
+    for directory in CORPUS_DIRS:
+        for root, dirs, names in os.walk(directory):
+            dirs.sort()
+            files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".md"))
+    return files
+
+
+def build_corpus(target_blocks: Optional[int]) -> str:
+    """Build a markdown document from the knowledge base.
+
+    With no target this is the first knowledge file; otherwise files are
+    concatenated (cycling if needed, demoting their H1s) and trimmed so the
+    document converts to exactly target_blocks blocks.
+    """
+    files = _corpus_files()
+    if not files:
+        raise RuntimeError(f"No markdown files found under {', '.join(CORPUS_DIRS)}")
+
+    with open(files[0], 'r') as f:
+        first = f.read()
+    if not target_blocks:
+        return first
+
+    parts = [first]
+    block_count = len(markdown_to_blocks(first))
+    index = 1
+    while block_count < target_blocks:
+        with open(files[index % len(files)], 'r') as f:
+            content = f.read().replace("\n# ", "\n## ")
+        if content.startswith("# "):
+            content = "#" + content
+        parts.append(content)
+        block_count += len(markdown_to_blocks(content))
+        index += 1
+
+    # Trim the last file so the document converts to exactly target_blocks
+    lines = "\n\n".join(parts).split("\n")
+    low, high = 0, len(lines)
+    while low < high:
+        middle = (low + high) // 2
+        if len(markdown_to_blocks("\n".join(lines[:middle]))) >= target_blocks:
+            high = middle
+        else:
+            low = middle + 1
+    return "\n".join(lines[:low])
+
+
+class Benchmark:
+    """Runs cases against an in-process stand-in server."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.server = StandinServer(config=StandinConfig(latency_ms=latency_ms)).start()
+        notion_client.API_BASE = self.server.base_url
+        self.token = get_notion_token()
+        self.workdir = tempfile.mkdtemp(prefix="notion-bench-docs-")
+
+    def close(self):
+        self.server.stop()
+
+    def measure(self, setup: Optional[Callable], action: Callable) -> Dict[str, Any]:
+        """Measure one action; setup runs first and is not counted."""
+        context = setup() if setup else None
+        self.server.stats.reset()
+        tracemalloc.start()
+        start = time.perf_counter()
+        action(context)
+        wall = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stats = self.server.stats.snapshot()
+        return {
+            "wall_seconds": round(wall, 4),
+            "requests": stats["requests"],
+            "bytes_sent": stats["bytes_in"],
+            "bytes_received": stats["bytes_out"],
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+
+    def _write_doc(self, name: str, markdown: str) -> str:
+        path = os.path.join(self.workdir, f"{name}.md")
+        with open(path, 'w') as f:
+            f.write(markdown)
+        return path
+
+    def cases(self, corpus: str, markdown: str) -> Dict[str, tuple]:
+        """(setup, action) pairs for every benchmark case of a corpus."""
+        title = f"Benchmark {corpus}"
+        path = self._write_doc(corpus, markdown)
+        properties = {"Name": title_property(title)}
+        sync = load_script("sync-problem-to-notion.py", os.path.dirname(SCRIPTS_DIR))
+
+        def new_page():
+            return create_page(self.token, DATABASES["documents"], properties, markdown_to_blocks(markdown))["id"]
+
+        def synced_page():
+            run_cli(sync, [path])
+
+        def parent():
+            return create_page(self.token, DATABASES["documents"], {"Name": title_property("Parent")})["id"]
+
+        return {
+            "create_page": (None, lambda _: create_page(self.token, DATABASES["documents"], properties, markdown_to_blocks(markdown))),
+            "update_page": (new_page, lambda page_id: update_page(self.token, page_id, properties, markdown_to_blocks(markdown), replace_blocks=True)),
+            "sync_create": (None, lambda _: run_cli(sync, [path])),
+            "sync_update": (synced_page, lambda _: run_cli(sync, [path])),
+            "create-ticket": (None, lambda _: run_cli(load_script("create-ticket.py"), [path, "--skip-duplicate-check"])),
+            "create-task": (None, lambda _: run_cli(load_script("create-task.py"), [path])),
+            "create-document": (None, lambda _: run_cli(load_script("create-document.py"), [path])),
+            "create-page": (parent, lambda parent_id: run_cli(load_script("create-page.py"), ["--parent", parent_id, path])),
+            "create-feedback": (None, lambda _: run_cli(
+                load_script("create-feedback.py"), ["--title", title, "--stdin", "--skip-duplicate-check"], stdin=markdown
+            )),
+        }
+
+    def run(self, corpora: List[str], only: List[str] = None) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for corpus in corpora:
+            markdown = build_corpus(CORPUS_SIZES[corpus])
+            blocks = len(markdown_to_blocks(markdown))
+            for case, (setup, action) in self.cases(corpus, markdown).items():
+                if only and case not in only:
+                    continue
+                self.server.store = type(self.server.store)()
+                # Sync lock records and cached reads point at pages of the discarded store
+                shutil.rmtree(os.path.join(notion_client.CACHE_DIR, "locks"), ignore_errors=True)
+                if notion_client.get_read_cache():
+                    notion_client.get_read_cache().clear()
+                print(f"  {corpus}/{case} ({blocks} blocks)...", file=sys.stderr)
+                result = self.measure(setup, action)
+                result["blocks"] = blocks
+                results[f"{corpus}/{case}"] = result
+        return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], request_tolerance: float, latency_tolerance: float) -> List[str]:
+    """List regressions of results against a baseline."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if base.get("blocks") != result["blocks"]:
+            print(f"Note: {key} corpus changed ({base.get('blocks')} -> {result['blocks']} blocks), not compared", file=sys.stderr)
+            continue
+        if result["requests"] > base["requests"] * (1 + request_tolerance):
+            regressions.append(f"{key}: requests {base['requests']} -> {result['requests']}")
+        if result["bytes_sent"] > base["bytes_sent"] * (1 + request_tolerance):
+            regressions.append(f"{key}: bytes sent {base['bytes_sent']} -> {result['bytes_sent']}")
+        if result["wall_seconds"] > base["wall_seconds"] * (1 + latency_tolerance) + LATENCY_SLACK_SECONDS:
+            regressions.append(f"{key}: wall time {base['wall_seconds']}s -> {result['wall_seconds']}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Notion scripts against the local stand-in",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Corpora: small (one knowledge file), medium (500 blocks), large (5,000 blocks)
+Cases: create_page, update_page, sync_create, sync_update, create-ticket,
+       create-task, create-document, create-page, create-feedback
+
+Examples:
+  %(prog)s
+  %(prog)s --corpus medium --case update_page --latency 50
+  %(prog)s --update-baseline
+        """
+    )
+
+    parser.add_argument("--corpus", action="append", choices=list(CORPUS_SIZES), help="Corpus to run (repeatable, default: all)")
+    parser.add_argument("--case", action="append", help="Case to run (repeatable, default: all)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated API latency in ms (default: 0)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--request-tolerance", type=float, default=0.0, help="Allowed relative increase in requests/bytes (default: 0)")
+    parser.add_argument("--latency-tolerance", type=float, default=0.5, help="Allowed relative increase in wall time (default: 0.5)")
+    parser.add_argument("--output", "-o", help="Also write results to this JSON file")
+
+    args = parser.parse_args()
+
+    benchmark = Benchmark(latency_ms=args.latency)
+    try:
+        print("Running benchmarks...", file=sys.stderr)
+        results = benchmark.run(args.corpus or list(CORPUS_SIZES), args.case)
+    finally:
+        benchmark.close()
+
+    output = {"latency_ms": args.latency, "results": results}
+    print(json.dumps(output, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        baseline.setdefault("results", {}).update(results)
+        baseline["latency_ms"] = args.latency
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Baseline updated: {args.baseline}", file=sys.stderr)
+        return
+
+    if baseline.get("latency_ms", args.latency) != args.latency:
+        print(f"Error: baseline was recorded with --latency {baseline['latency_ms']}", file=sys.stderr)
+        sys.exit(2)
+
+    regressions = compare(results, baseline.get("results", {}), args.request_tolerance, args.latency_tolerance)
+    if regressions:
+        print("Regressions:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  {regression}", file=sys.stderr)
+        sys.exit(1)
+    print("No regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,13 @@ Usage:
         --team Product \\
         --status Open \\
         --body "## Overview\\n\\nThis document outlines..."
+
+    # Long spec: one child page per H2 section, uploaded in parallel
+    python3 create-document.py spec.md --split-over 1000
+
+    # Bundle: one document per H1, created concurrently (NDJSON output)
+    python3 create-document.py notes.md --bundle --category Research
+    python3 create-document.py --manifest docs.txt
 """
 
 import sys
@@ -27,9 +34,13 @@ import re
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from notion_client import (
-    get_notion_token, create_page, markdown_to_blocks,
+    get_notion_token, create_page, markdown_to_blocks, WriteScheduler,
     DATABASES, title_property, select_property, multi_select_property
 )
+from notion_cli import (
+    add_common_arguments, apply_common_arguments, add_bundle_arguments, add_spool_arguments, read_bundle,
+    print_bundle_results
+)
 
 # Valid options for Documents
 DOC_STATUS = ["Open", "Urgent", "Archived", "Done", "Launched", "Implementation"]
@@ -51,10 +62,14 @@ def parse_markdown_file(file_path: str) -> dict:
     """Parse a markdown file to extract document data."""
     with open(file_path, 'r') as f:
         content = f.read()
+    return parse_markdown(content, os.path.basename(file_path).replace('.md', ''))
 
+
+def parse_markdown(content: str, default_name: str) -> dict:
+    """Extract document data from markdown (title from the first H1)."""
     # Extract title from first H1
     title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-    title = title_match.group(1) if title_match else os.path.basename(file_path).replace('.md', '')
+    title = title_match.group(1) if title_match else default_name
 
     data = {
         "name": title,
@@ -84,6 +99,7 @@ def create_document(
     team: str = None,
     type_: str = None,
     body: str = None,
+    split_over: int = None,
 ) -> dict:
     """Create a document in Moovs Documents."""
     token = get_notion_token()
@@ -111,14 +127,19 @@ def create_document(
         blocks = markdown_to_blocks(body)
 
     # Create the page
-    result = create_page(token, DATABASES["documents"], properties, blocks)
+    result = create_page(token, DATABASES["documents"], properties, blocks, split_over=split_over)
 
-    return {
+    output = {
         "status": "success",
         "page_id": result.get("id"),
         "url": result.get("url"),
         "name": name,
     }
+    if result.get("subpages"):
+        output["subpages"] = [{"page_id": page.get("id"), "url": page.get("url")} for page in result["subpages"]]
+    if result.get("spooled"):
+        output.update(status="spooled", spool_id=result["spooled"])
+    return output
 
 
 def main():
@@ -135,6 +156,8 @@ Valid options:
 Examples:
   %(prog)s document.md
   %(prog)s --name "Q1 OKRs" --category Project --team Product
+  %(prog)s spec.md --split-over 1000
+  %(prog)s notes.md --bundle --category Research
         """
     )
 
@@ -146,8 +169,42 @@ Examples:
     parser.add_argument("--type", dest="type_", choices=DOC_TYPE, help="Document type")
     parser.add_argument("--body", "-b", help="Document body (markdown)")
     parser.add_argument("--stdin", action="store_true", help="Read body from stdin")
+    parser.add_argument(
+        "--split-over",
+        type=int,
+        metavar="BLOCKS",
+        help="Split bodies longer than BLOCKS blocks at H2 headings into child pages",
+    )
 
+    add_bundle_arguments(parser)
+    add_spool_arguments(parser)
+    add_common_arguments(parser, lane="interactive")
     args = parser.parse_args()
+    apply_common_arguments(args)
+
+    documents = read_bundle(args, parser)
+    if documents is not None:
+        print(f"Creating {len(documents)} documents...", file=sys.stderr)
+        with WriteScheduler() as scheduler:
+            jobs = []
+            for source, content in documents:
+                data = parse_markdown(content, source)
+                # CLI args apply to every document
+                if args.status != "Open":
+                    data["status"] = args.status
+                jobs.append((source, scheduler.submit(
+                    source,
+                    create_document,
+                    name=data["name"],
+                    status=data.get("status", "Open"),
+                    category=args.category or data.get("category"),
+                    team=args.team or data.get("team"),
+                    type_=args.type_ or data.get("type"),
+                    body=data["body"],
+                    split_over=args.split_over,
+                )))
+            ok = print_bundle_results(jobs)
+        sys.exit(0 if ok else 1)
 
     if args.file:
         data = parse_markdown_file(args.file)
@@ -187,9 +244,10 @@ Examples:
         team=data.get("team"),
         type_=data.get("type"),
         body=data.get("body"),
+        split_over=args.split_over,
     )
 
-    print(f"Created: {result.get('url')}", file=sys.stderr)
+    print(f"Spooled: #{result['spool_id']}" if result.get("spool_id") else f"Created: {result.get('url')}", file=sys.stderr)
     print(json.dumps(result, indent=2))
 
 
@@ -54,12 +54,12 @@ from notion_client import (
     get_notion_token, create_page, markdown_to_blocks, DATABASES,
     title_property, rich_text_property, select_property, date_property, people_property
 )
+from notion_dedupe import check_duplicates, append_to_duplicate
+from notion_users import resolve_user
+from notion_cli import add_common_arguments, apply_common_arguments, add_spool_arguments
 
-# Add feedback database to DATABASES if not present
-FEEDBACK_DATABASE_ID = os.environ.get(
-    "NOTION_FEEDBACK_DATABASE",
-    "2ef8aeaa-3759-80fd-ac7e-fe6253f444f5"  # Factory Feedback database
-)
+# Factory Feedback database (override with NOTION_FEEDBACK_DATABASE)
+FEEDBACK_DATABASE_ID = DATABASES["feedback"]
 
 # Valid options
 SEVERITY_OPTIONS = ["Critical", "Major", "Minor", "Suggestion"]
@@ -75,39 +75,6 @@ KNOWN_SKILLS = [
     "moovs-walkthrough-capture", "feedback"
 ]
 
-# Notion user ID mapping (for Person Submitted property)
-# Maps lowercase names/emails to Notion user IDs
-NOTION_USERS = {
-    "amir": "69c13ad3-3e54-4f7b-bf7e-e93f6110915d",
-    "amir ghorbani": "69c13ad3-3e54-4f7b-bf7e-e93f6110915d",
-    "chris": "0900ccd6-ed95-4916-a40a-156bf72d664d",
-    "chris behan": "0900ccd6-ed95-4916-a40a-156bf72d664d",
-    "tyler": "516a8368-2322-4529-a1c7-746392851e18",
-    "tyler montz": "516a8368-2322-4529-a1c7-746392851e18",
-    "peter": "2e573a02-cf1c-4024-bd99-393ca013bcb4",
-    "peter evenson": "2e573a02-cf1c-4024-bd99-393ca013bcb4",
-    "ruben": "8696e784-ab57-417e-bb39-0a209f709b4f",
-    "ruben schultz": "8696e784-ab57-417e-bb39-0a209f709b4f",
-    "joan": "88e0df2d-a26d-4dda-b786-c3a872a2937d",
-    "joan badia": "88e0df2d-a26d-4dda-b786-c3a872a2937d",
-    "marton": "14032271-41be-46f7-bf58-fe1b914f5990",
-    "márton": "14032271-41be-46f7-bf58-fe1b914f5990",
-    "santiago": "db175734-fb75-41b0-a76f-e835f10ed991",
-    "santiago gallo": "db175734-fb75-41b0-a76f-e835f10ed991",
-    "pol": "34e46df4-06b4-46be-b7de-f7b7a66e13b0",
-    "john cervantes": "34e46df4-06b4-46be-b7de-f7b7a66e13b0",
-    "sebastian": "1c0d872b-594c-810a-b84c-0002b74ebf77",
-    "sebastian contreras": "1c0d872b-594c-810a-b84c-0002b74ebf77",
-    "nate": "2d5d872b-594c-8152-a869-0002a290d93f",
-    "nate bullock": "2d5d872b-594c-8152-a869-0002a290d93f",
-    "andrea": "2e6d872b-594c-815e-9450-0002a2899317",
-    "andrea montealegre": "2e6d872b-594c-815e-9450-0002a2899317",
-    "arwen": "245d872b-594c-812b-9492-000208fe6eaf",
-    "arwen montana": "245d872b-594c-812b-9492-000208fe6eaf",
-    "kate": "1f4d872b-594c-81f5-ab75-0002868705f4",
-    "kate co": "1f4d872b-594c-81f5-ab75-0002868705f4",
-}
-
 
 def create_feedback(
     title: str,
@@ -136,8 +103,8 @@ def create_feedback(
         properties["Skill"] = select_property(skill)
 
     if submitted_by:
-        # Try to find Notion user ID for Person Submitted property
-        user_id = NOTION_USERS.get(submitted_by.lower())
+        # Resolve Notion user ID for Person Submitted property from the cached directory
+        user_id = resolve_user(submitted_by, token)
         if user_id:
             properties["Person Submitted"] = people_property([user_id])
         else:
@@ -167,12 +134,15 @@ def create_feedback(
     # Create the page
     result = create_page(token, FEEDBACK_DATABASE_ID, properties, blocks)
 
-    return {
+    output = {
         "status": "success",
         "page_id": result.get("id"),
         "url": result.get("url"),
         "title": title,
     }
+    if result.get("spooled"):
+        output.update(status="spooled", spool_id=result["spooled"])
+    return output
 
 
 def main():
@@ -211,9 +181,14 @@ Examples:
         default=default_user or None,
         help=f"Name of person submitting (default: {default_user or 'not configured - run scripts/setup-user.sh'})"
     )
+    parser.add_argument("--append-to-duplicate", action="store_true", help="Append to the best matching existing feedback entry instead of creating a duplicate")
+    parser.add_argument("--skip-duplicate-check", action="store_true", help="Don't check the local mirror for duplicates")
     parser.add_argument("--stdin", action="store_true", help="Read description from stdin")
 
+    add_spool_arguments(parser)
+    add_common_arguments(parser, lane="interactive")
     args = parser.parse_args()
+    apply_common_arguments(args)
 
     # Handle stdin
     description = args.description
@@ -224,6 +199,16 @@ Examples:
     if args.skill and args.skill not in KNOWN_SKILLS:
         print(f"Warning: Unknown skill '{args.skill}'. Known skills: {', '.join(KNOWN_SKILLS)}", file=sys.stderr)
 
+    # Check the local mirror for likely duplicates
+    if not args.skip_duplicate_check:
+        duplicates = check_duplicates("feedback", args.title, description or "")
+        if duplicates and args.append_to_duplicate:
+            print(f"Appending to existing feedback entry: {duplicates[0]['title']}...", file=sys.stderr)
+            result = append_to_duplicate(get_notion_token(), duplicates[0], args.title, description)
+            print(f"Appended: {result.get('url')}", file=sys.stderr)
+            print(json.dumps(result, indent=2))
+            return
+
     # Create the feedback
     print(f"Creating feedback: {args.title}...", file=sys.stderr)
 
@@ -238,7 +223,7 @@ Examples:
         submitted_by=args.submitted_by,
     )
 
-    print(f"Created: {result.get('url')}", file=sys.stderr)
+    print(f"Spooled: #{result['spool_id']}" if result.get("spool_id") else f"Created: {result.get('url')}", file=sys.stderr)
     print(json.dumps(result, indent=2))
 
 
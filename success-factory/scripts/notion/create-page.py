@@ -11,6 +11,13 @@ Usage:
 
     # With body content
     python3 create-page.py --parent <page_id> --name "Design Brief" --body "## Context\\n\\nDetails..."
+
+    # Long document: one child page per H2 section, uploaded in parallel
+    python3 create-page.py --parent <page_id> handbook.md --split-over 1000
+
+    # Bundle: one page per H1, created concurrently (NDJSON output)
+    python3 create-page.py --parent <page_id> notes.md --bundle
+    python3 create-page.py --parent <page_id> --manifest pages.txt
 """
 
 import sys
@@ -21,8 +28,10 @@ import re
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from notion_client import (
-    get_notion_token, notion_request, markdown_to_blocks, title_property
+from notion_client import get_notion_token, create_child_page, markdown_to_blocks, WriteScheduler
+from notion_cli import (
+    add_common_arguments, apply_common_arguments, add_bundle_arguments, add_spool_arguments, read_bundle,
+    print_bundle_results
 )
 
 
@@ -30,10 +39,14 @@ def parse_markdown_file(file_path: str) -> dict:
     """Parse a markdown file to extract page data."""
     with open(file_path, 'r') as f:
         content = f.read()
+    return parse_markdown(content, os.path.basename(file_path).replace('.md', ''))
 
+
+def parse_markdown(content: str, default_name: str) -> dict:
+    """Extract page data from markdown (title from the first H1)."""
     # Extract title from first H1
     title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-    title = title_match.group(1) if title_match else os.path.basename(file_path).replace('.md', '')
+    title = title_match.group(1) if title_match else default_name
 
     return {
         "name": title,
@@ -45,41 +58,32 @@ def create_page(
     parent_id: str,
     name: str,
     body: str = None,
+    split_over: int = None,
 ) -> dict:
     """Create a page under a parent page."""
     token = get_notion_token()
 
-    # Build page data
-    page_data = {
-        "parent": {"page_id": parent_id},
-        "properties": {
-            "title": title_property(name)["title"]  # Page title format is different
-        }
-    }
-
     # Convert body to blocks
-    if body:
-        blocks = markdown_to_blocks(body)
-        page_data["children"] = blocks[:100]
+    blocks = markdown_to_blocks(body) if body else None
 
     # Create the page
-    result = notion_request("POST", "/pages", token, page_data)
+    result = create_child_page(token, parent_id, name, blocks, split_over=split_over)
+    return page_output(result, name)
 
-    # If there are more blocks, append them
-    if body:
-        blocks = markdown_to_blocks(body)
-        if len(blocks) > 100:
-            page_id = result["id"]
-            for i in range(100, len(blocks), 100):
-                batch = blocks[i:i+100]
-                notion_request("PATCH", f"/blocks/{page_id}/children", token, {"children": batch})
 
-    return {
+def page_output(result: dict, name: str) -> dict:
+    """JSON output for a created page."""
+    output = {
         "status": "success",
         "page_id": result.get("id"),
         "url": result.get("url"),
         "name": name,
     }
+    if result.get("subpages"):
+        output["subpages"] = [{"page_id": page.get("id"), "url": page.get("url")} for page in result["subpages"]]
+    if result.get("spooled"):
+        output.update(status="spooled", spool_id=result["spooled"])
+    return output
 
 
 def main():
@@ -90,6 +94,8 @@ Examples:
   %(prog)s --parent abc123 --name "My Page"
   %(prog)s --parent abc123 document.md
   echo "Content" | %(prog)s --parent abc123 --name "Page" --stdin
+  %(prog)s --parent abc123 handbook.md --split-over 1000
+  %(prog)s --parent abc123 notes.md --bundle
         """
     )
 
@@ -98,8 +104,39 @@ Examples:
     parser.add_argument("--name", "-n", help="Page name/title")
     parser.add_argument("--body", "-b", help="Page body (markdown)")
     parser.add_argument("--stdin", action="store_true", help="Read body from stdin")
+    parser.add_argument(
+        "--split-over",
+        type=int,
+        metavar="BLOCKS",
+        help="Split bodies longer than BLOCKS blocks at H2 headings into child pages",
+    )
 
+    add_bundle_arguments(parser)
+    add_spool_arguments(parser)
+    add_common_arguments(parser, lane="interactive")
     args = parser.parse_args()
+    apply_common_arguments(args)
+
+    documents = read_bundle(args, parser)
+    if documents is not None:
+        print(f"Creating {len(documents)} pages...", file=sys.stderr)
+        token = get_notion_token()
+        names = {}
+        with WriteScheduler() as scheduler:
+            jobs = []
+            for source, content in documents:
+                data = parse_markdown(content, source)
+                names[source] = data["name"]
+                blocks = markdown_to_blocks(data["body"])
+                if args.spool != "off" or (args.split_over and len(blocks) > args.split_over):
+                    # Spooling and splitting go through create_child_page, one queue per document
+                    future = scheduler.submit(source, create_child_page, token, args.parent, data["name"], blocks, args.split_over)
+                else:
+                    # Pages are created in order on the parent, their bodies upload concurrently
+                    future = scheduler.create_child_page(token, args.parent, data["name"], blocks)
+                jobs.append((source, future))
+            ok = print_bundle_results(jobs, lambda source, page: page_output(page, names[source]))
+        sys.exit(0 if ok else 1)
 
     if args.file:
         data = parse_markdown_file(args.file)
@@ -123,9 +160,10 @@ Examples:
         parent_id=args.parent,
         name=data["name"],
         body=data.get("body"),
+        split_over=args.split_over,
     )
 
-    print(f"Created: {result.get('url')}", file=sys.stderr)
+    print(f"Spooled: #{result['spool_id']}" if result.get("spool_id") else f"Created: {result.get('url')}", file=sys.stderr)
     print(json.dumps(result, indent=2))
 
 
@@ -30,6 +30,7 @@ from notion_client import (
     DATABASES, TASK_STATUS, TASK_PRIORITY,
     title_property, rich_text_property, select_property, status_property, date_property
 )
+from notion_cli import add_common_arguments, apply_common_arguments, add_spool_arguments
 
 
 def parse_markdown_file(file_path: str) -> dict:
@@ -96,12 +97,15 @@ def create_task(
     # Create the page
     result = create_page(token, DATABASES["tasks"], properties, blocks)
 
-    return {
+    output = {
         "status": "success",
         "page_id": result.get("id"),
         "url": result.get("url"),
         "name": name,
     }
+    if result.get("spooled"):
+        output.update(status="spooled", spool_id=result["spooled"])
+    return output
 
 
 def main():
@@ -128,7 +132,10 @@ Examples:
     parser.add_argument("--body", "-b", help="Task body (markdown)")
     parser.add_argument("--stdin", action="store_true", help="Read body from stdin")
 
+    add_spool_arguments(parser)
+    add_common_arguments(parser, lane="interactive")
     args = parser.parse_args()
+    apply_common_arguments(args)
 
     if args.file:
         data = parse_markdown_file(args.file)
@@ -170,7 +177,7 @@ Examples:
         body=data.get("body"),
     )
 
-    print(f"Created: {result.get('url')}", file=sys.stderr)
+    print(f"Spooled: #{result['spool_id']}" if result.get("spool_id") else f"Created: {result.get('url')}", file=sys.stderr)
     print(json.dumps(result, indent=2))
 
 
@@ -38,6 +38,8 @@ from notion_client import (
     title_property, rich_text_property, select_property, multi_select_property,
     status_property, date_property
 )
+from notion_dedupe import check_duplicates, append_to_duplicate
+from notion_cli import add_common_arguments, apply_common_arguments, add_spool_arguments
 
 
 def parse_markdown_file(file_path: str) -> dict:
@@ -123,12 +125,15 @@ def create_ticket(
     # Create the page
     result = create_page(token, DATABASES["tickets"], properties, blocks)
 
-    return {
+    output = {
         "status": "success",
         "page_id": result.get("id"),
         "url": result.get("url"),
         "name": name,
     }
+    if result.get("spooled"):
+        output.update(status="spooled", spool_id=result["spooled"])
+    return output
 
 
 def main():
@@ -161,9 +166,14 @@ Examples:
     parser.add_argument("--due-date", help="Due date (YYYY-MM-DD)")
     parser.add_argument("--operator-id", help="Operator ID if related to specific customer")
     parser.add_argument("--body", "-b", help="Ticket body content (markdown)")
+    parser.add_argument("--append-to-duplicate", action="store_true", help="Append to the best matching existing ticket instead of creating a duplicate")
+    parser.add_argument("--skip-duplicate-check", action="store_true", help="Don't check the local mirror for duplicates")
     parser.add_argument("--stdin", action="store_true", help="Read body from stdin")
 
+    add_spool_arguments(parser)
+    add_common_arguments(parser, lane="interactive")
     args = parser.parse_args()
+    apply_common_arguments(args)
 
     # Determine source of ticket data
     if args.file:
@@ -206,6 +216,16 @@ Examples:
     else:
         parser.error("Either provide a markdown file or use --name")
 
+    # Check the local mirror for likely duplicates
+    if not args.skip_duplicate_check:
+        duplicates = check_duplicates("tickets", data["name"], data.get("body") or "")
+        if duplicates and args.append_to_duplicate:
+            print(f"Appending to existing ticket: {duplicates[0]['title']}...", file=sys.stderr)
+            result = append_to_duplicate(get_notion_token(), duplicates[0], data["name"], data.get("body"))
+            print(f"Appended: {result.get('url')}", file=sys.stderr)
+            print(json.dumps(result, indent=2))
+            return
+
     # Create the ticket
     print(f"Creating ticket: {data['name']}...", file=sys.stderr)
 
@@ -221,7 +241,7 @@ Examples:
         body=data.get("body"),
     )
 
-    print(f"Created: {result.get('url')}", file=sys.stderr)
+    print(f"Spooled: #{result['spool_id']}" if result.get("spool_id") else f"Created: {result.get('url')}", file=sys.stderr)
     print(json.dumps(result, indent=2))
 
 
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Upload pages stored in the offline spool.
+
+create-* scripts spool pages with --offline, or with --spool-on-error when
+Notion can't be reached (see notion_spool). This command uploads them
+concurrently and records each item's page ID or error in the spool.
+
+Usage:
+    # Upload everything pending
+    python3 flush-spool.py
+
+    # Show the spool without uploading
+    python3 flush-spool.py --list
+
+    # Retry items Notion rejected (and flushes interrupted over an hour ago)
+    python3 flush-spool.py --retry-failed
+
+    # Remove uploaded items
+    python3 flush-spool.py --clean
+
+Prints one JSON line per item: success (with page_id and url), pending
+(Notion still unavailable; kept for the next flush), error (not created) or
+incomplete (created, or maybe created, but not finished; never uploaded
+again, so fix it up in Notion).
+"""
+
+import sys
+import os
+import argparse
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from notion_cli import add_common_arguments, apply_common_arguments
+from notion_spool import Spool, SPOOL_PATH, MAX_ATTEMPTS, flush_spool
+from notion_tokens import load_token_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Upload pages stored in the offline spool",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s --list
+  %(prog)s --retry-failed
+        """
+    )
+
+    parser.add_argument("--spool-file", default=SPOOL_PATH, help=f"Spool file (default: {SPOOL_PATH})")
+    parser.add_argument("--list", action="store_true", help="List spooled items instead of uploading")
+    parser.add_argument("--clean", action="store_true", help="Delete items that were uploaded")
+    parser.add_argument("--retry-failed", action="store_true", help="Also retry items that were not created and flushes interrupted over an hour ago")
+    parser.add_argument("--limit", type=int, help="Upload at most this many items")
+    parser.add_argument(
+        "--max-attempts", type=int, default=MAX_ATTEMPTS,
+        help=f"Give up on an item after Notion was unavailable this many times (default: {MAX_ATTEMPTS})",
+    )
+
+    add_common_arguments(parser, lane="bulk")
+    args = parser.parse_args()
+    apply_common_arguments(args)
+
+    spool = Spool(args.spool_file)
+
+    if args.list:
+        for item in spool.items():
+            print(json.dumps(item))
+        return
+
+    if args.clean:
+        print(f"Removed {spool.clean()} uploaded item(s)", file=sys.stderr)
+        return
+
+    try:
+        pool = load_token_pool()
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    results = flush_spool(
+        spool,
+        pool,
+        retry_failed=args.retry_failed,
+        limit=args.limit,
+        max_attempts=args.max_attempts,
+        on_result=lambda result: print(json.dumps(result), flush=True),
+    )
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    print(", ".join(f"{status} {count}" for status, count in sorted(counts.items())) or "Spool is empty", file=sys.stderr)
+
+    if counts.get("error") or counts.get("pending") or counts.get("incomplete"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
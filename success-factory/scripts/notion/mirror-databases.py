@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Mirror Notion databases into local JSONL or SQLite snapshots.
+
+The first run exports every page; later runs only fetch pages edited since
+the last run (per-database last_edited_time watermark) and merge them in.
+
+Usage:
+    # Mirror every database in DATABASES
+    python3 mirror-databases.py
+
+    # Mirror tickets and tasks into SQLite
+    python3 mirror-databases.py tickets tasks --format sqlite
+
+    # Force a full re-export (drops pages archived since the last full run)
+    python3 mirror-databases.py tickets --full
+
+    # Include page body text (used by duplicate detection)
+    python3 mirror-databases.py tickets feedback --with-content
+
+With a token pool (NOTION_TOKENS), databases are mirrored concurrently,
+each on its own integration.
+"""
+
+import sys
+import os
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from notion_client import DATABASES, _in_context
+from notion_mirror import mirror_database, MIRROR_DIR, SNAPSHOT_FORMATS
+from notion_cli import add_common_arguments, apply_common_arguments
+from notion_tokens import load_token_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mirror Notion databases into local snapshots",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Databases: {', '.join(DATABASES)}
+
+Examples:
+  %(prog)s
+  %(prog)s tickets tasks --format sqlite
+  %(prog)s tickets --full
+        """
+    )
+
+    parser.add_argument("databases", nargs="*", help="Databases to mirror (default: all)")
+    parser.add_argument("--format", "-f", choices=SNAPSHOT_FORMATS, default="jsonl", help="Snapshot format")
+    parser.add_argument("--full", action="store_true", help="Ignore watermarks and re-export everything")
+    parser.add_argument("--with-content", action="store_true", help="Also store page body text (one extra request per changed page)")
+    parser.add_argument("--dir", default=MIRROR_DIR, help=f"Snapshot directory (default: {MIRROR_DIR})")
+
+    add_common_arguments(parser, lane="bulk")
+    args = parser.parse_args()
+    apply_common_arguments(args)
+
+    unknown = [name for name in args.databases if name not in DATABASES]
+    if unknown:
+        parser.error(f"Unknown database(s): {', '.join(unknown)}")
+
+    pool = load_token_pool()
+
+    def mirror(name: str) -> dict:
+        print(f"Mirroring {name}...", file=sys.stderr)
+        result = mirror_database(
+            pool.token_for(name), name, fmt=args.format, full=args.full, mirror_dir=args.dir, with_content=args.with_content,
+            # Dry runs plan against the real watermarks but leave the snapshots untouched
+            write=not args.dry_run,
+        )
+        print(f"  {name} {result['mode']}: fetched {result['fetched']}, {result['pages']} pages in snapshot", file=sys.stderr)
+        return result
+
+    # Workers keep the CLI's priority lane and --timeout deadline
+    with ThreadPoolExecutor(max_workers=len(pool)) as executor:
+        results = list(executor.map(_in_context(mirror), args.databases or list(DATABASES)))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+HTTP record/replay cassettes for notion_request.
+
+Record mode captures every request/response pair of a real run into a
+JSONL cassette. Replay mode serves those responses locally, sleeping for
+the recorded (optionally scaled) latency, so converter and batching changes
+can be benchmarked against real-shaped traffic without touching Notion or
+spending rate limit.
+
+Cassettes never contain the integration token: only method, endpoint,
+request body, status, Retry-After and the response body are stored.
+
+Replay matching:
+1. The next unused interaction with the same method and endpoint
+2. Otherwise the next unused one with the same method and endpoint template
+   (/blocks/{id}/children), for runs that address different IDs
+3. Otherwise (unless strict) the last response served for that template,
+   so a run that sends more batches than the recording still completes
+
+Usage:
+    python3 create-document.py spec.md --record /tmp/spec.cassette.jsonl
+    python3 create-document.py spec.md --replay /tmp/spec.cassette.jsonl --replay-latency-scale 0
+"""
+
+import json
+import time
+import threading
+from collections import defaultdict, deque
+from typing import Optional, Dict, List, Any, Tuple
+
+from notion_client import Transport, get_transport, set_transport
+from notion_metrics import endpoint_template
+
+
+class CassetteRecorder:
+    """Transport wrapper appending each interaction to a JSONL cassette."""
+
+    def __init__(self, path: str, transport: Transport):
+        self.path = path
+        self.transport = transport
+        self._lock = threading.Lock()
+        open(path, 'w').close()
+
+    def __call__(self, method: str, endpoint: str, headers: Dict[str, str], payload: Optional[bytes], timeout: float = None) -> Tuple[int, Dict[str, str], bytes]:
+        start = time.perf_counter()
+        status, response_headers, body = self.transport(method, endpoint, headers, payload, timeout=timeout)
+        interaction = {
+            "method": method,
+            "endpoint": endpoint,
+            "request": json.loads(payload) if payload else None,
+            "status": status,
+            "headers": {name: value for name, value in response_headers.items() if name.lower() == "retry-after"},
+            "body": body.decode('utf-8', 'replace'),
+            "latency": round(time.perf_counter() - start, 6),
+        }
+        line = json.dumps(interaction, separators=(',', ':'))
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+        return status, response_headers, body
+
+
+class CassettePlayer:
+    """Transport serving recorded responses instead of calling Notion."""
+
+    def __init__(self, path: str, latency_scale: float = 1.0, strict: bool = False):
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self._lock = threading.Lock()
+        self.interactions: List[Dict[str, Any]] = []
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    self.interactions.append(json.loads(line))
+
+        self._exact = defaultdict(deque)
+        self._by_template = defaultdict(deque)
+        for index, interaction in enumerate(self.interactions):
+            method, endpoint = interaction["method"], interaction["endpoint"]
+            self._exact[(method, endpoint)].append(index)
+            self._by_template[(method, endpoint_template(endpoint))].append(index)
+        self._used = set()
+        self._last = {}
+
+    def _take(self, queue: deque) -> Optional[int]:
+        while queue and queue[0] in self._used:
+            queue.popleft()
+        return queue.popleft() if queue else None
+
+    def _match(self, method: str, endpoint: str) -> Dict[str, Any]:
+        template_key = (method, endpoint_template(endpoint))
+        with self._lock:
+            index = self._take(self._exact[(method, endpoint)])
+            if index is None:
+                index = self._take(self._by_template[template_key])
+            if index is None:
+                index = None if self.strict else self._last.get(template_key)
+                if index is None:
+                    raise RuntimeError(f"Cassette has no recorded response for {method} {endpoint}")
+            self._used.add(index)
+            self._last[template_key] = index
+            return self.interactions[index]
+
+    def __call__(self, method: str, endpoint: str, headers: Dict[str, str], payload: Optional[bytes], timeout: float = None) -> Tuple[int, Dict[str, str], bytes]:
+        interaction = self._match(method, endpoint)
+        time.sleep(interaction["latency"] * self.latency_scale)
+        return interaction["status"], dict(interaction["headers"]), interaction["body"].encode('utf-8')
+
+    def unplayed(self) -> int:
+        """Number of recorded interactions never served."""
+        return len(self.interactions) - len(self._used)
+
+
+def start_recording(path: str) -> CassetteRecorder:
+    """Record every notion_request made from now on into a cassette."""
+    recorder = CassetteRecorder(path, get_transport())
+    set_transport(recorder)
+    return recorder
+
+
+def start_replay(path: str, latency_scale: float = 1.0, strict: bool = False) -> CassettePlayer:
+    """Serve every notion_request from a cassette from now on."""
+    player = CassettePlayer(path, latency_scale, strict)
+    set_transport(player)
+    return player
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Shared command-line options for Notion scripts.
+
+Every CLI calls add_common_arguments(parser) before parsing and
+apply_common_arguments(args) right after. Reports are written at exit, so
+they also cover commands that fail or call sys.exit.
+
+Common options:
+    --stats               Print a per-endpoint request breakdown to stderr
+    --metrics-file PATH   Export request metrics (.prom = Prometheus textfile, else JSON)
+    --trace PATH          Write phase and request spans as Chrome trace-event JSON
+    --profile cpu|mem     Profile with cProfile or tracemalloc (see notion_profile)
+    --profile-output PATH Where to write the profile
+    --record PATH         Record every request/response into a cassette
+    --replay PATH         Serve requests from a cassette instead of Notion
+    --replay-latency-scale X
+                          Multiply recorded latencies during replay (0 = none)
+    --dry-run             Print the request plan and cost estimate as NDJSON
+                          instead of calling Notion (see notion_dryrun)
+    --dry-run-output PATH Write the plan to a file instead of stdout
+    --lane LANE           Priority lane: interactive, normal or bulk (see notion_priority)
+    --read-cache MODE     Cache reads: off, memory or disk (see notion_readcache)
+    --timeout SECONDS     Socket timeout of each request attempt (default: 30)
+    --deadline SECONDS    Fail requests not sent within SECONDS of the start
+    --hedge, --no-hedge   Re-send reads slower than their recent p95 (see notion_timeouts)
+
+Commands that create documents also call add_bundle_arguments(parser) for
+--bundle (one document per H1 of a file or stdin) and --manifest (a list of
+markdown files), creating every document in one process, and
+add_spool_arguments(parser) for --offline and --spool-on-error (see
+notion_spool).
+
+NOTION_METRICS_FILE, NOTION_TRACE_FILE, NOTION_RECORD, NOTION_REPLAY,
+NOTION_LANE, NOTION_READ_CACHE, NOTION_SPOOL, NOTION_TIMEOUT,
+NOTION_DEADLINE and NOTION_HEDGE set defaults for every command.
+"""
+
+import os
+import sys
+import json
+import atexit
+import argparse
+import importlib.util
+from concurrent.futures import Future
+from typing import Optional, List, Tuple, Callable
+
+from notion_client import READ_CACHE, set_rate_limit, set_read_cache, split_documents
+from notion_metrics import METRICS
+from notion_trace import TRACER
+from notion_profile import PROFILE_MODES, Profiler, default_output
+from notion_cassette import start_recording, start_replay
+from notion_dryrun import start_dry_run, format_summary
+from notion_priority import LANES, set_default_lane
+from notion_readcache import CACHE_MODES
+from notion_spool import SPOOL_MODES, enable_spool
+from notion_timeouts import REQUEST_TIMEOUT, set_request_timeout, set_default_deadline, set_hedging
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def command_name() -> str:
+    """Name of the running script, e.g. create-ticket."""
+    return os.path.splitext(os.path.basename(sys.argv[0]))[0] or "notion"
+
+
+def load_script(filename: str, directory: str = SCRIPTS_DIR):
+    """Import a hyphenated script (e.g. create-ticket.py) as a module."""
+    path = os.path.join(directory, filename)
+    name = "script_" + os.path.splitext(filename)[0].replace("-", "_")
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def add_common_arguments(parser: argparse.ArgumentParser, lane: str = "normal"):
+    """Add the options shared by every Notion CLI.
+
+    lane is the command's default priority lane: "interactive" for one-off
+    commands a person waits on, "bulk" for long background jobs.
+    """
+    parser.add_argument(
+        "--lane",
+        choices=LANES,
+        default=os.environ.get("NOTION_LANE", lane),
+        help=f"Request priority lane (default: {lane})",
+    )
+    parser.add_argument(
+        "--read-cache",
+        choices=CACHE_MODES,
+        default=READ_CACHE if READ_CACHE in CACHE_MODES else "memory",
+        help="Cache GETs and database queries in memory (default), also on disk, or not at all",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=REQUEST_TIMEOUT,
+        metavar="SECONDS",
+        help=f"Socket timeout of each request attempt (default: {REQUEST_TIMEOUT:g})",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=float(os.environ.get("NOTION_DEADLINE") or 0) or None,
+        metavar="SECONDS",
+        help="Give up on requests not sent within SECONDS of the start (default: no deadline)",
+    )
+    hedge = os.environ.get("NOTION_HEDGE")
+    hedge = hedge.lower() in ("1", "true", "yes", "on") if hedge else lane == "interactive"
+    hedging = parser.add_mutually_exclusive_group()
+    hedging.add_argument(
+        "--hedge", dest="hedge", action="store_true", default=hedge,
+        help="Re-send GETs and queries slower than their recent p95, first response wins" + (" (default)" if hedge else ""),
+    )
+    hedging.add_argument("--no-hedge", dest="hedge", action="store_false", help="Never send hedged reads" + ("" if hedge else " (default)"))
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument("--stats", action="store_true", help="Print per-endpoint Notion API stats to stderr on exit")
+    group.add_argument(
+        "--metrics-file",
+        default=os.environ.get("NOTION_METRICS_FILE"),
+        help="Write request metrics on exit (.prom for Prometheus textfile, otherwise JSON)",
+    )
+    group.add_argument(
+        "--trace",
+        default=os.environ.get("NOTION_TRACE_FILE"),
+        help="Write a Chrome trace-event JSON file of phases and requests on exit",
+    )
+    group.add_argument("--profile", choices=PROFILE_MODES, help="Profile CPU (cProfile) or memory (tracemalloc)")
+    group.add_argument("--profile-output", help="Profile output file (default: NOTION_CACHE_DIR/profiles/...)")
+    cassette = group.add_mutually_exclusive_group()
+    cassette.add_argument("--record", default=os.environ.get("NOTION_RECORD"), help="Record requests and responses into a cassette file")
+    cassette.add_argument("--replay", default=os.environ.get("NOTION_REPLAY"), help="Replay responses from a cassette file instead of calling Notion")
+    cassette.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the request plan and cost estimate as NDJSON instead of calling Notion",
+    )
+    group.add_argument("--replay-latency-scale", type=float, default=1.0, help="Scale recorded latencies during replay (default: 1.0)")
+    group.add_argument("--dry-run-output", metavar="PATH", help="Write the --dry-run plan to a file instead of stdout")
+
+
+def apply_common_arguments(args: argparse.Namespace):
+    """Activate the shared options parsed by add_common_arguments."""
+    METRICS.command = command_name()
+    set_default_lane(args.lane)
+    set_request_timeout(args.timeout)
+    set_default_deadline(args.deadline)
+    # A hedge would take a second cassette response or show up as an extra planned request
+    set_hedging(args.hedge and not (args.dry_run or args.replay))
+    if args.trace:
+        TRACER.enable()
+    dry_run = None
+    if args.dry_run:
+        dry_run = start_dry_run(args.dry_run_output or "-")
+        # Nothing is sent, so no real credentials are needed
+        os.environ.setdefault("NOTION_TOKEN", "dry-run")
+    elif args.replay:
+        start_replay(args.replay, args.replay_latency_scale)
+        # Replays need no real credentials and spend no rate limit
+        os.environ.setdefault("NOTION_TOKEN", "replay")
+        set_rate_limit(0)
+    elif args.record:
+        start_recording(args.record)
+    # Dry runs and replays must not leave their responses in the shared disk cache
+    set_read_cache("memory" if args.read_cache == "disk" and (args.dry_run or args.replay) else args.read_cache)
+    spool = enable_spool(args.spool) if getattr(args, "spool", "off") != "off" and not dry_run else None
+    profiler = None
+    if args.profile:
+        profiler = Profiler(args.profile, args.profile_output or default_output(METRICS.command, args.profile))
+        profiler.start()
+
+    def report():
+        if profiler:
+            profiler.report()
+        if args.trace:
+            try:
+                TRACER.save(args.trace)
+            except OSError as e:
+                print(f"Warning: Could not write trace to {args.trace}: {e}", file=sys.stderr)
+        if args.metrics_file:
+            try:
+                METRICS.export(args.metrics_file)
+            except OSError as e:
+                print(f"Warning: Could not write metrics to {args.metrics_file}: {e}", file=sys.stderr)
+        if args.stats:
+            sys.stderr.write(METRICS.format_table())
+        if dry_run:
+            sys.stderr.write(format_summary(dry_run.finish()))
+        if spool and spool.added:
+            print(f"Spooled {spool.added} page(s) to {spool.path}; upload them with flush-spool.py", file=sys.stderr)
+
+    atexit.register(report)
+
+
+def add_bundle_arguments(parser: argparse.ArgumentParser):
+    """Add --bundle and --manifest for creating many documents in one run."""
+    group = parser.add_argument_group("bundles").add_mutually_exclusive_group()
+    group.add_argument("--bundle", action="store_true", help="Create one document per H1 of the markdown file (or --stdin)")
+    group.add_argument("--manifest", help="Create one document per markdown file listed in this file (one path per line)")
+
+
+def add_spool_arguments(parser: argparse.ArgumentParser):
+    """Add --offline and --spool-on-error for commands that create pages."""
+    default = os.environ.get("NOTION_SPOOL", "off")
+    if default not in SPOOL_MODES:
+        default = "off"
+    group = parser.add_argument_group("offline").add_mutually_exclusive_group()
+    group.add_argument(
+        "--offline", dest="spool", action="store_const", const="always", default=default,
+        help="Store pages in the local spool without calling Notion (upload later with flush-spool.py)",
+    )
+    group.add_argument(
+        "--spool-on-error", dest="spool", action="store_const", const="on-error",
+        help="Store pages in the local spool if Notion can't be reached",
+    )
+
+
+def read_bundle(args: argparse.Namespace, parser: argparse.ArgumentParser) -> Optional[List[Tuple[str, str]]]:
+    """The (source, markdown) documents of a --bundle or --manifest run, else None.
+
+    Manifest paths are relative to the manifest; blank lines and # comments
+    are ignored.
+    """
+    if args.manifest:
+        base = os.path.dirname(os.path.abspath(args.manifest))
+        documents = []
+        with open(args.manifest, 'r') as f:
+            for line in f:
+                path = line.strip()
+                if not path or path.startswith("#"):
+                    continue
+                path = os.path.join(base, os.path.expanduser(path))
+                with open(path, 'r') as doc:
+                    documents.append((os.path.relpath(path), doc.read()))
+        return documents
+
+    if not args.bundle:
+        return None
+    if args.file:
+        with open(args.file, 'r') as f:
+            markdown, source = f.read(), args.file
+    elif args.stdin:
+        markdown, source = sys.stdin.read(), "stdin"
+    else:
+        parser.error("--bundle needs a markdown file or --stdin")
+    return [(f"{source}#{index}", document) for index, document in enumerate(split_documents(markdown), 1)]
+
+
+def print_bundle_results(jobs: List[Tuple[str, Future]], summarize: Callable = None) -> bool:
+    """Print one JSON line per (source, future) in order; False if any failed.
+
+    summarize(source, result) turns a future's result into the printed dict.
+    """
+    ok = True
+    for source, future in jobs:
+        try:
+            result = future.result()
+            result = dict(summarize(source, result) if summarize else result, source=source)
+        except Exception as e:
+            ok = False
+            print(f"Error: {source}: {e}", file=sys.stderr)
+            result = {"status": "error", "source": source, "error": str(e)}
+        print(json.dumps(result), flush=True)
+    return ok
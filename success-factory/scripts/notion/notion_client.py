@@ -5,16 +5,61 @@ Shared Notion client library for moovs-factory scripts.
 Provides:
 - Authentication via ~/.claude.json
 - Markdown-to-Notion block conversion
-- Common API operations
+- Common API operations, with retries on 429/5xx and per-request metrics
+- A rate limit shared by every process using the same token
+- Adaptive (AIMD) limits on concurrent in-flight requests
+- WriteScheduler: ordered writes per page, interleaved across pages
+- A read-through cache for GETs and queries, invalidated by our own writes
+- Per-attempt timeouts, operation deadlines and hedged reads (notion_timeouts)
+- Local cache directory for derived data (NOTION_CACHE_DIR)
 """
 
 import os
+import sys
 import re
 import json
+import time
+import threading
+import urllib.parse
 import urllib.request
 import urllib.error
-from typing import Optional, Dict, List, Any
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, Iterator, Callable, Tuple
 
+from notion_metrics import METRICS, emit_request, endpoint_template
+from notion_trace import span, traced
+from notion_ratelimit import SharedTokenBucket, token_key
+from notion_concurrency import AIMDController
+from notion_priority import current_lane, priority_lane
+from notion_singleflight import SingleFlight, DocumentLock
+from notion_readcache import ResponseCache, CACHE_MODES, DEFAULT_TTL, request_tags
+from notion_timeouts import (
+    LATENCIES, DeadlineExceeded, attempt_timeout, check_deadline, current_deadline, deadline_until, request_deadline,
+    hedge_delay, hedged_call, is_timeout, remaining
+)
+
+
+# API base URL; point at notion_standin.py for offline testing
+API_BASE = os.environ.get("NOTION_API_BASE", "https://api.notion.com/v1").rstrip("/")
+
+# Local cache for user directory, mirrors and other derived data
+CACHE_DIR = os.path.expanduser(os.environ.get("NOTION_CACHE_DIR", "~/.cache/moovs-factory"))
+
+# Read-through cache for GETs and database queries (see notion_readcache)
+READ_CACHE = os.environ.get("NOTION_READ_CACHE", "memory")
+READ_CACHE_TTL = float(os.environ.get("NOTION_READ_CACHE_TTL", str(DEFAULT_TTL)))
+
+# Retries for rate-limited (429) requests and server errors on reads
+MAX_RETRIES = int(os.environ.get("NOTION_MAX_RETRIES", "3"))
+RETRY_BACKOFF = 0.5  # seconds, doubled per attempt when there is no Retry-After
+
+# Requests per second shared by all processes using a token (0 disables)
+RATE_LIMIT = float(os.environ.get("NOTION_RATE_LIMIT", "3"))
+RATE_BURST = float(os.environ.get("NOTION_RATE_BURST", "10"))
+
+# Upper bound for the adaptive in-flight request window
+MAX_CONCURRENCY = int(os.environ.get("NOTION_MAX_CONCURRENCY", "8"))
 
 # Database IDs
 DATABASES = {
@@ -23,6 +68,9 @@ DATABASES = {
     "documents": "c6e840ca-0c08-4565-99ef-ec7b2dfa6789",  # Documents
     "problems": "2e88aeaa-3759-8063-ae62-e4005676ae46",   # Problem Docs
     "mooving": "2d98aeaa-3759-807f-955f-e439615a02d4",    # Mooving Board
+    "feedback": os.environ.get(                            # Factory Feedback
+        "NOTION_FEEDBACK_DATABASE", "2ef8aeaa-3759-80fd-ac7e-fe6253f444f5"
+    ),
 }
 
 # Valid options for Moovs Tickets
@@ -42,7 +90,9 @@ TASK_PRIORITY = ["Low", "Medium", "High"]
 
 
 def get_notion_token() -> str:
-    """Get Notion token from Claude config."""
+    """Get Notion token from NOTION_TOKEN or the Claude config."""
+    if os.environ.get("NOTION_TOKEN"):
+        return os.environ["NOTION_TOKEN"]
     config_path = os.path.expanduser("~/.claude.json")
     try:
         with open(config_path, 'r') as f:
@@ -57,25 +107,294 @@ def get_notion_token() -> str:
     raise RuntimeError("Notion token not found in ~/.claude.json")
 
 
+_rate_limiters: Dict[str, SharedTokenBucket] = {}
+_registry_lock = threading.Lock()
+
+
+def get_rate_limiter(token: str) -> Optional[SharedTokenBucket]:
+    """The shared token bucket for a token, or None when rate limiting is off."""
+    if RATE_LIMIT <= 0:
+        return None
+    key = token_key(token)
+    with _registry_lock:
+        if key not in _rate_limiters:
+            _rate_limiters[key] = SharedTokenBucket(key, RATE_LIMIT, RATE_BURST, os.path.join(CACHE_DIR, "ratelimit"))
+        return _rate_limiters[key]
+
+
+_controllers: Dict[str, AIMDController] = {}
+
+
+def get_concurrency_controller(token: str) -> AIMDController:
+    """The adaptive in-flight window for a token."""
+    key = token_key(token)
+    with _registry_lock:
+        if key not in _controllers:
+            _controllers[key] = AIMDController(maximum=MAX_CONCURRENCY)
+        return _controllers[key]
+
+
+def set_rate_limit(rate: float, burst: float = None):
+    """Change the shared rate limit for this process (0 disables it)."""
+    global RATE_LIMIT, RATE_BURST
+    RATE_LIMIT = rate
+    RATE_BURST = burst if burst is not None else RATE_BURST
+    with _registry_lock:
+        _rate_limiters.clear()
+
+
+def document_lock(key: str) -> DocumentLock:
+    """Cross-process lock for syncing one document, keyed by path or title (see notion_singleflight)."""
+    return DocumentLock(key, os.path.join(CACHE_DIR, "locks"))
+
+
+def is_read_request(method: str, endpoint: str) -> bool:
+    """True for requests that never modify Notion (GETs and database queries)."""
+    return method == "GET" or (method == "POST" and endpoint_template(endpoint) == "/databases/{id}/query")
+
+
+def _retry_delay(headers: Dict[str, str], attempt: int) -> float:
+    """Seconds to wait before retrying: Retry-After if given, else exponential backoff."""
+    retry_after = next((value for name, value in headers.items() if name.lower() == "retry-after"), None)
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        return RETRY_BACKOFF * (2 ** attempt)
+
+
+class NotionAPIError(RuntimeError):
+    """A non-2xx response from the Notion API (after any retries)."""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"Notion API error: {status} - {body}")
+        self.status = status
+
+
+class IncompletePageError(RuntimeError):
+    """A page was created, but adding the rest of its content failed.
+
+    Creating it again would duplicate it; .page is the created page.
+    """
+
+    def __init__(self, page: Dict[str, Any], error: Exception):
+        super().__init__(f"Page {page.get('id')} was created but is incomplete: {error}")
+        self.page = page
+
+
+# (method, endpoint, headers, payload, timeout=seconds) -> (status, response headers, body)
+Transport = Callable[..., Tuple[int, Dict[str, str], bytes]]
+
+
+def urllib_transport(method: str, endpoint: str, headers: Dict[str, str], payload: Optional[bytes], timeout: float = None) -> Tuple[int, Dict[str, str], bytes]:
+    """Send one HTTP request to API_BASE; returns (status, response headers, body)."""
+    req = urllib.request.Request(f"{API_BASE}{endpoint}", data=payload, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout or attempt_timeout()) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers or {}), e.read()
+
+
+_transport: Transport = urllib_transport
+
+
+def get_transport() -> Transport:
+    """The transport notion_request currently sends requests through."""
+    return _transport
+
+
+def set_transport(transport: Transport) -> Transport:
+    """Replace the transport used by notion_request (e.g. cassette record/replay).
+
+    Returns the previous transport so callers can wrap or restore it.
+    """
+    global _transport
+    previous, _transport = _transport, transport
+    return previous
+
+
+def _in_context(func: Callable) -> Callable:
+    """Wrap func to run in this thread's priority lane and under its deadline.
+
+    Both are thread-local, so work handed to other threads (pools, hedges)
+    needs them carried over, as WriteScheduler does for its jobs.
+    """
+    lane, until = current_lane(), current_deadline()
+
+    def run(*args, **kwargs):
+        with priority_lane(lane), deadline_until(until):
+            return func(*args, **kwargs)
+
+    return run
+
+
+# Identical reads in flight at the same time share one request
+_reads = SingleFlight()
+
+# Hedged reads sent so far (see notion_timeouts)
+_hedged = 0
+_hedged_lock = threading.Lock()
+
+_read_cache: Optional[ResponseCache] = None
+
+
+def set_read_cache(mode: str, ttl: float = None) -> Optional[ResponseCache]:
+    """Cache reads "off", in "memory" or on "disk" (NOTION_CACHE_DIR/responses.db) too."""
+    global _read_cache
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Unknown read cache mode: {mode}")
+    ttl = READ_CACHE_TTL if ttl is None else ttl
+    path = os.path.join(CACHE_DIR, "responses.db") if mode == "disk" else None
+    _read_cache = ResponseCache(ttl, path=path) if mode != "off" and ttl > 0 else None
+    return _read_cache
+
+
+def get_read_cache() -> Optional[ResponseCache]:
+    """The read cache notion_request uses, or None when caching is off."""
+    return _read_cache
+
+
+set_read_cache(READ_CACHE if READ_CACHE in CACHE_MODES else "memory")
+
+
 def notion_request(method: str, endpoint: str, token: str, data: dict = None) -> dict:
-    """Make a request to the Notion API."""
-    url = f"https://api.notion.com/v1{endpoint}"
+    """Make a request to the Notion API.
+
+    Each attempt waits for a slot in the adaptive concurrency window and a
+    token from the shared rate limiter. 429
+    responses are retried after Retry-After, which also pauses the limiter
+    for other processes. 5xx responses are retried only for reads, since a
+    failed write may still have been applied. Every call emits one request
+    event to notion_metrics hooks.
+
+    Reads are served from the read cache when fresh (see notion_readcache);
+    writes invalidate the cached reads of the pages and blocks they touch,
+    even when they fail. A read identical to one already in flight (same
+    token, endpoint and body) waits for that request and gets its own copy
+    of the response instead of sending another.
+    """
+    payload = json.dumps(data).encode('utf-8') if data else None
+    cache = _read_cache
+    if not is_read_request(method, endpoint):
+        try:
+            result = json.loads(_send(method, endpoint, token, payload).decode('utf-8'))
+        except Exception:
+            if cache:
+                cache.invalidate(request_tags(endpoint, data, None))
+            raise
+        if cache:
+            cache.invalidate(request_tags(endpoint, data, result))
+        return result
+
+    key = ResponseCache.key(token_key(token), method, endpoint, payload)
+    body = cache.get(key) if cache else None
+    if body is not None:
+        METRICS.set_gauge("read_cache_hits", cache.hits)
+    else:
+        body = _reads.do(key, _fetch, cache, key, method, endpoint, token, payload, data)
+        if _reads.coalesced:
+            METRICS.set_gauge("coalesced_reads", _reads.coalesced)
+    return json.loads(body.decode('utf-8'))
+
+
+def _fetch(cache: Optional[ResponseCache], key: str, method: str, endpoint: str, token: str, payload: Optional[bytes], data: Optional[dict]) -> bytes:
+    """Send a read and cache its response."""
+    generation = cache.generation() if cache else None
+    body = _send(method, endpoint, token, payload)
+    if cache:
+        cache.put(key, body, request_tags(endpoint, data, json.loads(body.decode('utf-8'))), generation)
+    return body
+
+
+def _send(method: str, endpoint: str, token: str, payload: Optional[bytes]) -> bytes:
+    """Send one request with retries; returns the 2xx response body."""
     headers = {
         "Authorization": f"Bearer {token}",
         "Notion-Version": "2022-06-28",
         "Content-Type": "application/json"
     }
 
-    req = urllib.request.Request(url, method=method, headers=headers)
-    if data:
-        req.data = json.dumps(data).encode('utf-8')
+    event = {
+        "method": method,
+        "endpoint": endpoint_template(endpoint),
+        "status": 0,
+        "bytes_out": 0,
+        "bytes_in": 0,
+        "retries": 0,
+        "rate_limit_wait": 0.0,
+        "limiter_wait": 0.0,
+        "lane": current_lane(),
+    }
+    limiter = get_rate_limiter(token)
+    controller = get_concurrency_controller(token)
+    lane = event["lane"]
+    read = is_read_request(method, endpoint)
+    start = time.perf_counter()
+
+    def attempt() -> Tuple[int, Dict[str, str], bytes]:
+        timeout = attempt_timeout()
+        sent = time.perf_counter()
+        response = _transport(method, endpoint, headers, payload, timeout=timeout)
+        LATENCIES.observe(method, event["endpoint"], time.perf_counter() - sent)
+        return response
+
+    def hedge():
+        global _hedged
+        event["hedged"] = 1
+        with _hedged_lock:
+            _hedged += 1
+            METRICS.set_gauge("hedged_requests", _hedged)
+        event["bytes_out"] += len(payload or b"")
+        if limiter:
+            event["limiter_wait"] += limiter.acquire(lane)
 
     try:
-        with urllib.request.urlopen(req) as response:
-            return json.loads(response.read().decode('utf-8'))
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8')
-        raise RuntimeError(f"Notion API error: {e.code} - {error_body}")
+        while True:
+            check_deadline(f"{method} {event['endpoint']}")
+            controller.acquire(lane)
+            status = None
+            try:
+                if limiter:
+                    event["limiter_wait"] += limiter.acquire(lane)
+                check_deadline(f"{method} {event['endpoint']}")
+                event["bytes_out"] += len(payload or b"")
+                sent = time.perf_counter()
+                delay = hedge_delay(method, event["endpoint"]) if read else None
+                try:
+                    if delay is None:
+                        status, response_headers, body = attempt()
+                    else:
+                        (status, response_headers, body), _ = hedged_call(_in_context(attempt), delay, before_hedge=hedge)
+                except OSError as e:
+                    # Timed-out reads are retried; a timed-out write may have been applied
+                    if not (read and is_timeout(e) and event["retries"] < MAX_RETRIES):
+                        raise
+                    event["retries"] += 1
+                    continue
+            finally:
+                controller.release(status, time.perf_counter() - sent if status else None)
+            event["status"] = status
+            event["bytes_in"] += len(body)
+            if 200 <= status < 300:
+                return body
+
+            retryable = status == 429 or (status >= 500 and read)
+            if retryable and event["retries"] < MAX_RETRIES:
+                delay = _retry_delay(response_headers, event["retries"])
+                left = remaining()
+                if left is not None and delay >= left:
+                    raise DeadlineExceeded(f"Deadline exceeded: {status} response, {delay:.1f}s retry wait but {left:.1f}s left")
+                if status == 429:
+                    event["rate_limit_wait"] += delay
+                    if limiter:
+                        limiter.penalize(delay)
+                event["retries"] += 1
+                time.sleep(delay)
+                continue
+            raise NotionAPIError(status, body.decode('utf-8', 'replace'))
+    finally:
+        event["latency"] = time.perf_counter() - start
+        emit_request(event)
 
 
 def parse_inline_formatting(text: str) -> List[Dict[str, Any]]:
@@ -122,6 +441,7 @@ def parse_inline_formatting(text: str) -> List[Dict[str, Any]]:
     return rich_text
 
 
+@traced("markdown_to_blocks")
 def markdown_to_blocks(markdown: str) -> List[Dict[str, Any]]:
     """Convert markdown to Notion block objects."""
     blocks = []
@@ -271,76 +591,475 @@ def markdown_to_blocks(markdown: str) -> List[Dict[str, Any]]:
     return blocks
 
 
-def create_page(token: str, database_id: str, properties: Dict[str, Any], blocks: List[Dict] = None) -> Dict:
-    """Create a new page in a Notion database."""
+def split_sections(blocks: List[Dict]) -> Tuple[List[Dict], List[Tuple[str, List[Dict]]]]:
+    """Split blocks at H2 headings.
+
+    Returns (blocks before the first H2, [(heading text, blocks under it)]).
+    """
+    intro: List[Dict] = []
+    sections: List[Tuple[str, List[Dict]]] = []
+    for block in blocks:
+        if block.get("type") == "heading_2":
+            title = "".join(part.get("text", {}).get("content", "") for part in block["heading_2"].get("rich_text", []))
+            sections.append((title.strip() or "Untitled", []))
+        elif sections:
+            sections[-1][1].append(block)
+        else:
+            intro.append(block)
+    return intro, sections
+
+
+def split_documents(markdown: str) -> List[str]:
+    """Split a markdown bundle into documents at top-level H1 headings.
+
+    Headings inside code fences don't split. Text before the first H1
+    belongs to the first document rather than becoming a page of its own.
+    """
+    documents: List[List[str]] = [[]]
+    in_code = False
+    seen_h1 = False
+    for line in markdown.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        elif not in_code and line.startswith("# "):
+            if seen_h1:
+                documents.append([])
+            seen_h1 = True
+        documents[-1].append(line)
+    return ["\n".join(lines).strip() + "\n" for lines in documents if "".join(lines).strip()]
+
+
+def create_page(
+    token: str,
+    database_id: str,
+    properties: Dict[str, Any],
+    blocks: List[Dict] = None,
+    split_over: int = None,
+    deadline: float = None,
+) -> Dict:
+    """Create a new page in a Notion database.
+
+    With split_over, a body of more than split_over blocks is split at H2
+    headings: each section becomes a child page (listed in the parent in
+    document order) and the children upload concurrently. The result then
+    has a "subpages" list of the created child pages.
+
+    deadline is a budget in seconds for the whole upload (see
+    notion_timeouts); requests still unsent when it passes raise
+    DeadlineExceeded.
+    """
+    with request_deadline(deadline):
+        return _create_page(token, {"database_id": database_id}, properties, blocks, split_over)
+
+
+def create_child_page(
+    token: str,
+    parent_id: str,
+    title: str,
+    blocks: List[Dict] = None,
+    split_over: int = None,
+    deadline: float = None,
+) -> Dict:
+    """Create a page under a parent page (split_over and deadline as in create_page)."""
+    with request_deadline(deadline):
+        return _create_page(token, {"page_id": parent_id}, {"title": title_property(title)["title"]}, blocks, split_over)
+
+
+# Set by notion_spool.enable_spool: (spool, mode)
+_spool: Optional[Tuple[Any, str]] = None
+
+# Errors after which a page creation can safely be retried later
+UNAVAILABLE_STATUSES = (429, 502, 503, 504)
+
+
+def set_spool(spool: Any, mode: str):
+    """Spool page creations: mode "always" (offline) or "on-error" (Notion unreachable)."""
+    global _spool
+    _spool = (spool, mode) if spool and mode != "off" else None
+
+
+def is_offline() -> bool:
+    """True when page creations go straight to the spool (--offline): nothing may call Notion."""
+    return bool(_spool) and _spool[1] == "always"
+
+
+def is_unavailable(error: Exception) -> bool:
+    """True for errors that mean Notion could not be reached or is overloaded.
+
+    Read timeouts don't count: the request may have been applied.
+    """
+    if isinstance(error, NotionAPIError):
+        return error.status in UNAVAILABLE_STATUSES
+    if isinstance(error, TimeoutError) and not isinstance(error, DeadlineExceeded):
+        return False
+    return isinstance(error, OSError)
+
+
+def _create_page(token: str, parent: Dict[str, str], properties: Dict[str, Any], blocks: Optional[List[Dict]], split_over: Optional[int]) -> Dict:
+    """Create a page under any parent, splitting the body as in create_page.
+
+    With a spool enabled (see notion_spool), the full page payload is stored
+    locally instead: always (offline), or when Notion can't be reached to
+    create the page. The result then has "spooled" (the spool item ID) and
+    no id.
+    """
+    page = {"parent": parent, "properties": properties, "blocks": blocks or [], "split_over": split_over}
+    if not _spool:
+        return upload_page(token, page)
+
+    spool, mode = _spool
+
+    def spooled(error: Exception = None) -> Dict:
+        if error:
+            print(f"Notion unavailable ({error}); spooling the page for flush-spool.py", file=sys.stderr)
+        return {"object": "page", "id": None, "url": None, "spooled": spool.add(page)}
+
+    if mode == "always":
+        return spooled()
+    return upload_page(token, page, on_unavailable=spooled)
+
+
+def upload_page(token: str, page: Dict[str, Any], on_unavailable: Callable = None) -> Dict:
+    """Create a page from a payload of parent, properties, blocks and split_over.
+
+    If Notion is unavailable (see is_unavailable) before the page exists,
+    returns on_unavailable(error) instead of raising. Later failures raise
+    IncompletePageError: retrying them would create a duplicate page.
+    """
+    parent, properties, split_over = page["parent"], page["properties"], page.get("split_over")
+    blocks = page.get("blocks") or []
+    intro, sections = blocks, []
+    if split_over and len(blocks) > split_over:
+        intro, sections = split_sections(blocks)
+
     page_data = {
-        "parent": {"database_id": database_id},
+        "parent": parent,
         "properties": properties,
     }
 
-    if blocks:
+    if intro:
         # Add first batch of blocks (max 100)
-        page_data["children"] = blocks[:100]
-
-    result = notion_request("POST", "/pages", token, page_data)
-
-    # If there are more blocks, append them in batches
-    if blocks and len(blocks) > 100:
-        page_id = result["id"]
-        for i in range(100, len(blocks), 100):
-            batch = blocks[i:i+100]
-            notion_request("PATCH", f"/blocks/{page_id}/children", token, {"children": batch})
+        page_data["children"] = intro[:100]
+
+    with span("create_page", blocks=len(blocks), subpages=len(sections)):
+        try:
+            result = notion_request("POST", "/pages", token, page_data)
+        except (NotionAPIError, OSError) as e:
+            if on_unavailable and is_unavailable(e):
+                return on_unavailable(e)
+            raise
+
+        try:
+            if not sections:
+                # If there are more blocks, append them in batches
+                if len(blocks) > 100:
+                    append_blocks(token, result["id"], blocks[100:])
+                return result
+
+            # The rest of the intro and the child page creations share the
+            # parent's queue, so the child page links follow the intro in
+            # document order. Each child's own appends run in parallel.
+            page_id = result["id"]
+            with WriteScheduler() as scheduler:
+                scheduler.append_blocks(token, page_id, intro[100:])
+                subpages = [scheduler.create_child_page(token, page_id, title, section) for title, section in sections]
+            result["subpages"] = [future.result() for future in subpages]
+        except Exception as e:
+            raise IncompletePageError(result, e) from e
 
     return result
 
 
-def update_page(token: str, page_id: str, properties: Dict[str, Any] = None, blocks: List[Dict] = None, replace_blocks: bool = False) -> Dict:
-    """Update an existing Notion page."""
+def append_blocks(token: str, block_id: str, blocks: List[Dict]):
+    """Append blocks to a page or block in batches of 100, preserving order."""
+    for i in range(0, len(blocks), 100):
+        batch = blocks[i:i + 100]
+        with span("append_batch", batch=i // 100, blocks=len(batch)):
+            notion_request("PATCH", f"/blocks/{block_id}/children", token, {"children": batch})
+
+
+def list_children(token: str, block_id: str) -> List[Dict]:
+    """List every child block of a page or block, following pagination."""
+    children = []
+    cursor = None
+    while True:
+        params = {"page_size": 100}
+        if cursor:
+            params["start_cursor"] = cursor
+        result = notion_request("GET", f"/blocks/{block_id}/children?{urllib.parse.urlencode(params)}", token)
+        children.extend(result.get("results", []))
+        cursor = result.get("next_cursor")
+        if not result.get("has_more") or not cursor:
+            return children
+
+
+def delete_children(token: str, block_id: str) -> Dict[str, Any]:
+    """Delete every child block of a page or block.
+
+    Children are listed first, then deleted concurrently; the adaptive
+    concurrency window in notion_request decides how many run at once.
+    Returns {"deleted": count, "failed": {block_id: error}}.
+    """
+    with span("delete_blocks") as trace:
+        children = list_children(token, block_id)
+
+        def delete(child: Dict) -> Optional[str]:
+            try:
+                notion_request("DELETE", f"/blocks/{child['id']}", token)
+                return None
+            except (RuntimeError, OSError) as e:
+                return str(e)
+
+        failed = {}
+        with ThreadPoolExecutor(max_workers=max(1, MAX_CONCURRENCY)) as pool:
+            for child, error in zip(children, pool.map(_in_context(delete), children)):
+                if error:
+                    failed[child["id"]] = error
+        trace["deleted"] = len(children) - len(failed)
+    return {"deleted": len(children) - len(failed), "failed": failed}
+
+
+def update_page(
+    token: str,
+    page_id: str,
+    properties: Dict[str, Any] = None,
+    blocks: List[Dict] = None,
+    replace_blocks: bool = False,
+    deadline: float = None,
+) -> Dict:
+    """Update an existing Notion page (deadline as in create_page)."""
+    with request_deadline(deadline):
+        return _update_page(token, page_id, properties, blocks, replace_blocks)
+
+
+def _update_page(token: str, page_id: str, properties: Optional[Dict[str, Any]], blocks: Optional[List[Dict]], replace_blocks: bool) -> Dict:
     result = None
 
     # Update properties if provided
     if properties:
-        result = notion_request("PATCH", f"/pages/{page_id}", token, {"properties": properties})
+        with span("update_properties"):
+            result = notion_request("PATCH", f"/pages/{page_id}", token, {"properties": properties})
 
     # Handle blocks
     if blocks:
         if replace_blocks:
             # Delete all existing blocks first
-            has_more = True
-            while has_more:
-                existing = notion_request("GET", f"/blocks/{page_id}/children?page_size=100", token)
-                for block in existing.get("results", []):
-                    try:
-                        notion_request("DELETE", f"/blocks/{block['id']}", token)
-                    except:
-                        pass
-                has_more = existing.get("has_more", False)
+            delete_children(token, page_id)
 
         # Add new blocks in batches
-        for i in range(0, len(blocks), 100):
-            batch = blocks[i:i+100]
-            notion_request("PATCH", f"/blocks/{page_id}/children", token, {"children": batch})
+        append_blocks(token, page_id, blocks)
 
     return result or {"id": page_id, "status": "updated"}
 
 
+def query_database(
+    token: str,
+    database_id: str,
+    filter_: Dict = None,
+    sorts: List[Dict] = None,
+    filter_properties: List[str] = None,
+    page_size: int = 100,
+    prefetch: bool = True,
+) -> Iterator[Dict]:
+    """Iterate over every page matching a database query.
+
+    Follows has_more/next_cursor lazily, fetching the next page of results in
+    the background while the caller processes the current one. Pass
+    filter_properties (property names or IDs) to only return those properties.
+    Set prefetch=False when the caller will likely stop after the first page.
+    """
+    endpoint = f"/databases/{database_id}/query"
+    if filter_properties:
+        endpoint += "?" + urllib.parse.urlencode([("filter_properties", p) for p in filter_properties])
+
+    def fetch(cursor: Optional[str]) -> Dict:
+        data = {"page_size": page_size}
+        if filter_:
+            data["filter"] = filter_
+        if sorts:
+            data["sorts"] = sorts
+        if cursor:
+            data["start_cursor"] = cursor
+        return notion_request("POST", endpoint, token, data)
+
+    if not prefetch:
+        cursor = None
+        while True:
+            result = fetch(cursor)
+            yield from result.get("results", [])
+            cursor = result.get("next_cursor")
+            if not result.get("has_more") or not cursor:
+                return
+
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        pending = prefetcher.submit(_in_context(fetch), None)
+        while pending:
+            result = pending.result()
+            cursor = result.get("next_cursor")
+            pending = prefetcher.submit(_in_context(fetch), cursor) if result.get("has_more") and cursor else None
+            yield from result.get("results", [])
+
+
 def search_in_database(token: str, database_id: str, title: str) -> Optional[str]:
     """Search for a page with a given title in a database."""
-    data = {
-        "filter": {
-            "property": "title",
-            "title": {"equals": title}
-        }
+    title_filter = {
+        "property": "title",
+        "title": {"equals": title}
     }
     try:
-        result = notion_request("POST", f"/databases/{database_id}/query", token, data)
-        if result.get("results") and len(result["results"]) > 0:
-            return result["results"][0]["id"]
+        for page in query_database(token, database_id, filter_=title_filter, page_size=1, prefetch=False):
+            return page["id"]
     except:
         pass
     return None
 
 
+class WriteScheduler:
+    """Runs write jobs in order per key (page or block ID), concurrently across keys.
+
+    Each key has a FIFO queue; idle workers take the next job from keys in
+    round-robin order, never running two jobs for the same key at once. So
+    appends to one page stay ordered while many pages share the rate budget.
+    When a job fails, the jobs still queued behind it for that key fail too
+    rather than writing out of order. Jobs run in the priority lane and
+    under the deadline they were submitted with.
+
+    Jobs may submit follow-up jobs (even while the scheduler is closing)
+    but must not wait on other jobs of the same scheduler.
+
+        with WriteScheduler() as scheduler:
+            for page_id, blocks in pages.items():
+                scheduler.append_blocks(token, page_id, blocks)
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or MAX_CONCURRENCY
+        self._queues: Dict[str, deque] = {}
+        self._ready: deque = deque()   # keys with queued jobs and no running job
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running = 0
+        self._closed = False
+
+    def submit(self, key: str, func: Callable, *args, **kwargs) -> Future:
+        """Queue func(*args, **kwargs) behind earlier jobs for key."""
+        future = Future()
+        with self._cond:
+            if self._closed and threading.current_thread() not in self._threads:
+                raise RuntimeError("WriteScheduler is closed")
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = deque()
+                self._ready.append(key)
+            queue.append((future, (current_lane(), current_deadline()), func, args, kwargs))
+            if len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"notion-writer-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+        return future
+
+    def append_blocks(self, token: str, block_id: str, blocks: List[Dict]) -> List[Future]:
+        """Queue 100-block append batches for a page or block."""
+        return [
+            self.submit(block_id, append_blocks, token, block_id, blocks[i:i + 100])
+            for i in range(0, len(blocks), 100)
+        ]
+
+    def create_child_page(self, token: str, parent_id: str, title: str, blocks: List[Dict] = None) -> Future:
+        """Queue a page creation under parent_id, then the rest of its blocks.
+
+        Creations share the parent's queue, so the parent lists its child
+        pages in submission order; each child's appends get its own queue.
+        A failed creation only fails its own future, not the siblings queued
+        behind it. The future resolves to the page once all of its blocks
+        are written.
+        """
+        blocks = blocks or []
+        done = Future()
+
+        def finish(appends: List[Future], page: Dict):
+            error = next((append.exception() for append in appends if append.exception()), None)
+            if error:
+                done.set_exception(error)
+            else:
+                done.set_result(page)
+
+        def create() -> Optional[Dict]:
+            page_data = {
+                "parent": {"page_id": parent_id},
+                "properties": {"title": title_property(title)["title"]},
+            }
+            if blocks:
+                page_data["children"] = blocks[:100]
+            try:
+                page = notion_request("POST", "/pages", token, page_data)
+            except Exception as e:
+                done.set_exception(e)
+                return None
+            appends = self.append_blocks(token, page["id"], blocks[100:])
+            if appends:
+                # The last append finishes after (or fails with) the others
+                appends[-1].add_done_callback(lambda _: finish(appends, page))
+            else:
+                done.set_result(page)
+            return page
+
+        created = self.submit(parent_id, create)
+        # Skipped behind a failed write to the parent
+        created.add_done_callback(lambda future: future.exception() and done.set_exception(future.exception()))
+        return done
+
+    def _work(self):
+        while True:
+            with self._cond:
+                # Running jobs may still queue follow-ups, so only stop when idle
+                while not self._ready and not (self._closed and not self._running):
+                    self._cond.wait()
+                if not self._ready:
+                    return
+                key = self._ready.popleft()
+                future, (lane, until), func, args, kwargs = self._queues[key].popleft()
+                self._running += 1
+
+            failed = False
+            if future.set_running_or_notify_cancel():
+                try:
+                    with priority_lane(lane), deadline_until(until):
+                        future.set_result(func(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+                    failed = True
+
+            with self._cond:
+                self._running -= 1
+                queue = self._queues[key]
+                if failed:
+                    while queue:
+                        queue.popleft()[0].set_exception(RuntimeError(f"Skipped: an earlier write for {key} failed"))
+                if queue:
+                    self._ready.append(key)
+                else:
+                    del self._queues[key]
+                self._cond.notify_all()
+
+    def close(self, wait: bool = True):
+        """Stop accepting jobs; with wait, block until every queued job has run."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
 # Property builders for common types
 def title_property(text: str) -> Dict:
     """Build a title property."""
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Adaptive (AIMD) concurrency control for Notion requests.
+
+The controller bounds how many requests are in flight at once. Like TCP
+congestion control it grows the window additively while responses are
+healthy (about +1 per window's worth of successes) and halves it on a 429
+or when latency rises well above its running baseline. Bulk jobs that fan
+out across threads therefore settle at the highest sustainable concurrency
+for the current workspace load instead of a fixed guess.
+
+When the window is full, free slots go to the waiter with the best
+priority lane (see notion_priority), with aging so bulk work still runs.
+
+The current window is published to notion_metrics as the
+concurrency_window gauge.
+"""
+
+import time
+import threading
+from typing import Optional, List
+
+from notion_metrics import METRICS
+from notion_priority import AGING_SECONDS, current_lane, effective_rank
+
+
+class _Waiter:
+    __slots__ = ("lane", "since")
+
+    def __init__(self, lane: str):
+        self.lane = lane
+        self.since = time.monotonic()
+
+
+class AIMDController:
+    """In-flight request limit with additive increase, multiplicative decrease."""
+
+    def __init__(
+        self,
+        initial: float = 2.0,
+        minimum: float = 1.0,
+        maximum: float = 8.0,
+        decrease: float = 0.5,
+        latency_factor: float = 2.5,
+    ):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.window = min(max(initial, minimum), self.maximum)
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.in_flight = 0
+        self.baseline: Optional[float] = None  # slow moving average of healthy latency
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self._waiters: List[_Waiter] = []
+        self._publish()
+
+    def _publish(self):
+        METRICS.set_gauge("concurrency_window", self.window)
+
+    def acquire(self, lane: Optional[str] = None):
+        """Wait for a free slot in the window, served in priority-lane order."""
+        waiter = _Waiter(lane or current_lane())
+        with self._cond:
+            self._waiters.append(waiter)
+            try:
+                while self.in_flight >= int(self.window) or self._next_waiter() is not waiter:
+                    # Time out to re-rank waiters as they age
+                    self._cond.wait(AGING_SECONDS)
+                self.in_flight += 1
+            finally:
+                self._waiters.remove(waiter)
+                self._cond.notify_all()
+
+    def _next_waiter(self):
+        now = time.monotonic()
+        return min(self._waiters, key=lambda waiter: (effective_rank(waiter.lane, now - waiter.since), waiter.since))
+
+    def release(self, status: Optional[int] = None, latency: Optional[float] = None):
+        """Free a slot, adjusting the window from the response (None = no feedback)."""
+        with self._cond:
+            self.in_flight -= 1
+            if status is not None:
+                self._adjust(status, latency or 0.0)
+            self._cond.notify_all()
+
+    def _adjust(self, status: int, latency: float):
+        congested = status == 429 or (
+            self.baseline is not None and 200 <= status < 300 and latency > self.baseline * self.latency_factor
+        )
+        if congested:
+            # Only requests sent after the last decrease count, so one burst
+            # of 429s from a single window halves it once, not to the minimum
+            now = time.monotonic()
+            if now - latency >= self._last_decrease:
+                self.window = max(self.minimum, self.window * self.decrease)
+                self._last_decrease = now
+                self._publish()
+            return
+
+        if 200 <= status < 300:
+            self.baseline = latency if self.baseline is None else self.baseline * 0.95 + latency * 0.05
+            if self.window < self.maximum:
+                self.window = min(self.maximum, self.window + 1.0 / self.window)
+                self._publish()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Local duplicate detection for new Notion pages.
+
+Provides:
+- A SQLite FTS5 index over titles and bodies of mirrored pages
+- MinHash signatures of body word shingles for near-duplicate scoring
+- check_duplicates() for create-* scripts, with no search API calls
+
+The index lives next to the mirror snapshots and is rebuilt automatically
+whenever a snapshot is newer than it. Run mirror-databases.py (with
+--with-content to include page bodies) to keep it current.
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import hashlib
+from array import array
+from datetime import datetime
+from typing import Optional, Dict, List, Any
+
+from notion_client import append_blocks, markdown_to_blocks
+from notion_mirror import MIRROR_DIR, iter_snapshot, load_state, snapshot_path
+
+
+INDEX_FILENAME = "search.db"
+NUM_PERMUTATIONS = 64
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.6
+TITLE_PROPERTIES = ("Name", "Task Name", "title")
+TITLE_WEIGHT = 5.0           # bm25 weight of title matches relative to body matches
+MAX_BODY_QUERY_WORDS = 20    # body words added to the candidate query
+MAX_CANDIDATES = 100         # FTS matches scored with MinHash
+
+_EMPTY_BIN = (1 << 64) - 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, with markdown punctuation stripped."""
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Word shingles of a text; short texts fall back to their words."""
+    words = tokenize(text)
+    if len(words) < size:
+        return set(words)
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(features: set) -> array:
+    """One-permutation MinHash signature of a shingle set.
+
+    Each shingle is hashed once and kept as the minimum of one of
+    NUM_PERMUTATIONS bins, so signing is linear in the number of shingles.
+    """
+    signature = array('Q', [_EMPTY_BIN] * NUM_PERMUTATIONS)
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        slot = h % NUM_PERMUTATIONS
+        if h < signature[slot]:
+            signature[slot] = h
+    return signature
+
+
+def estimate_similarity(left: array, right: array) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures (ignoring bins empty in both)."""
+    used = matching = 0
+    for x, y in zip(left, right):
+        if x == _EMPTY_BIN and y == _EMPTY_BIN:
+            continue
+        used += 1
+        matching += x == y
+    return matching / used if used else 0.0
+
+
+def _title_similarity(left: str, right: str) -> float:
+    left_words, right_words = set(tokenize(left)), set(tokenize(right))
+    if not left_words or not right_words:
+        return 0.0
+    return len(left_words & right_words) / len(left_words | right_words)
+
+
+def _record_title(record: Dict[str, Any]) -> str:
+    properties = record.get("properties", {})
+    for name in TITLE_PROPERTIES:
+        if properties.get(name):
+            return properties[name]
+    return ""
+
+
+def index_path(mirror_dir: str = MIRROR_DIR) -> str:
+    return os.path.join(mirror_dir, INDEX_FILENAME)
+
+
+def _snapshot_mtime(name: str, mirror_dir: str) -> float:
+    fmt = load_state(name, mirror_dir).get("format", "jsonl")
+    path = snapshot_path(name, fmt, mirror_dir)
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+
+def build_index(databases: List[str], mirror_dir: str = MIRROR_DIR) -> int:
+    """(Re)build the full-text and signature index for mirrored databases."""
+    conn = sqlite3.connect(index_path(mirror_dir))
+    with conn:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(page_id UNINDEXED, database UNINDEXED, title, body)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS signatures ("
+            "page_id TEXT PRIMARY KEY, database TEXT, url TEXT, title TEXT, signature BLOB)"
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS indexed (database TEXT PRIMARY KEY, snapshot_mtime REAL)")
+
+        count = 0
+        for name in databases:
+            conn.execute("DELETE FROM docs WHERE database = ?", (name,))
+            conn.execute("DELETE FROM signatures WHERE database = ?", (name,))
+            for record in iter_snapshot(name, mirror_dir=mirror_dir):
+                title = _record_title(record)
+                body = record.get("text", "")
+                conn.execute(
+                    "INSERT INTO docs (page_id, database, title, body) VALUES (?, ?, ?, ?)",
+                    (record["id"], name, title, body),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO signatures (page_id, database, url, title, signature) VALUES (?, ?, ?, ?, ?)",
+                    (record["id"], name, record.get("url"), title, minhash(shingles(body or title)).tobytes()),
+                )
+                count += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO indexed (database, snapshot_mtime) VALUES (?, ?)",
+                (name, _snapshot_mtime(name, mirror_dir)),
+            )
+    conn.close()
+    return count
+
+
+def _ensure_index(database: str, mirror_dir: str) -> Optional[sqlite3.Connection]:
+    """Open the index, rebuilding it for the database if the snapshot changed.
+
+    Returns None when the database has never been mirrored.
+    """
+    snapshot_mtime = _snapshot_mtime(database, mirror_dir)
+    if not snapshot_mtime:
+        return None
+
+    indexed_mtime = None
+    if os.path.exists(index_path(mirror_dir)):
+        conn = sqlite3.connect(index_path(mirror_dir))
+        try:
+            row = conn.execute("SELECT snapshot_mtime FROM indexed WHERE database = ?", (database,)).fetchone()
+            indexed_mtime = row[0] if row else None
+        except sqlite3.OperationalError:
+            pass
+        conn.close()
+
+    if indexed_mtime != snapshot_mtime:
+        build_index([database], mirror_dir)
+    return sqlite3.connect(index_path(mirror_dir))
+
+
+def find_duplicates(
+    database: str,
+    title: str,
+    body: str = "",
+    threshold: float = DUPLICATE_THRESHOLD,
+    limit: int = 5,
+    mirror_dir: str = MIRROR_DIR,
+) -> List[Dict[str, Any]]:
+    """Find mirrored pages that likely duplicate a new page.
+
+    FTS5 narrows the database to the best keyword matches, weighting title
+    matches above body matches. Each candidate is scored by the higher of
+    title word overlap and MinHash-estimated body shingle similarity.
+    """
+    conn = _ensure_index(database, mirror_dir)
+    if conn is None:
+        return []
+
+    # Title words plus the first distinct longer words of the body
+    words = list(dict.fromkeys(tokenize(title)))
+    body_words = [word for word in dict.fromkeys(tokenize(body or "")) if len(word) > 3 and word not in words]
+    words += body_words[:MAX_BODY_QUERY_WORDS]
+    if not words:
+        return []
+    match = " OR ".join(f'"{word}"' for word in words)
+
+    try:
+        candidates = conn.execute(
+            "SELECT s.page_id, s.url, s.title, s.signature FROM docs "
+            "JOIN signatures s ON s.page_id = docs.page_id "
+            "WHERE docs MATCH ? AND docs.database = ? "
+            "ORDER BY bm25(docs, 0.0, 0.0, ?, 1.0) LIMIT ?",
+            (match, database, TITLE_WEIGHT, MAX_CANDIDATES),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    signature = minhash(shingles(body or title))
+    matches = []
+    for page_id, url, candidate_title, candidate_signature in candidates:
+        title_score = _title_similarity(title, candidate_title)
+        content_score = estimate_similarity(signature, array('Q', candidate_signature))
+        score = max(title_score, content_score)
+        if score >= threshold:
+            matches.append({
+                "page_id": page_id,
+                "url": url,
+                "title": candidate_title,
+                "score": round(score, 3),
+                "title_similarity": round(title_score, 3),
+                "content_similarity": round(content_score, 3),
+            })
+
+    matches.sort(key=lambda m: m["score"], reverse=True)
+    return matches[:limit]
+
+
+def check_duplicates(database: str, title: str, body: str = "", threshold: float = DUPLICATE_THRESHOLD) -> List[Dict[str, Any]]:
+    """Report likely duplicates of a new page on stderr and return them.
+
+    Never fails the caller: a missing or broken index just skips the check.
+    """
+    try:
+        duplicates = find_duplicates(database, title, body, threshold)
+    except (sqlite3.Error, OSError, RuntimeError) as e:
+        print(f"Warning: Duplicate check skipped: {e}", file=sys.stderr)
+        return []
+
+    if duplicates:
+        print(f"Possible duplicates of '{title}':", file=sys.stderr)
+        for match in duplicates:
+            print(f"  {match['score']:.2f}  {match['title']}  {match['url']}", file=sys.stderr)
+    return duplicates
+
+
+def append_to_duplicate(token: str, duplicate: Dict[str, Any], title: str, body: str = None) -> Dict[str, Any]:
+    """Append a new page's content to an existing duplicate instead of creating it."""
+    markdown = f"---\n### Appended: {title}\n*{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n\n{body or ''}"
+    append_blocks(token, duplicate["page_id"], markdown_to_blocks(markdown))
+    return {
+        "status": "appended",
+        "page_id": duplicate["page_id"],
+        "url": duplicate["url"],
+        "title": duplicate["title"],
+    }
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Dry runs: plan every Notion request a command would make without sending it.
+
+A dry run replaces the transport of notion_request, so parsing, markdown
+conversion, batching and scheduling run exactly as in a real run, but each
+request is written to an NDJSON plan instead of being sent. Responses are
+synthesized: created pages get placeholder IDs (so follow-up appends and
+child pages are planned too), and reads return empty results, so lookups
+behave as if nothing exists yet.
+
+Plan lines:
+    {"type": "request", "seq": 1, "method": "POST", "endpoint": "/pages",
+     "bytes": 41233, "blocks": 100, "problems": [], "body": {...}}
+    ...
+    {"type": "summary", "requests": 31, "writes": 31, "bytes": 1203311,
+     "estimated_seconds": 9.3, "warnings": [...], ...}
+
+The estimate is the largest of three lower bounds: the configured rate
+limit (per token, after the burst), the longest serial chain of writes to
+one page, and the total request time spread over MAX_CONCURRENCY requests
+in flight, assuming REQUEST_LATENCY per request.
+
+Requests are also checked against Notion's request limits (at most 100
+children per request, 2000 characters per rich text item, 500KB payloads),
+and pages that need many serial appends are reported as warnings.
+
+Usage:
+    python3 create-document.py spec.md --dry-run
+    python3 sync-tree.py --parent abc123 --dry-run --dry-run-output /tmp/sync-plan.ndjson
+"""
+
+import sys
+import json
+import uuid
+import threading
+from collections import Counter
+from typing import Optional, Dict, List, Any, Tuple, TextIO
+
+import notion_client
+from notion_client import is_read_request, set_transport, set_rate_limit
+from notion_metrics import endpoint_template
+from notion_priority import current_lane
+from notion_ratelimit import token_key
+
+
+REQUEST_LATENCY = 0.35  # seconds, typical for a Notion write
+MAX_CHILDREN = 100
+MAX_TEXT_LENGTH = 2000
+MAX_PAYLOAD_BYTES = 500_000
+WARN_BLOCKS = 1000  # blocks on one page before suggesting --split-over
+
+
+def _placeholder_id(seq: int) -> str:
+    return str(uuid.UUID(int=seq))
+
+
+def _rich_text_lengths(value: Any):
+    """Yield the length of every rich text content string in a payload."""
+    if isinstance(value, dict):
+        text = value.get("text")
+        if isinstance(text, dict) and isinstance(text.get("content"), str):
+            yield len(text["content"])
+        for item in value.values():
+            yield from _rich_text_lengths(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _rich_text_lengths(item)
+
+
+def check_request(data: Optional[Dict[str, Any]], size: int) -> List[str]:
+    """Problems Notion would reject a request body for."""
+    problems = []
+    children = (data or {}).get("children") or []
+    if len(children) > MAX_CHILDREN:
+        problems.append(f"{len(children)} children (limit {MAX_CHILDREN})")
+    longest = max(_rich_text_lengths(data), default=0)
+    if longest > MAX_TEXT_LENGTH:
+        problems.append(f"rich text of {longest} characters (limit {MAX_TEXT_LENGTH})")
+    if size > MAX_PAYLOAD_BYTES:
+        problems.append(f"{size} byte payload (limit {MAX_PAYLOAD_BYTES})")
+    return problems
+
+
+class DryRunTransport:
+    """Transport that writes each request to a plan and answers it locally."""
+
+    def __init__(self, output: TextIO, rate: float, burst: float, max_concurrency: int):
+        self.output = output
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.requests = 0
+        self.writes = 0
+        self.bytes = 0
+        self.blocks = 0
+        self.problems = 0
+        self.endpoints: Counter = Counter()
+        self.tokens: Counter = Counter()
+        self.chains: Counter = Counter()  # serial writes per page
+        self.page_blocks: Counter = Counter()
+
+    def __call__(self, method: str, endpoint: str, headers: Dict[str, str], payload: Optional[bytes], timeout: float = None) -> Tuple[int, Dict[str, str], bytes]:
+        data = json.loads(payload) if payload else None
+        size = len(payload or b"")
+        template = endpoint_template(endpoint.split("?")[0])
+        blocks = len((data or {}).get("children") or [])
+        problems = check_request(data, size)
+        read = is_read_request(method, endpoint)
+
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            response = self._response(method, endpoint, template, seq)
+            self.requests += 1
+            self.writes += 0 if read else 1
+            self.bytes += size
+            self.blocks += blocks
+            self.problems += len(problems)
+            self.endpoints[f"{method} {template}"] += 1
+            self.tokens[token_key(headers.get("Authorization", "").replace("Bearer ", ""))] += 1
+            if not read:
+                page = self._target(endpoint, template, response)
+                self.chains[page] += 1
+                self.page_blocks[page] += blocks
+
+            line = {
+                "type": "request",
+                "seq": seq,
+                "method": method,
+                "endpoint": endpoint,
+                "lane": current_lane(),
+                "bytes": size,
+                "blocks": blocks,
+                "problems": problems,
+                "body": data,
+            }
+            self.output.write(json.dumps(line, separators=(',', ':')) + '\n')
+            self.output.flush()
+        return 200, {}, json.dumps(response).encode('utf-8')
+
+    def _response(self, method: str, endpoint: str, template: str, seq: int) -> Dict[str, Any]:
+        if method == "POST" and template == "/pages":
+            page_id = _placeholder_id(seq)
+            return {"object": "page", "id": page_id, "url": f"https://www.notion.so/{page_id.replace('-', '')}"}
+        if template in ("/pages/{id}", "/blocks/{id}"):
+            object_id = endpoint.split("?")[0].split("/")[2]
+            obj = "page" if template == "/pages/{id}" else "block"
+            return {"object": obj, "id": object_id, "url": f"https://www.notion.so/{object_id.replace('-', '')}", "archived": method == "DELETE"}
+        return {"object": "list", "results": [], "has_more": False, "next_cursor": None}
+
+    def _target(self, endpoint: str, template: str, response: Dict[str, Any]) -> str:
+        """The page a write lands on: writes to one page run one after another."""
+        if template == "/pages":
+            return response["id"]
+        return endpoint.split("?")[0].split("/")[2]
+
+    def estimate(self) -> Dict[str, float]:
+        """Lower bounds on wall time, in seconds, and their maximum."""
+        rate_bound = 0.0
+        if self.rate > 0:
+            rate_bound = max([(count - self.burst) / self.rate for count in self.tokens.values()] + [0.0])
+        chain_bound = max(self.chains.values(), default=0) * REQUEST_LATENCY
+        concurrency_bound = self.requests * REQUEST_LATENCY / max(1, self.max_concurrency)
+        return {
+            "rate_limit": round(rate_bound, 1),
+            "serial_chain": round(chain_bound, 1),
+            "concurrency": round(concurrency_bound, 1),
+            "estimated_seconds": round(max(rate_bound, chain_bound, concurrency_bound), 1),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals, the wall time estimate and warnings for the whole plan."""
+        warnings = []
+        if self.problems:
+            warnings.append(f"{self.problems} request problem(s) Notion would reject; see the request lines")
+        for page, blocks in self.page_blocks.most_common():
+            if blocks <= WARN_BLOCKS:
+                break
+            warnings.append(
+                f"page {page} gets {blocks} blocks in {self.chains[page]} serial requests "
+                f"(~{self.chains[page] * REQUEST_LATENCY:.0f}s); consider --split-over"
+            )
+        estimate = self.estimate()
+        return {
+            "type": "summary",
+            "requests": self.requests,
+            "writes": self.writes,
+            "reads": self.requests - self.writes,
+            "bytes": self.bytes,
+            "blocks": self.blocks,
+            "pages": self.endpoints["POST /pages"],
+            "endpoints": dict(self.endpoints.most_common()),
+            "tokens": len(self.tokens),
+            "rate_limit": self.rate,
+            "rate_burst": self.burst,
+            "longest_chain": max(self.chains.values(), default=0),
+            "estimated_seconds": estimate.pop("estimated_seconds"),
+            "bounds": estimate,
+            "warnings": warnings,
+        }
+
+    def finish(self) -> Dict[str, Any]:
+        """Write the summary line and return it."""
+        summary = self.summary()
+        with self._lock:
+            self.output.write(json.dumps(summary, separators=(',', ':')) + '\n')
+            self.output.flush()
+            if self.output is not sys.__stdout__:
+                self.output.close()
+        return summary
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """One-paragraph human summary of a plan, for stderr."""
+    rate = f"{summary['rate_limit']:g} req/s" if summary["rate_limit"] > 0 else "no rate limit"
+    lines = [
+        f"Dry run: {summary['requests']} requests ({summary['writes']} writes, {summary['reads']} reads), "
+        f"{summary['bytes'] / 1024:.0f} KB, {summary['blocks']} blocks",
+        f"Estimated time: ~{summary['estimated_seconds']:g}s at {rate} "
+        f"(longest serial chain: {summary['longest_chain']} requests)",
+    ]
+    lines.extend(f"Warning: {warning}" for warning in summary["warnings"])
+    return "\n".join(lines) + "\n"
+
+
+def start_dry_run(path: str = "-") -> DryRunTransport:
+    """Plan every notion_request from now on instead of sending it.
+
+    path "-" writes the plan to stdout and moves the command's own stdout
+    output to stderr, so stdout is pure NDJSON.
+    """
+    if path == "-":
+        output = sys.stdout
+        sys.stdout = sys.stderr
+    else:
+        output = open(path, 'w')
+    transport = DryRunTransport(output, notion_client.RATE_LIMIT, notion_client.RATE_BURST, notion_client.MAX_CONCURRENCY)
+    set_transport(transport)
+    # Nothing is sent, so nothing needs to wait for the shared limiter
+    set_rate_limit(0)
+    return transport
+
+
+def is_dry_run() -> bool:
+    """True while requests are being planned instead of sent."""
+    return isinstance(notion_client.get_transport(), DryRunTransport)
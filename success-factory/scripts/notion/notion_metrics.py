@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Per-request instrumentation for notion_request.
+
+Provides:
+- Request hooks: every Notion API call emits one event dict
+- RequestMetrics: per-endpoint counters and latency histograms
+- Export as JSON or Prometheus textfile, and a plain-text breakdown
+
+Request events contain:
+    method, endpoint (template, e.g. /blocks/{id}/children), status,
+    bytes_out, bytes_in, latency (seconds), retries, rate_limit_wait (seconds
+    waiting on 429 Retry-After), limiter_wait (seconds waiting on the shared
+    rate limiter)
+"""
+
+import os
+import re
+import json
+import threading
+from collections import Counter
+from typing import Dict, List, Any, Callable
+
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_ID_PATTERN = re.compile(r"[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}")
+
+
+def endpoint_template(endpoint: str) -> str:
+    """Replace IDs and drop the query string, e.g. /blocks/{id}/children."""
+    return _ID_PATTERN.sub("{id}", endpoint.split("?")[0])
+
+
+class Histogram:
+    """Cumulative-bucket histogram, Prometheus style."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile: upper bound of the bucket holding it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, count in zip(self.buckets, self.counts):
+            if count >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class EndpointStats:
+    """Aggregates for one method + endpoint template."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.status = Counter()
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.retries = 0
+        self.rate_limit_wait = 0.0
+        self.limiter_wait = 0.0
+        self.latency = Histogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "status": {str(code): count for code, count in self.status.items()},
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "retries": self.retries,
+            "rate_limit_wait": round(self.rate_limit_wait, 3),
+            "limiter_wait": round(self.limiter_wait, 3),
+            "latency": self.latency.to_dict(),
+        }
+
+
+class RequestMetrics:
+    """Thread-safe request metrics keyed by (method, endpoint template)."""
+
+    def __init__(self, command: str = ""):
+        self.command = command
+        self._lock = threading.Lock()
+        self.endpoints = {}
+        self.gauges: Dict[str, Dict[str, float]] = {}
+
+    def set_gauge(self, name: str, value: float):
+        """Set a gauge, keeping its min and max over the run."""
+        with self._lock:
+            gauge = self.gauges.get(name)
+            if gauge is None:
+                self.gauges[name] = {"value": value, "min": value, "max": value}
+            else:
+                gauge["value"] = value
+                gauge["min"] = min(gauge["min"], value)
+                gauge["max"] = max(gauge["max"], value)
+
+    def record(self, event: Dict[str, Any]):
+        key = (event["method"], event["endpoint"])
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.requests += 1
+            stats.errors += not 200 <= event.get("status", 0) < 300
+            stats.status[event.get("status", 0)] += 1
+            stats.bytes_out += event.get("bytes_out", 0)
+            stats.bytes_in += event.get("bytes_in", 0)
+            stats.retries += event.get("retries", 0)
+            stats.rate_limit_wait += event.get("rate_limit_wait", 0.0)
+            stats.limiter_wait += event.get("limiter_wait", 0.0)
+            stats.latency.observe(event.get("latency", 0.0))
+
+    def latency_quantile(self, method: str, endpoint: str, q: float) -> float:
+        with self._lock:
+            stats = self.endpoints.get((method, endpoint))
+            return stats.latency.quantile(q) if stats else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {f"{method} {endpoint}": stats.to_dict() for (method, endpoint), stats in sorted(self.endpoints.items())}
+            gauges = {name: {key: round(value, 3) for key, value in gauge.items()} for name, gauge in sorted(self.gauges.items())}
+        return {
+            "command": self.command,
+            "requests": sum(e["requests"] for e in endpoints.values()),
+            "endpoints": endpoints,
+            "gauges": gauges,
+        }
+
+    def to_prometheus(self) -> str:
+        """Render as a Prometheus textfile (node_exporter textfile collector)."""
+        lines = [
+            "# HELP notion_requests_total Notion API requests.",
+            "# TYPE notion_requests_total counter",
+        ]
+        counters = [
+            ("notion_request_errors_total", "Notion API requests with a non-2xx final status.", "errors"),
+            ("notion_request_retries_total", "Retried Notion API attempts.", "retries"),
+            ("notion_request_bytes_out_total", "Request body bytes sent.", "bytes_out"),
+            ("notion_request_bytes_in_total", "Response body bytes received.", "bytes_in"),
+            ("notion_rate_limit_wait_seconds_total", "Time spent waiting on 429 Retry-After.", "rate_limit_wait"),
+            ("notion_limiter_wait_seconds_total", "Time spent waiting on the shared rate limiter.", "limiter_wait"),
+        ]
+        with self._lock:
+            items = sorted(self.endpoints.items())
+            for (method, endpoint), stats in items:
+                lines.append(f"notion_requests_total{{{self._labels(method, endpoint)}}} {stats.requests}")
+            for name, help_text, attribute in counters:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (method, endpoint), stats in items:
+                    lines.append(f"{name}{{{self._labels(method, endpoint)}}} {getattr(stats, attribute)}")
+            lines.append("# HELP notion_request_duration_seconds Notion API request latency, including retries.")
+            lines.append("# TYPE notion_request_duration_seconds histogram")
+            for (method, endpoint), stats in items:
+                labels = self._labels(method, endpoint)
+                for bound, count in zip(stats.latency.buckets, stats.latency.counts):
+                    lines.append(f'notion_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'notion_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.latency.count}')
+                lines.append(f"notion_request_duration_seconds_sum{{{labels}}} {stats.latency.sum:.6f}")
+                lines.append(f"notion_request_duration_seconds_count{{{labels}}} {stats.latency.count}")
+            for name, gauge in sorted(self.gauges.items()):
+                for key in ("value", "max"):
+                    metric = f"notion_{name}" if key == "value" else f"notion_{name}_{key}"
+                    lines.append(f"# TYPE {metric} gauge")
+                    lines.append(f'{metric}{{command="{self.command}"}} {gauge[key]:g}')
+        return "\n".join(lines) + "\n"
+
+    def _labels(self, method: str, endpoint: str) -> str:
+        return f'command="{self.command}",method="{method}",endpoint="{endpoint}"'
+
+    def format_table(self) -> str:
+        """Plain-text per-endpoint breakdown for --stats."""
+        with self._lock:
+            items = sorted(self.endpoints.items(), key=lambda item: item[1].latency.sum, reverse=True)
+            rows = [
+                (
+                    f"{method} {endpoint}", str(stats.requests), str(stats.errors), str(stats.retries),
+                    f"{stats.latency.sum:.2f}", f"{stats.latency.sum / stats.requests * 1000:.0f}",
+                    f"{stats.latency.quantile(0.95) * 1000:.0f}", f"{stats.rate_limit_wait:.2f}",
+                    f"{stats.limiter_wait:.2f}", str(stats.bytes_out), str(stats.bytes_in),
+                )
+                for (method, endpoint), stats in items
+            ]
+        headers = ("endpoint", "requests", "errors", "retries", "total_s", "avg_ms", "p95_ms", "429_wait_s", "limit_wait_s", "bytes_out", "bytes_in")
+        if not rows:
+            return f"Notion API stats ({self.command}): no requests\n"
+        totals = (
+            "total",
+            *(str(sum(int(row[i]) for row in rows)) for i in (1, 2, 3)),
+            f"{sum(float(row[4]) for row in rows):.2f}", "", "",
+            *(f"{sum(float(row[i]) for row in rows):.2f}" for i in (7, 8)),
+            *(str(sum(int(row[i]) for row in rows)) for i in (9, 10)),
+        )
+        table = [headers] + rows + [totals]
+        widths = [max(len(row[i]) for row in table) for i in range(len(headers))]
+        lines = [f"Notion API stats ({self.command}):"]
+        for row in table:
+            lines.append("  " + "  ".join(cell.ljust(width) if i == 0 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths))))
+        with self._lock:
+            for name, gauge in sorted(self.gauges.items()):
+                lines.append(f"  {name}: {gauge['value']:.1f} (min {gauge['min']:.1f}, max {gauge['max']:.1f})")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str):
+        """Write metrics to path: Prometheus textfile for .prom, JSON otherwise."""
+        content = self.to_prometheus() if path.endswith(".prom") else json.dumps(self.to_dict(), indent=2) + "\n"
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Atomic replace so textfile collectors never read a partial file
+        with open(f"{path}.tmp", 'w') as f:
+            f.write(content)
+        os.replace(f"{path}.tmp", path)
+
+
+METRICS = RequestMetrics()
+
+_hooks: List[Callable[[Dict[str, Any]], None]] = [METRICS.record]
+
+
+def add_request_hook(hook: Callable[[Dict[str, Any]], None]):
+    """Register a callable that receives every request event."""
+    _hooks.append(hook)
+
+
+def remove_request_hook(hook: Callable[[Dict[str, Any]], None]):
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def emit_request(event: Dict[str, Any]):
+    """Send a request event to every hook. Hook failures never break requests."""
+    for hook in list(_hooks):
+        try:
+            hook(event)
+        except Exception:
+            pass
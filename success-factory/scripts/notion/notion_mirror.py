@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Local mirror of Notion databases.
+
+Provides:
+- Full paginated export of a database into a compact local snapshot
+- Incremental refresh using a per-database last_edited_time watermark
+- JSONL or SQLite snapshot storage under NOTION_CACHE_DIR/mirror
+- Optional page body text (plain text of top-level blocks) for search
+- Snapshot loading for downstream tooling (analytics, duplicate detection)
+
+Snapshots store one compact record per page: id, url, timestamps and a flat
+{property name: plain value} dict instead of Notion's nested property objects.
+"""
+
+import os
+import json
+import sqlite3
+import urllib.parse
+from datetime import datetime, timezone
+from typing import Optional, Dict, List, Any, Iterator
+
+from notion_client import CACHE_DIR, DATABASES, notion_request, query_database
+
+
+MIRROR_DIR = os.path.join(CACHE_DIR, "mirror")
+SNAPSHOT_FORMATS = ["jsonl", "sqlite"]
+MAX_TEXT_LENGTH = 20000  # characters of body text kept per page
+
+
+def _plain_text(rich_text: List[Dict]) -> str:
+    """Join a rich_text array into plain text."""
+    return "".join(part.get("plain_text") or part.get("text", {}).get("content", "") for part in rich_text or [])
+
+
+def simplify_property(prop: Dict[str, Any]) -> Any:
+    """Convert a Notion property value into a plain Python value."""
+    kind = prop.get("type")
+    value = prop.get(kind)
+
+    if kind in ("title", "rich_text"):
+        return _plain_text(value)
+    if kind in ("select", "status"):
+        return value.get("name") if value else None
+    if kind == "multi_select":
+        return [option.get("name") for option in value or []]
+    if kind == "date":
+        return value.get("start") if value else None
+    if kind == "people":
+        return [person.get("id") for person in value or []]
+    if kind == "relation":
+        return [related.get("id") for related in value or []]
+    if kind == "formula":
+        return (value or {}).get((value or {}).get("type"))
+    if kind in ("created_by", "last_edited_by"):
+        return (value or {}).get("id")
+    return value
+
+
+def compact_page(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a Notion page object to a compact snapshot record."""
+    return {
+        "id": page["id"],
+        "url": page.get("url"),
+        "created_time": page.get("created_time"),
+        "last_edited_time": page.get("last_edited_time"),
+        "properties": {name: simplify_property(prop) for name, prop in page.get("properties", {}).items()},
+    }
+
+
+def fetch_page_text(token: str, page_id: str) -> str:
+    """Fetch the plain text of a page's top-level blocks."""
+    lines = []
+    cursor = None
+    while True:
+        params = {"page_size": 100}
+        if cursor:
+            params["start_cursor"] = cursor
+        result = notion_request("GET", f"/blocks/{page_id}/children?{urllib.parse.urlencode(params)}", token)
+        for block in result.get("results", []):
+            content = block.get(block.get("type"), {})
+            text = _plain_text(content.get("rich_text")) if isinstance(content, dict) else ""
+            if text:
+                lines.append(text)
+        cursor = result.get("next_cursor")
+        if not result.get("has_more") or not cursor:
+            return "\n".join(lines)[:MAX_TEXT_LENGTH]
+
+
+def snapshot_path(name: str, fmt: str, mirror_dir: str = MIRROR_DIR) -> str:
+    """Path of a database snapshot file."""
+    extension = "db" if fmt == "sqlite" else "jsonl"
+    return os.path.join(mirror_dir, f"{name}.{extension}")
+
+
+def _state_path(name: str, mirror_dir: str) -> str:
+    return os.path.join(mirror_dir, f"{name}.state.json")
+
+
+def load_state(name: str, mirror_dir: str = MIRROR_DIR) -> Dict[str, Any]:
+    """Load the mirror state (watermark, format, counts) for a database."""
+    try:
+        with open(_state_path(name, mirror_dir), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(name: str, state: Dict[str, Any], mirror_dir: str):
+    path = _state_path(name, mirror_dir)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def _write_jsonl(path: str, records: Dict[str, Dict], full: bool):
+    """Merge records into a JSONL snapshot, rewriting it atomically."""
+    merged = {}
+    if not full and os.path.exists(path):
+        for record in _iter_jsonl(path):
+            merged[record["id"]] = record
+    merged.update(records)
+
+    with open(f"{path}.tmp", 'w') as f:
+        for record in merged.values():
+            f.write(json.dumps(record, separators=(',', ':')))
+            f.write('\n')
+    os.replace(f"{path}.tmp", path)
+    return len(merged)
+
+
+def _connect_sqlite(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS pages ("
+        "id TEXT PRIMARY KEY, url TEXT, created_time TEXT, last_edited_time TEXT, properties TEXT, text TEXT)"
+    )
+    # Snapshots written before body text was mirrored lack the text column
+    if "text" not in {row[1] for row in conn.execute("PRAGMA table_info(pages)")}:
+        conn.execute("ALTER TABLE pages ADD COLUMN text TEXT")
+    return conn
+
+
+def _write_sqlite(path: str, records: Dict[str, Dict], full: bool):
+    """Upsert records into a SQLite snapshot."""
+    conn = _connect_sqlite(path)
+    with conn:
+        if full:
+            conn.execute("DELETE FROM pages")
+        conn.executemany(
+            "INSERT OR REPLACE INTO pages (id, url, created_time, last_edited_time, properties, text) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    r["id"], r["url"], r["created_time"], r["last_edited_time"],
+                    json.dumps(r["properties"], separators=(',', ':')), r.get("text"),
+                )
+                for r in records.values()
+            ],
+        )
+    count = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+    conn.close()
+    return count
+
+
+def mirror_database(
+    token: str,
+    name: str,
+    fmt: str = "jsonl",
+    full: bool = False,
+    mirror_dir: str = MIRROR_DIR,
+    with_content: bool = False,
+    write: bool = True,
+) -> Dict[str, Any]:
+    """Export or incrementally refresh one database from DATABASES into a local snapshot.
+
+    The first run (or full=True) exports every page. Later runs only query
+    pages edited on or after the stored last_edited_time watermark and merge
+    them into the snapshot. Notion rounds last_edited_time to the minute, so
+    the boundary minute is re-fetched; merging by page ID keeps that idempotent.
+    Pages archived in Notion stay in the snapshot until the next full export.
+
+    with_content also stores each fetched page's body text, at the cost of one
+    extra request per new or edited page.
+
+    With write=False (dry runs) the same queries are made against the
+    existing state and snapshot, but neither is written.
+    """
+    if write:
+        os.makedirs(mirror_dir, exist_ok=True)
+    state = load_state(name, mirror_dir)
+
+    # Switching formats needs a full export into the new snapshot
+    if state.get("format") not in (None, fmt) or not os.path.exists(snapshot_path(name, fmt, mirror_dir)):
+        full = True
+
+    watermark = None if full else state.get("watermark")
+    query_filter = None
+    if watermark:
+        query_filter = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": watermark}}
+
+    records = {}
+    new_watermark = watermark
+    for page in query_database(token, DATABASES[name], filter_=query_filter):
+        record = compact_page(page)
+        if with_content:
+            record["text"] = fetch_page_text(token, record["id"])
+        records[record["id"]] = record
+        edited = record["last_edited_time"]
+        if edited and (new_watermark is None or edited > new_watermark):
+            new_watermark = edited
+
+    path = snapshot_path(name, fmt, mirror_dir)
+    if not write:
+        kept = set() if full else {record["id"] for record in iter_snapshot(name, fmt, mirror_dir)}
+        total = len(kept | set(records))
+    else:
+        if fmt == "sqlite":
+            total = _write_sqlite(path, records, full)
+        else:
+            total = _write_jsonl(path, records, full)
+
+        state = {
+            "database_id": DATABASES[name],
+            "format": fmt,
+            "watermark": new_watermark,
+            "synced_at": datetime.now(timezone.utc).isoformat(),
+            "pages": total,
+        }
+        _save_state(name, state, mirror_dir)
+
+    return {
+        "database": name,
+        "mode": "full" if full else "incremental",
+        "fetched": len(records),
+        "pages": total,
+        "watermark": new_watermark,
+        "path": path,
+    }
+
+
+def _iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _iter_sqlite(path: str) -> Iterator[Dict[str, Any]]:
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("SELECT id, url, created_time, last_edited_time, properties, text FROM pages")
+        for page_id, url, created, edited, properties, text in rows:
+            record = {
+                "id": page_id,
+                "url": url,
+                "created_time": created,
+                "last_edited_time": edited,
+                "properties": json.loads(properties),
+            }
+            if text is not None:
+                record["text"] = text
+            yield record
+    finally:
+        conn.close()
+
+
+def iter_snapshot(name: str, fmt: Optional[str] = None, mirror_dir: str = MIRROR_DIR) -> Iterator[Dict[str, Any]]:
+    """Iterate over the mirrored records of a database.
+
+    The format defaults to whichever snapshot the last mirror run wrote.
+    """
+    fmt = fmt or load_state(name, mirror_dir).get("format", "jsonl")
+    path = snapshot_path(name, fmt, mirror_dir)
+    if not os.path.exists(path):
+        raise RuntimeError(f"No {fmt} snapshot for '{name}' - run mirror-databases.py {name} first")
+    return _iter_sqlite(path) if fmt == "sqlite" else _iter_jsonl(path)
+
+
+def iter_snapshot_values(
+    name: str,
+    properties: List[str],
+    fmt: Optional[str] = None,
+    mirror_dir: str = MIRROR_DIR,
+) -> Iterator[tuple]:
+    """Iterate over (created_time, last_edited_time, *values) tuples for selected properties.
+
+    Multi-value properties (multi_select, people, relation) are reduced to their
+    first value. SQLite snapshots project the properties inside the query, so
+    unused properties are never decoded.
+    """
+    fmt = fmt or load_state(name, mirror_dir).get("format", "jsonl")
+    path = snapshot_path(name, fmt, mirror_dir)
+    if not os.path.exists(path):
+        raise RuntimeError(f"No {fmt} snapshot for '{name}' - run mirror-databases.py {name} first")
+
+    if fmt == "sqlite":
+        paths = ['$."{}"'.format(prop.replace('"', '\\"')) for prop in properties]
+        projections = [
+            "CASE json_type(properties, ?) WHEN 'array' THEN json_extract(properties, ? || '[0]') "
+            "ELSE json_extract(properties, ?) END"
+            for _ in paths
+        ]
+        sql = f"SELECT created_time, last_edited_time{''.join(', ' + p for p in projections)} FROM pages"
+        params = [value for path in paths for value in (path, path, path)]
+        conn = sqlite3.connect(path)
+        try:
+            yield from conn.execute(sql, params)
+        finally:
+            conn.close()
+        return
+
+    for record in _iter_jsonl(path):
+        values = record["properties"]
+        row = [record.get("created_time"), record.get("last_edited_time")]
+        for prop in properties:
+            value = values.get(prop)
+            if isinstance(value, list):
+                value = value[0] if value else None
+            row.append(value)
+        yield tuple(row)
+
+
+def load_snapshot(name: str, fmt: Optional[str] = None, mirror_dir: str = MIRROR_DIR) -> List[Dict[str, Any]]:
+    """Load all mirrored records of a database into memory."""
+    return list(iter_snapshot(name, fmt, mirror_dir))
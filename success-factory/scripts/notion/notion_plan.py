@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Batch plans: several Notion operations run as one dependency graph.
+
+A plan is a list of steps, as JSONL (one step per line), a JSON array, or
+YAML when PyYAML is installed. Each step has an op, an optional id and the
+op's fields:
+
+    {"id": "spec", "op": "create_page", "parent_id": "abc123", "file": "spec.md"}
+    {"id": "ticket", "op": "create_ticket", "name": "Build it", "body": "Spec: ${spec.url}"}
+    {"op": "append", "page_id": "${spec.page_id}", "body": "Tracked in ${ticket.url}"}
+
+Ops:
+    create_page, create_ticket, create_task, create_document, create_feedback
+        The create_* function of the matching script; other fields are its
+        keyword arguments ("type" is accepted for type_)
+    append        page_id, body: append markdown to a page
+    update_page   page_id, properties (Notion property values), body, replace
+
+"file" reads a markdown file (relative to the plan) into the body, and the
+name or title from its first H1 when not given.
+
+"${id.field}" refers to a field of an earlier step's result (page_id, url,
+...); a value that is only a reference keeps the referenced type. A step
+runs once every step it references (and any listed in "after") succeeded,
+and is skipped if one of them failed. Independent steps run concurrently;
+steps writing to the same page (or creating pages under the same parent)
+are queued on it in plan order.
+"""
+
+import os
+import re
+import json
+import queue
+from typing import Dict, List, Any, Callable, Set
+
+from notion_client import get_notion_token, append_blocks, update_page, markdown_to_blocks, WriteScheduler
+from notion_cli import load_script
+
+try:
+    import yaml
+except ImportError:  # optional: JSON plans need nothing extra
+    yaml = None
+
+
+SCRIPT_OPS = {
+    "create_page": ("create-page.py", "create_page"),
+    "create_ticket": ("create-ticket.py", "create_ticket"),
+    "create_task": ("create-task.py", "create_task"),
+    "create_document": ("create-document.py", "create_document"),
+    "create_feedback": ("create-feedback.py", "create_feedback"),
+}
+OPS = list(SCRIPT_OPS) + ["append", "update_page"]
+
+# Fields a markdown "file" fills in, per op
+BODY_FIELD = {"create_feedback": "description"}
+NAME_FIELD = {"create_feedback": "title"}
+
+REFERENCE = re.compile(r'\$\{([A-Za-z0-9_-]+)\.([A-Za-z0-9_]+)\}')
+
+
+def load_plan(path: str, text: str = None) -> List[Dict[str, Any]]:
+    """Read and validate a plan file (or its text); steps get an id and deps."""
+    if text is None:
+        with open(path, 'r') as f:
+            text = f.read()
+
+    if path.endswith((".yaml", ".yml")):
+        if yaml is None:
+            raise ValueError("YAML plans need PyYAML (pip install pyyaml); use JSONL instead")
+        steps = yaml.safe_load(text) or []
+    elif text.lstrip().startswith("["):
+        steps = json.loads(text)
+    else:
+        steps = []
+        for number, line in enumerate(text.splitlines(), 1):
+            if line.strip() and not line.lstrip().startswith("#"):
+                try:
+                    steps.append(json.loads(line))
+                except ValueError as e:
+                    raise ValueError(f"Plan line {number}: {e}")
+
+    base = os.path.dirname(os.path.abspath(path))
+    ids: Set[str] = set()
+    for index, step in enumerate(steps, 1):
+        if not isinstance(step, dict) or step.get("op") not in OPS:
+            raise ValueError(f"Step {index}: op must be one of {', '.join(OPS)}")
+        step.setdefault("id", f"step{index}")
+        if step["id"] in ids:
+            raise ValueError(f"Step {index}: duplicate id {step['id']}")
+        ids.add(step["id"])
+        if "file" in step:
+            step["file"] = os.path.join(base, os.path.expanduser(step["file"]))
+
+    for step in steps:
+        after = step.get("after", [])
+        deps = {after} if isinstance(after, str) else set(after)
+        deps.update(name for name, _ in REFERENCE.findall(json.dumps(step)))
+        unknown = deps - ids
+        if unknown:
+            raise ValueError(f"Step {step['id']}: unknown step(s) {', '.join(sorted(unknown))}")
+        step["deps"] = deps
+
+    # Reject cycles up front rather than waiting forever
+    done: Set[str] = set()
+    remaining = {step["id"]: step["deps"] for step in steps}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if deps <= done]
+        if not ready:
+            raise ValueError(f"Steps depend on each other in a cycle: {', '.join(sorted(remaining))}")
+        for name in ready:
+            done.add(name)
+            del remaining[name]
+    return steps
+
+
+def resolve(value: Any, results: Dict[str, Dict[str, Any]]) -> Any:
+    """Replace ${id.field} references with values from earlier results."""
+    if isinstance(value, dict):
+        return {key: resolve(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve(item, results) for item in value]
+    if not isinstance(value, str):
+        return value
+
+    def lookup(match) -> Any:
+        name, field = match.groups()
+        if field not in results[name]:
+            raise ValueError(f"Step {name} has no {field} in its result")
+        return results[name][field]
+
+    whole = REFERENCE.fullmatch(value)
+    if whole:
+        return lookup(whole)
+    return REFERENCE.sub(lambda match: str(lookup(match)), value)
+
+
+def step_arguments(step: Dict[str, Any], results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """The op's keyword arguments for a step, with references and file resolved."""
+    op = step["op"]
+    fields = {key: value for key, value in step.items() if key not in ("id", "op", "after", "deps", "file")}
+    fields = resolve(fields, results)
+    if "type" in fields:
+        fields["type_"] = fields.pop("type")
+
+    if "file" in step:
+        with open(step["file"], 'r') as f:
+            content = f.read()
+        fields.setdefault(BODY_FIELD.get(op, "body"), content)
+        title = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+        name = title.group(1) if title else os.path.basename(step["file"]).replace('.md', '')
+        if op in SCRIPT_OPS:
+            fields.setdefault(NAME_FIELD.get(op, "name"), name)
+    return fields
+
+
+def write_key(step: Dict[str, Any], fields: Dict[str, Any]) -> str:
+    """Queue key: the page a step writes to (or creates under), else its id."""
+    return str(fields.get("page_id") or fields.get("parent_id") or step["id"])
+
+
+def _append(page_id: str, body: str) -> Dict[str, Any]:
+    blocks = markdown_to_blocks(body)
+    append_blocks(get_notion_token(), page_id, blocks)
+    return {"status": "success", "page_id": page_id, "blocks": len(blocks)}
+
+
+def _update(page_id: str, properties: Dict[str, Any] = None, body: str = None, replace: bool = False) -> Dict[str, Any]:
+    blocks = markdown_to_blocks(body) if body else None
+    update_page(get_notion_token(), page_id, properties=properties, blocks=blocks, replace_blocks=replace)
+    return {"status": "success", "page_id": page_id}
+
+
+def op_function(op: str) -> Callable:
+    """The callable behind an op (scripts are imported on first use)."""
+    if op == "append":
+        return _append
+    if op == "update_page":
+        return _update
+    filename, function = SCRIPT_OPS[op]
+    return getattr(load_script(filename), function)
+
+
+def run_plan(steps: List[Dict[str, Any]], on_result: Callable = None) -> Dict[str, Dict[str, Any]]:
+    """Run a loaded plan; returns {step id: result} and calls on_result(result) as steps finish.
+
+    Failed steps have status "error", steps behind a failure status "skipped".
+    """
+    # Import scripts up front: importing from worker threads is not safe
+    functions = {op: op_function(op) for op in {step["op"] for step in steps}}
+    on_result = on_result or (lambda result: None)
+    results: Dict[str, Dict[str, Any]] = {}
+    succeeded: Set[str] = set()
+    pending = list(steps)
+    finished: queue.Queue = queue.Queue()
+    running = 0
+
+    def finish(step: Dict[str, Any], result: Dict[str, Any]):
+        result = dict(result, id=step["id"], op=step["op"])
+        results[step["id"]] = result
+        if result.get("status") not in ("error", "skipped"):
+            succeeded.add(step["id"])
+        on_result(result)
+
+    with WriteScheduler() as scheduler:
+        while pending or running:
+            # Start every step whose dependencies are settled, in plan order
+            for step in list(pending):
+                if not step["deps"] <= set(results):
+                    continue
+                pending.remove(step)
+                failed = sorted(step["deps"] - succeeded)
+                if failed:
+                    finish(step, {"status": "skipped", "error": f"depends on failed step(s) {', '.join(failed)}"})
+                    continue
+                try:
+                    fields = step_arguments(step, results)
+                except (ValueError, OSError) as e:
+                    finish(step, {"status": "error", "error": str(e)})
+                    continue
+                future = scheduler.submit(write_key(step, fields), functions[step["op"]], **fields)
+                future.add_done_callback(lambda future, step=step: finished.put((step, future)))
+                running += 1
+
+            if running:
+                step, future = finished.get()
+                running -= 1
+                try:
+                    finish(step, future.result())
+                except Exception as e:
+                    finish(step, {"status": "error", "error": str(e)})
+    return results
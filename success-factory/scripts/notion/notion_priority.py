@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Priority lanes for Notion requests.
+
+Lanes, highest first:
+    interactive  one-off CLI calls a developer is waiting on (create-*.py)
+    normal       default
+    bulk         long background jobs (mirrors, tree syncs, imports)
+
+The lane is taken from the calling thread: a `with priority_lane("bulk")`
+block, else the process default (set by --lane on every CLI, or
+NOTION_LANE). WriteScheduler jobs run in the lane they were submitted
+from.
+
+Lanes order waiters for the in-process concurrency window and for the
+shared cross-process rate limiter, so an interactive call finishes in
+about one round trip even while a bulk sync drains the budget. Waiters age
+by one lane every AGING_SECONDS, so bulk work is slowed but never starved.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+
+LANES = ["interactive", "normal", "bulk"]
+AGING_SECONDS = 2.0
+
+# Tokens each lane leaves in the shared bucket for higher lanes
+LANE_RESERVE = {"interactive": 0.0, "normal": 1.0, "bulk": 2.0}
+
+_default_lane = os.environ.get("NOTION_LANE", "normal")
+_local = threading.local()
+
+
+def set_default_lane(lane: str):
+    """Set the lane for threads that don't choose one."""
+    global _default_lane
+    if lane not in LANES:
+        raise ValueError(f"Unknown priority lane: {lane}")
+    _default_lane = lane
+
+
+def current_lane() -> str:
+    return getattr(_local, "lane", None) or _default_lane
+
+
+@contextmanager
+def priority_lane(lane: str):
+    """Run the enclosed requests of this thread in a lane."""
+    if lane not in LANES:
+        raise ValueError(f"Unknown priority lane: {lane}")
+    previous = getattr(_local, "lane", None)
+    _local.lane = lane
+    try:
+        yield
+    finally:
+        _local.lane = previous
+
+
+def effective_rank(lane: str, waited: float) -> float:
+    """Lane rank (0 = interactive) improved by one per AGING_SECONDS waited."""
+    return LANES.index(lane) - waited / AGING_SECONDS
+
+
+def effective_reserve(lane: str, waited: float) -> float:
+    """Tokens a waiter must leave in the shared bucket, shrinking as it ages."""
+    return max(0.0, LANE_RESERVE[lane] - waited / AGING_SECONDS)
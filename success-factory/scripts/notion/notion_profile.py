@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+CPU and memory profiling for Notion CLIs (--profile=cpu|mem).
+
+cpu: cProfile of the main thread and of every thread started after it
+     (WriteScheduler workers, prefetchers), merged into one profile. Stats
+     are saved in pstats format and the top functions by cumulative time
+     are printed to stderr.
+mem: tracemalloc. The top allocation sites are printed to stderr and the
+     snapshot is saved for later comparison (tracemalloc.Snapshot.load).
+
+Most memory is freed by the time a command exits, so the memory profiler
+also snapshots after any request that finds traced memory well above the
+last snapshot. The report uses the largest snapshot, which shows what was
+alive while pages were being uploaded: converted blocks, JSON payloads.
+
+Profiles go to NOTION_CACHE_DIR/profiles unless --profile-output is given.
+
+Usage:
+    python3 create-document.py big.md --profile=cpu
+    python -m pstats ~/.cache/moovs-factory/profiles/create-document-<time>.pstats
+"""
+
+import os
+import sys
+import time
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from typing import Optional, List
+
+from notion_client import CACHE_DIR
+from notion_metrics import add_request_hook
+
+
+PROFILE_MODES = ["cpu", "mem"]
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+TOP_ENTRIES = 25
+TRACEMALLOC_FRAMES = 10
+SNAPSHOT_GROWTH = 1.1  # re-snapshot when traced memory grows 10% past the last snapshot
+
+
+def default_output(command: str, mode: str) -> str:
+    extension = "pstats" if mode == "cpu" else "tracemalloc"
+    return os.path.join(PROFILE_DIR, f"{command}-{time.strftime('%Y%m%d-%H%M%S')}.{extension}")
+
+
+class Profiler:
+    """Runs one profiling mode from start() until report()."""
+
+    def __init__(self, mode: str, output: str):
+        self.mode = mode
+        self.output = output
+        self._cpu: Optional[cProfile.Profile] = None
+        self._thread_cpu: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._snapshot_size = 0
+
+    def start(self):
+        if self.mode == "cpu":
+            self._cpu = cProfile.Profile()
+            self._cpu.enable()
+            threading.setprofile(self._profile_thread)
+        else:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            add_request_hook(self._maybe_snapshot)
+
+    def _profile_thread(self, frame, event, arg):
+        # Runs once in each new thread: replace this hook with the thread's own profiler
+        sys.setprofile(None)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+: the main thread's profiler already covers every thread
+            return
+        with self._lock:
+            self._thread_cpu.append(profiler)
+
+    def _maybe_snapshot(self, event):
+        current, _ = tracemalloc.get_traced_memory()
+        if current > self._snapshot_size * SNAPSHOT_GROWTH:
+            self._take_snapshot(current)
+
+    def _take_snapshot(self, current: int):
+        self._snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        self._snapshot_size = current
+
+    def stats(self) -> pstats.Stats:
+        """CPU stats of the main thread merged with those of the profiled threads."""
+        stats = pstats.Stats(self._cpu, stream=sys.stderr)
+        with self._lock:
+            profilers = list(self._thread_cpu)
+        for profiler in profilers:
+            profiler.create_stats()
+            if profiler.stats:
+                stats.add(profiler)
+        return stats
+
+    def report(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.output)), exist_ok=True)
+        if self.mode == "cpu":
+            threading.setprofile(None)
+            self._cpu.disable()
+            stats = self.stats()
+            stats.dump_stats(self.output)
+            print(f"\nCPU profile (top {TOP_ENTRIES} by cumulative time):", file=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(TOP_ENTRIES)
+        else:
+            current, peak = tracemalloc.get_traced_memory()
+            if current >= self._snapshot_size:
+                self._take_snapshot(current)
+            tracemalloc.stop()
+            self._snapshot.dump(self.output)
+            print(
+                f"\nMemory profile: peak {peak / 1024:.1f} KiB traced, "
+                f"top {TOP_ENTRIES} allocation sites at {self._snapshot_size / 1024:.1f} KiB:",
+                file=sys.stderr,
+            )
+            for stat in self._snapshot.statistics("lineno")[:TOP_ENTRIES]:
+                print(f"  {stat}", file=sys.stderr)
+        print(f"Profile written to {self.output}", file=sys.stderr)
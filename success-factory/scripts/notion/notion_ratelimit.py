@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Cross-process token bucket for the Notion API rate limit.
+
+Notion allows an average of 3 requests per second per integration token,
+with short bursts. Every process using the same token on this machine (the
+pre-commit hook, a bulk import, a manual create-task.py) draws from one
+bucket stored in a small state file, guarded by an exclusive flock, so
+concurrent tools share the budget instead of each assuming it owns it.
+
+State files are named by a hash of the token and never contain it. A 429
+from Notion blocks the shared bucket for the Retry-After period, so every
+process backs off, not just the one that was throttled.
+
+Lower priority lanes (see notion_priority) must leave a few tokens in the
+bucket, so an interactive call gets a token immediately while a bulk job is
+draining the budget. The reserve shrinks as a waiter ages, so bulk work is
+never starved.
+
+On platforms without fcntl the bucket is only shared between threads.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+
+from notion_priority import current_lane, effective_reserve
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def token_key(token: str) -> str:
+    """Stable, non-reversible key for an integration token."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+
+class SharedTokenBucket:
+    """Token bucket whose state lives in a file shared by all processes."""
+
+    def __init__(self, key: str, rate: float, burst: float, directory: str):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.path = os.path.join(directory, f"{key}.json")
+        self._thread_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _update(self, change) -> Any:
+        """Apply change(state, now) to the refilled state under the file lock."""
+        with self._thread_lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = os.read(fd, 4096)
+                now = time.time()
+                try:
+                    state = json.loads(raw)
+                except ValueError:
+                    state = {"tokens": self.burst, "updated": now, "blocked_until": 0.0}
+
+                elapsed = max(0.0, now - state["updated"])
+                state["tokens"] = min(self.burst, state["tokens"] + elapsed * self.rate)
+                state["updated"] = now
+                result = change(state, now)
+
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, json.dumps(state).encode('utf-8'))
+                return result
+            finally:
+                os.close(fd)  # releases the flock
+
+    def acquire(self, lane: Optional[str] = None) -> float:
+        """Take one token, sleeping until one is available. Returns seconds waited."""
+        lane = lane or current_lane()
+        waited = 0.0
+
+        def take(state: Dict[str, Any], now: float) -> float:
+            if now < state.get("blocked_until", 0.0):
+                return state["blocked_until"] - now
+            needed = 1.0 + min(effective_reserve(lane, waited), self.burst - 1.0)
+            if state["tokens"] >= needed:
+                state["tokens"] -= 1.0
+                return 0.0
+            return (needed - state["tokens"]) / self.rate
+
+        while True:
+            delay = self._update(take)
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self, seconds: float):
+        """Block the bucket for every process, e.g. after a 429 with Retry-After."""
+        def block(state: Dict[str, Any], now: float):
+            state["tokens"] = 0.0
+            state["blocked_until"] = max(state.get("blocked_until", 0.0), now + seconds)
+
+        self._update(block)
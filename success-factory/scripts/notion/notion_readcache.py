@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Read-through response cache for Notion reads.
+
+notion_request serves GETs and database queries from this cache when the
+same token made the same read (endpoint and body) within the TTL, and
+stores fresh responses in it. Two tiers:
+
+    memory   per process, LRU over MAX_MEMORY_ENTRIES responses (default)
+    disk     memory plus a SQLite tier in NOTION_CACHE_DIR/responses.db,
+             shared by every process, LRU over MAX_DISK_ENTRIES
+    off      no caching
+
+Every cached response is tagged with the IDs it depends on: the IDs in
+its endpoint, and the id and parent of every object it returns. Our own
+writes (POST, PATCH, DELETE) invalidate every response tagged with an ID
+they touch: the IDs in their endpoint, the parent in their body, and the
+id and parent of the object they return. So after appending to a page its
+children are fetched again, deleting a block drops the cached child list
+containing it, and creating a page in a database drops that database's
+cached queries. Changes made by other people only show up after the TTL.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any, Set, Tuple
+
+
+CACHE_MODES = ["off", "memory", "disk"]
+DEFAULT_TTL = 60.0  # seconds
+MAX_MEMORY_ENTRIES = 512
+MAX_DISK_ENTRIES = 4096
+
+_ID_PATTERN = re.compile(r"[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}")
+
+
+def _normalize(object_id: str) -> str:
+    return object_id.replace("-", "").lower()
+
+
+def _object_ids(obj: Any) -> Set[str]:
+    """The id and parent IDs of a Notion object."""
+    ids = set()
+    if isinstance(obj, dict):
+        if isinstance(obj.get("id"), str):
+            ids.add(obj["id"])
+        parent = obj.get("parent")
+        if isinstance(parent, dict):
+            ids.update(value for key, value in parent.items() if key.endswith("_id") and isinstance(value, str))
+    return ids
+
+
+def request_tags(endpoint: str, data: Optional[Dict[str, Any]], response: Optional[Dict[str, Any]]) -> Set[str]:
+    """IDs a request depends on (reads) or changes (writes)."""
+    ids = set(_ID_PATTERN.findall(endpoint.split("?")[0].lower()))
+    ids.update(_object_ids(data))
+    if isinstance(response, dict):
+        ids.update(_object_ids(response))
+        for item in response.get("results") or []:
+            ids.update(_object_ids(item))
+    return {_normalize(object_id) for object_id in ids}
+
+
+class ResponseCache:
+    """LRU + TTL cache of read responses, with tag invalidation."""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = MAX_MEMORY_ENTRIES, path: str = None, max_disk_entries: int = MAX_DISK_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self._lock = threading.Lock()
+        # Invalidation counter, and its value when each tag was last invalidated
+        self._generation = 0
+        self._tag_generations: Dict[str, int] = {}
+        # key -> (stored, body, tags)
+        self._entries: "OrderedDict[str, Tuple[float, bytes, Set[str]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            conn = self._connect()
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body BLOB, stored REAL, accessed REAL);"
+                "CREATE TABLE IF NOT EXISTS tags (tag TEXT, key TEXT);"
+                "CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag);"
+                "CREATE INDEX IF NOT EXISTS tags_key ON tags (key);"
+            )
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def key(token_key: str, method: str, endpoint: str, payload: Optional[bytes]) -> str:
+        return json.dumps([token_key, method, endpoint, payload.decode('utf-8') if payload else None])
+
+    def get(self, key: str) -> Optional[bytes]:
+        """A fresh cached body, else None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                self._drop(key)
+
+        if self.path:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT body, stored FROM responses WHERE key = ? AND stored > ?", (key, now - self.ttl)).fetchone()
+                if row:
+                    conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                    tags = {tag for (tag,) in conn.execute("SELECT tag FROM tags WHERE key = ?", (key,))}
+            finally:
+                conn.close()
+            if row:
+                with self._lock:
+                    self._store(key, row[1], bytes(row[0]), tags)
+                    self.hits += 1
+                return bytes(row[0])
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def generation(self) -> int:
+        """Pass to put() to skip responses that a write overtook while they were read."""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: str, body: bytes, tags: Set[str], generation: int = None):
+        """Cache a read response under its tags.
+
+        With generation (from generation() before the read was sent), the
+        response is dropped if one of its tags was invalidated meanwhile.
+        """
+        now = time.time()
+        with self._lock:
+            if generation is not None and any(self._tag_generations.get(tag, 0) > generation for tag in tags):
+                return
+            self._store(key, now, body, tags)
+        if self.path:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, body, now, now))
+                conn.execute("DELETE FROM tags WHERE key = ?", (key,))
+                conn.executemany("INSERT INTO tags VALUES (?, ?)", [(tag, key) for tag in tags])
+                # Evict the least recently used (and anything expired)
+                stale = [row[0] for row in conn.execute(
+                    "SELECT key FROM responses WHERE stored <= ? OR key NOT IN "
+                    "(SELECT key FROM responses ORDER BY accessed DESC LIMIT ?)",
+                    (now - self.ttl, self.max_disk_entries),
+                )]
+                self._delete_disk(conn, stale)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+    def invalidate(self, tags: Set[str]):
+        """Drop every cached response tagged with any of tags."""
+        if not tags:
+            return
+        with self._lock:
+            self._generation += 1
+            keys = set()
+            for tag in tags:
+                self._tag_generations[tag] = self._generation
+                keys.update(self._tags.get(tag, ()))
+            for key in keys:
+                self._drop(key)
+            self.invalidated += len(keys)
+        if self.path:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                keys = [row[0] for row in conn.execute(
+                    f"SELECT DISTINCT key FROM tags WHERE tag IN ({', '.join('?' * len(tags))})", tuple(tags)
+                )]
+                self._delete_disk(conn, keys)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+
+    def clear(self):
+        """Drop every cached response (both tiers)."""
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+        if self.path:
+            conn = self._connect()
+            try:
+                conn.executescript("DELETE FROM responses; DELETE FROM tags;")
+            finally:
+                conn.close()
+
+    def _store(self, key: str, stored: float, body: bytes, tags: Set[str]):
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (stored, body, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            for tag in entry[2]:
+                keys = self._tags.get(tag)
+                if keys:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+
+    @staticmethod
+    def _delete_disk(conn: sqlite3.Connection, keys: List[str]):
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ', '.join('?' * len(chunk))
+            conn.execute(f"DELETE FROM responses WHERE key IN ({marks})", chunk)
+            conn.execute(f"DELETE FROM tags WHERE key IN ({marks})", chunk)
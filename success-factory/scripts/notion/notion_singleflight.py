@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Single-flight execution for concurrent syncs of the same thing.
+
+Two layers:
+
+SingleFlight coalesces identical calls inside one process: while a call
+for a key is running, other threads asking for the same key wait for it
+and share its result (or exception) instead of running it again.
+notion_request uses it for identical concurrent reads.
+
+DocumentLock serializes work on one document across threads and
+processes (two hook runs, two terminals) with an exclusive flock on a lock
+file named by a hash of the key. The lock file also records the last
+completed sync (content hash and result), so a run that waited for the
+lock can reuse a sync of the same content that finished meanwhile
+instead of uploading it again:
+
+    started = time.time()
+    with DocumentLock(f"problem:{title}", lock_dir) as lock:
+        result = lock.completed_since(started, digest)
+        if result is None:
+            result = sync()
+            lock.record(digest, result)
+
+On platforms without fcntl the lock is only shared between threads.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Callable, Hashable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """Return fn(*args, **kwargs), or the result of the identical call already running."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(name: str) -> threading.Lock:
+    with _thread_locks_guard:
+        return _thread_locks.setdefault(name, threading.Lock())
+
+
+class DocumentLock:
+    """Exclusive lock on one document (by path or title) across threads and processes."""
+
+    def __init__(self, key: str, directory: str):
+        self.key = key
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(directory, f"{name}.lock")
+        self.waited = 0.0
+        self._thread_lock = _thread_lock(self.path)
+        self._fd: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def __enter__(self) -> "DocumentLock":
+        start = time.perf_counter()
+        self._thread_lock.acquire()
+        try:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+        except BaseException:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._thread_lock.release()
+            raise
+        self.waited = time.perf_counter() - start
+        return self
+
+    def __exit__(self, *exc):
+        os.close(self._fd)  # releases the flock
+        self._fd = None
+        self._thread_lock.release()
+
+    def state(self) -> Dict[str, Any]:
+        """The last recorded sync: {"key", "hash", "finished", "result"}."""
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        raw = b""
+        while True:
+            chunk = os.read(self._fd, 65536)
+            if not chunk:
+                break
+            raw += chunk
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {}
+
+    def completed_since(self, started: float, digest: str) -> Optional[Dict[str, Any]]:
+        """The result of a sync of this content that finished after started, else None."""
+        state = self.state()
+        if state.get("hash") == digest and state.get("finished", 0) >= started:
+            return state.get("result")
+        return None
+
+    def record(self, digest: str, result: Dict[str, Any]):
+        """Record a completed sync for runs waiting on the lock."""
+        state = {"key": self.key, "hash": digest, "finished": time.time(), "result": result}
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.ftruncate(self._fd, 0)
+        os.write(self._fd, json.dumps(state).encode('utf-8'))
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Offline spool for page creations.
+
+With the spool enabled, create_page stores the fully built page payload
+(parent, properties, every block) in a local SQLite file instead of losing
+it when Notion is unreachable:
+
+    off        never spool (default)
+    on-error   spool when the page can't be created because Notion is
+               unreachable, throttling or overloaded (429/502/503/504)
+    always     spool without calling Notion at all (--offline)
+
+flush-spool.py later uploads spooled pages concurrently and records each
+item's outcome (page ID and URL, or the error) in the spool.
+
+Item states: pending -> flushing -> done, or back to pending when Notion is
+still unavailable, or:
+
+    failed       the page was not created (rejected by Notion, or
+                 unavailable MAX_ATTEMPTS times); --retry-failed tries again
+    incomplete   the page was (or may have been) created but not completed;
+                 never uploaded again, since that would duplicate it. page_id
+                 and url are kept when known.
+
+A flush that was interrupted leaves its items flushing; --retry-failed
+reclaims them once they haven't been touched for STALE_FLUSH seconds, so
+it never takes over items a concurrent flush is still uploading.
+"""
+
+import os
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, List, Any, Callable
+
+import notion_client
+from notion_client import CACHE_DIR, IncompletePageError, WriteScheduler, upload_page
+from notion_metrics import METRICS
+from notion_tokens import TokenPool
+from notion_dryrun import is_dry_run
+from notion_timeouts import is_timeout
+
+
+SPOOL_PATH = os.path.expanduser(os.environ.get("NOTION_SPOOL_FILE") or os.path.join(CACHE_DIR, "spool.db"))
+SPOOL_MODES = ["off", "on-error", "always"]
+MAX_ATTEMPTS = 5
+STALE_FLUSH = 3600  # seconds before an item left flushing counts as interrupted
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def page_title(page: Dict[str, Any]) -> str:
+    """Plain title of a page payload, for listings."""
+    for prop in page.get("properties", {}).values():
+        title = prop if isinstance(prop, list) else prop.get("title")
+        if title:
+            return "".join(part.get("text", {}).get("content", "") for part in title)
+    return ""
+
+
+class Spool:
+    """SQLite queue of page payloads, safe to share between processes."""
+
+    def __init__(self, path: str = SPOOL_PATH):
+        self.path = path
+        self.added = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS spool ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, created TEXT, updated TEXT, command TEXT, title TEXT, "
+            "payload TEXT, status TEXT, attempts INTEGER DEFAULT 0, error TEXT, page_id TEXT, url TEXT)"
+        )
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit; claim() opens its own write transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(self, page: Dict[str, Any]) -> int:
+        """Store a page payload; returns its spool ID."""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "INSERT INTO spool (created, updated, command, title, payload, status) VALUES (?, ?, ?, ?, ?, 'pending')",
+                (_now(), _now(), METRICS.command, page_title(page), json.dumps(page, separators=(',', ':'))),
+            )
+            self.added += 1
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def claim(self, retry_failed: bool = False, limit: int = None, peek: bool = False) -> List[Dict[str, Any]]:
+        """Mark pending items as flushing and return them.
+
+        With retry_failed, failed items and items left flushing for more
+        than STALE_FLUSH seconds are claimed too. Claiming is atomic, so
+        concurrent flushes never upload the same item. With peek, the items
+        are returned without being claimed.
+        """
+        query = "SELECT * FROM spool WHERE status = 'pending'"
+        params = ()
+        if retry_failed:
+            query = "SELECT * FROM spool WHERE status IN ('pending', 'failed') OR (status = 'flushing' AND updated < ?)"
+            params = ((datetime.now(timezone.utc) - timedelta(seconds=STALE_FLUSH)).isoformat(),)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                query + " ORDER BY id" + (" LIMIT ?" if limit else ""),
+                params + ((limit,) if limit else ()),
+            ).fetchall()
+            if not peek:
+                conn.executemany(
+                    "UPDATE spool SET status = 'flushing', updated = ? WHERE id = ?",
+                    [(_now(), row["id"]) for row in rows],
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return [self._item(row) for row in rows]
+
+    def finish(self, item_id: int, attempts: int, page: Dict[str, Any]):
+        """Record a successful upload."""
+        self._update(item_id, status="done", attempts=attempts, error=None, page_id=page.get("id"), url=page.get("url"))
+
+    def fail(self, item_id: int, attempts: int, error: str, retry: bool):
+        """Record a failed upload, back to pending if it may succeed later."""
+        self._update(item_id, status="pending" if retry else "failed", attempts=attempts, error=error)
+
+    def incomplete(self, item_id: int, attempts: int, error: str, page: Dict[str, Any] = None):
+        """Record an upload that created (or may have created) the page but didn't finish."""
+        page = page or {}
+        self._update(item_id, status="incomplete", attempts=attempts, error=error, page_id=page.get("id"), url=page.get("url"))
+
+    def _update(self, item_id: int, **fields):
+        fields["updated"] = _now()
+        conn = self._connect()
+        try:
+            conn.execute(
+                f"UPDATE spool SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?",
+                tuple(fields.values()) + (item_id,),
+            )
+        finally:
+            conn.close()
+
+    def items(self, statuses: List[str] = None) -> List[Dict[str, Any]]:
+        """Spool items (without payloads), oldest first."""
+        conn = self._connect()
+        try:
+            query = "SELECT * FROM spool"
+            if statuses:
+                query += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+            rows = conn.execute(query + " ORDER BY id", tuple(statuses or ())).fetchall()
+        finally:
+            conn.close()
+        return [{key: row[key] for key in row.keys() if key != "payload"} for row in rows]
+
+    def clean(self) -> int:
+        """Delete uploaded items; returns how many."""
+        conn = self._connect()
+        try:
+            return conn.execute("DELETE FROM spool WHERE status = 'done'").rowcount
+        finally:
+            conn.close()
+
+    def _item(self, row: sqlite3.Row) -> Dict[str, Any]:
+        item = {key: row[key] for key in row.keys() if key != "payload"}
+        item["page"] = json.loads(row["payload"])
+        return item
+
+
+def enable_spool(mode: str, path: str = None) -> Optional[Spool]:
+    """Route page creations through a spool ("on-error" or "always")."""
+    if mode == "off":
+        notion_client.set_spool(None, mode)
+        return None
+    if mode not in SPOOL_MODES:
+        raise ValueError(f"Unknown spool mode: {mode}")
+    spool = Spool(path or SPOOL_PATH)
+    notion_client.set_spool(spool, mode)
+    return spool
+
+
+def flush_spool(
+    spool: Spool,
+    pool: TokenPool,
+    retry_failed: bool = False,
+    limit: int = None,
+    max_attempts: int = MAX_ATTEMPTS,
+    on_result: Callable = None,
+) -> List[Dict[str, Any]]:
+    """Upload spooled pages concurrently; returns one result per item.
+
+    Pages with the same parent page are created in spool order, so the
+    parent lists them that way; everything else runs in parallel. Dry runs
+    plan the uploads but leave the spool unchanged.
+    """
+    on_result = on_result or (lambda result: None)
+    dry_run = is_dry_run()
+    items = spool.claim(retry_failed=retry_failed, limit=limit, peek=dry_run)
+
+    def unavailable(error: Exception) -> Dict:
+        return {"unavailable": str(error)}
+
+    results = []
+    with WriteScheduler() as scheduler:
+        jobs = []
+        for item in items:
+            parent = item["page"]["parent"]
+            key = parent.get("page_id") or f"spool-{item['id']}"
+            token = pool.token_for(parent.get("page_id") or parent.get("database_id") or "")
+            jobs.append((item, scheduler.submit(key, upload_page, token, item["page"], on_unavailable=unavailable)))
+
+        for item, future in jobs:
+            result = {"spool_id": item["id"], "command": item["command"], "title": item["title"]}
+            attempts = item["attempts"] + 1
+            try:
+                page = future.result()
+            except IncompletePageError as e:
+                # Created but not completed: uploading it again would duplicate the page
+                if not dry_run:
+                    spool.incomplete(item["id"], attempts, str(e), e.page)
+                result.update(status="incomplete", error=str(e), page_id=e.page.get("id"), url=e.page.get("url"))
+            except Exception as e:
+                if is_timeout(e):
+                    # A timed-out create may have been applied
+                    if not dry_run:
+                        spool.incomplete(item["id"], attempts, str(e))
+                    result.update(status="incomplete", error=str(e))
+                else:
+                    # Rejected by Notion, or skipped behind a rejected item: nothing was created
+                    if not dry_run:
+                        spool.fail(item["id"], attempts, str(e), retry=False)
+                    result.update(status="error", error=str(e))
+            else:
+                if dry_run:
+                    result.update(status="planned")
+                elif "unavailable" in page:
+                    retry = attempts < max_attempts
+                    spool.fail(item["id"], attempts, page["unavailable"], retry=retry)
+                    result.update(status="pending" if retry else "error", error=page["unavailable"])
+                else:
+                    spool.finish(item["id"], attempts, page)
+                    result.update(status="success", page_id=page.get("id"), url=page.get("url"))
+            results.append(result)
+            on_result(result)
+    return results
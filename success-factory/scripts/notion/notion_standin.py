@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the subset of the Notion API used by these scripts.
+
+Implements, in memory:
+- POST /v1/pages, GET/PATCH /v1/pages/{id}
+- GET/PATCH /v1/blocks/{id}/children, DELETE /v1/blocks/{id}
+- POST /v1/databases/{id}/query (title/select/status equals, last_edited_time
+  filters, pagination, filter_properties)
+- GET /v1/users
+
+with configurable latency, jitter, 429 injection, payload limits and request
+accounting (GET /__stats, POST /__reset), so scripts can be exercised and
+measured offline.
+
+Usage:
+    # Start on port 8787 with 120ms +/- 40ms latency and 2% throttling
+    python3 notion_standin.py --port 8787 --latency 120 --jitter 40 --throttle-rate 0.02
+
+    # Point any script at it
+    NOTION_API_BASE=http://127.0.0.1:8787/v1 NOTION_TOKEN=dev python3 create-task.py --name "Test"
+
+    # Inspect request accounting
+    curl http://127.0.0.1:8787/__stats
+"""
+
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+import urllib.parse
+from collections import defaultdict
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, List
+
+from notion_metrics import endpoint_template
+
+
+# Limits enforced by the real API
+MAX_CHILDREN = 100
+MAX_RICH_TEXT_LENGTH = 2000
+MAX_PAYLOAD_BYTES = 500 * 1024
+
+
+class NotionError(Exception):
+    """An error response in Notion's error format."""
+
+    def __init__(self, status: int, code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _plain_text(rich_text: List[Dict]) -> str:
+    return "".join(part.get("text", {}).get("content", "") for part in rich_text or [])
+
+
+def _normalize_properties(properties: Dict) -> Dict:
+    """Shape request property values like API responses: add type and plain_text."""
+    normalized = {}
+    for name, value in properties.items():
+        if isinstance(value, list):
+            value = {"title": value}
+        kind = next((key for key in value if key not in ("id", "type")), None)
+        value = dict(value, type=kind)
+        if kind in ("title", "rich_text"):
+            value[kind] = [dict(part, plain_text=part.get("text", {}).get("content", "")) for part in value[kind]]
+        normalized[name] = value
+    return normalized
+
+
+class NotionStore:
+    """In-memory pages, blocks, databases and users."""
+
+    def __init__(self, users: int = 10):
+        self.lock = threading.Lock()
+        self.pages = {}                         # page_id -> page object
+        self.blocks = {}                        # block_id -> block object
+        self.children = defaultdict(list)       # parent_id -> [block_id]
+        self.database_pages = defaultdict(list)  # database_id -> [page_id]
+        self.users = [
+            {
+                "object": "user",
+                "id": str(uuid.UUID(int=i + 1)),
+                "type": "person",
+                "name": f"Test User {i + 1}",
+                "person": {"email": f"user{i + 1}@example.com"},
+            }
+            for i in range(users)
+        ]
+
+    def _check_rich_text(self, rich_text: List[Dict]):
+        for part in rich_text or []:
+            if len(part.get("text", {}).get("content", "")) > MAX_RICH_TEXT_LENGTH:
+                raise NotionError(400, "validation_error", f"rich_text content length should be ≤ {MAX_RICH_TEXT_LENGTH}")
+
+    def _add_blocks(self, parent_id: str, blocks: List[Dict]) -> List[Dict]:
+        if len(blocks) > MAX_CHILDREN:
+            raise NotionError(400, "validation_error", f"body.children.length should be ≤ {MAX_CHILDREN}, instead was {len(blocks)}")
+        for block in blocks:
+            kind = block.get("type")
+            if not kind or kind not in block:
+                raise NotionError(400, "validation_error", "block type is missing or does not match its content")
+            self._check_rich_text(block[kind].get("rich_text") if isinstance(block[kind], dict) else None)
+
+        created = []
+        for block in blocks:
+            kind = block["type"]
+            stored = {
+                "object": "block",
+                "id": str(uuid.uuid4()),
+                "parent": {"type": "block_id", "block_id": parent_id},
+                "created_time": _now(),
+                "last_edited_time": _now(),
+                "has_children": False,
+                "archived": False,
+                "type": kind,
+                kind: block[kind],
+            }
+            self.blocks[stored["id"]] = stored
+            self.children[parent_id].append(stored["id"])
+            created.append(stored)
+        return created
+
+    def _get_page(self, page_id: str) -> Dict:
+        page = self.pages.get(page_id)
+        if not page:
+            raise NotionError(404, "object_not_found", f"Could not find page with ID: {page_id}.")
+        return page
+
+    def create_page(self, data: Dict) -> Dict:
+        parent = data.get("parent") or {}
+        properties = data.get("properties") or {}
+        for prop in properties.values():
+            # Child pages may pass the title as a bare rich_text list
+            if isinstance(prop, list):
+                self._check_rich_text(prop)
+            else:
+                self._check_rich_text(prop.get("title") or prop.get("rich_text"))
+
+        page_id = str(uuid.uuid4())
+        page = {
+            "object": "page",
+            "id": page_id,
+            "created_time": _now(),
+            "last_edited_time": _now(),
+            "archived": False,
+            "parent": parent,
+            "properties": _normalize_properties(properties),
+            "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+        }
+
+        with self.lock:
+            self._add_blocks(page_id, data.get("children") or [])
+            self.pages[page_id] = page
+            if "database_id" in parent:
+                self.database_pages[parent["database_id"]].append(page_id)
+            elif "page_id" in parent:
+                title = page["properties"].get("title", {}).get("title")
+                child = {
+                    "object": "block",
+                    "id": page_id,
+                    "type": "child_page",
+                    "has_children": True,
+                    "archived": False,
+                    "child_page": {"title": _plain_text(title)},
+                }
+                self.blocks[page_id] = child
+                self.children[parent["page_id"]].append(page_id)
+        return page
+
+    def get_page(self, page_id: str) -> Dict:
+        with self.lock:
+            return self._get_page(page_id)
+
+    def update_page(self, page_id: str, data: Dict) -> Dict:
+        with self.lock:
+            page = self._get_page(page_id)
+            page["properties"].update(_normalize_properties(data.get("properties") or {}))
+            if "archived" in data:
+                page["archived"] = bool(data["archived"])
+            page["last_edited_time"] = _now()
+            return page
+
+    def list_children(self, block_id: str, page_size: int, cursor: Optional[str]) -> Dict:
+        with self.lock:
+            ids = self.children.get(block_id, [])
+            start = ids.index(cursor) if cursor in ids else 0
+            window = ids[start:start + page_size]
+            more = start + page_size < len(ids)
+            return {
+                "object": "list",
+                "results": [self.blocks[i] for i in window],
+                "next_cursor": ids[start + page_size] if more else None,
+                "has_more": more,
+                "type": "block",
+                "block": {},
+            }
+
+    def append_children(self, block_id: str, data: Dict) -> Dict:
+        with self.lock:
+            if block_id not in self.pages and block_id not in self.blocks:
+                raise NotionError(404, "object_not_found", f"Could not find block with ID: {block_id}.")
+            created = self._add_blocks(block_id, data.get("children") or [])
+            if block_id in self.pages:
+                self.pages[block_id]["last_edited_time"] = _now()
+            return {"object": "list", "results": created, "next_cursor": None, "has_more": False}
+
+    def delete_block(self, block_id: str) -> Dict:
+        with self.lock:
+            block = self.blocks.get(block_id)
+            if not block or block.get("archived"):
+                raise NotionError(404, "object_not_found", f"Could not find block with ID: {block_id}.")
+            block["archived"] = True
+            for siblings in self.children.values():
+                if block_id in siblings:
+                    siblings.remove(block_id)
+                    break
+            return block
+
+    def _matches(self, page: Dict, condition: Optional[Dict]) -> bool:
+        if not condition:
+            return True
+        if "and" in condition:
+            return all(self._matches(page, c) for c in condition["and"])
+        if "or" in condition:
+            return any(self._matches(page, c) for c in condition["or"])
+        if condition.get("timestamp") in ("last_edited_time", "created_time"):
+            field = condition["timestamp"]
+            test = condition.get(field, {})
+            value = page[field]
+            if "on_or_after" in test:
+                return value >= test["on_or_after"]
+            if "after" in test:
+                return value > test["after"]
+            if "before" in test:
+                return value < test["before"]
+            return True
+
+        name = condition.get("property")
+        prop = page["properties"].get(name)
+        if prop is None and name == "title":
+            prop = next((p for p in page["properties"].values() if "title" in p), None)
+        if prop is None:
+            return False
+        for kind in ("title", "rich_text"):
+            if kind in condition and kind in prop:
+                return _plain_text(prop[kind]) == condition[kind].get("equals")
+        for kind in ("select", "status"):
+            if kind in condition and prop.get(kind):
+                return prop[kind].get("name") == condition[kind].get("equals")
+        return False
+
+    def query_database(self, database_id: str, data: Dict, filter_properties: List[str]) -> Dict:
+        page_size = min(int(data.get("page_size") or 100), 100)
+        with self.lock:
+            pages = [
+                self.pages[page_id] for page_id in self.database_pages.get(database_id, [])
+                if not self.pages[page_id]["archived"] and self._matches(self.pages[page_id], data.get("filter"))
+            ]
+        ids = [page["id"] for page in pages]
+        cursor = data.get("start_cursor")
+        start = ids.index(cursor) if cursor in ids else 0
+        window = pages[start:start + page_size]
+        if filter_properties:
+            window = [dict(page, properties={k: v for k, v in page["properties"].items() if k in filter_properties}) for page in window]
+        more = start + page_size < len(pages)
+        return {
+            "object": "list",
+            "results": window,
+            "next_cursor": ids[start + page_size] if more else None,
+            "has_more": more,
+            "type": "page_or_database",
+        }
+
+    def list_users(self, page_size: int, cursor: Optional[str]) -> Dict:
+        ids = [user["id"] for user in self.users]
+        start = ids.index(cursor) if cursor in ids else 0
+        more = start + page_size < len(ids)
+        return {
+            "object": "list",
+            "results": self.users[start:start + page_size],
+            "next_cursor": ids[start + page_size] if more else None,
+            "has_more": more,
+            "type": "user",
+        }
+
+
+class RequestStats:
+    """Request accounting exposed at GET /__stats."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.throttled = 0
+            self.errors = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
+            self.by_endpoint = defaultdict(lambda: {"requests": 0, "bytes_in": 0, "bytes_out": 0})
+
+    def record(self, method: str, path: str, status: int, bytes_in: int, bytes_out: int):
+        key = f"{method} {endpoint_template(path)}"
+        with self.lock:
+            self.requests += 1
+            self.throttled += status == 429
+            self.errors += status >= 400 and status != 429
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            entry = self.by_endpoint[key]
+            entry["requests"] += 1
+            entry["bytes_in"] += bytes_in
+            entry["bytes_out"] += bytes_out
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "errors": self.errors,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "by_endpoint": dict(self.by_endpoint),
+            }
+
+
+class StandinConfig:
+    """Latency, throttling and payload settings."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        retry_after: float = 1.0,
+        max_payload: int = MAX_PAYLOAD_BYTES,
+        seed: int = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.max_payload = max_payload
+        self.random = random.Random(seed)
+        self._bucket_lock = threading.Lock()
+        self._tokens = max(rate_limit, 1.0)
+        self._refilled = time.monotonic()
+
+    def delay(self) -> float:
+        with self._bucket_lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def should_throttle(self) -> bool:
+        with self._bucket_lock:
+            if self.throttle_rate and self.random.random() < self.throttle_rate:
+                return True
+            if not self.rate_limit:
+                return False
+            now = time.monotonic()
+            self._tokens = min(max(self.rate_limit, 1.0), self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens < 1:
+                return True
+            self._tokens -= 1
+            return False
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "NotionStandin/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: Dict, headers: Dict[str, str] = None):
+        self._write(status, json.dumps(body).encode('utf-8'), headers)
+
+    def _write(self, status: int, payload: bytes, headers: Dict[str, str] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method: str):
+        raw = b""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            raw = self.rfile.read(length)
+
+        parsed = urllib.parse.urlparse(self.path)
+        path = parsed.path
+        query = urllib.parse.parse_qs(parsed.query)
+
+        if path == "/__stats":
+            self._send(200, self.server.stats.snapshot())
+            return
+        if path == "/__reset":
+            self.server.stats.reset()
+            if "store" in query:
+                self.server.store = NotionStore(len(self.server.store.users))
+            self._send(200, {"status": "reset"})
+            return
+
+        config = self.server.config
+        time.sleep(config.delay())
+
+        headers = None
+        if config.should_throttle():
+            status, body = 429, {
+                "object": "error", "status": 429, "code": "rate_limited",
+                "message": "You have been rate limited. Please try again in a few minutes.",
+            }
+            headers = {"Retry-After": str(config.retry_after)}
+        else:
+            try:
+                status, body = 200, self._route(method, path, query, raw)
+            except NotionError as e:
+                status, body = e.status, {"object": "error", "status": e.status, "code": e.code, "message": e.message}
+
+        # Record before responding, so a client that reads /__stats right
+        # after its last response always sees that request counted
+        payload = json.dumps(body).encode('utf-8')
+        self.server.stats.record(method, path, status, len(raw), len(payload))
+        self._write(status, payload, headers)
+
+    def _route(self, method: str, path: str, query: Dict[str, List[str]], raw: bytes) -> Dict:
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            raise NotionError(401, "unauthorized", "API token is invalid.")
+        if len(raw) > self.server.config.max_payload:
+            raise NotionError(413, "payload_too_large", f"Request body exceeds {self.server.config.max_payload} bytes.")
+        try:
+            data = json.loads(raw) if raw else {}
+        except ValueError:
+            raise NotionError(400, "invalid_json", "Error parsing JSON body.")
+
+        store = self.server.store
+        if not path.startswith("/v1/"):
+            raise NotionError(404, "invalid_request_url", "Invalid request URL.")
+        parts = path[len("/v1/"):].strip("/").split("/")
+        page_size = min(int(query.get("page_size", ["100"])[0]), 100)
+        cursor = query.get("start_cursor", [None])[0]
+
+        if parts == ["pages"] and method == "POST":
+            return store.create_page(data)
+        if len(parts) == 2 and parts[0] == "pages":
+            if method == "GET":
+                return store.get_page(parts[1])
+            if method == "PATCH":
+                return store.update_page(parts[1], data)
+        if len(parts) == 3 and parts[0] == "blocks" and parts[2] == "children":
+            if method == "GET":
+                return store.list_children(parts[1], page_size, cursor)
+            if method == "PATCH":
+                return store.append_children(parts[1], data)
+        if len(parts) == 2 and parts[0] == "blocks" and method == "DELETE":
+            return store.delete_block(parts[1])
+        if len(parts) == 3 and parts[0] == "databases" and parts[2] == "query" and method == "POST":
+            return store.query_database(parts[1], data, query.get("filter_properties", []))
+        if parts == ["users"] and method == "GET":
+            return store.list_users(page_size, cursor)
+        raise NotionError(400, "invalid_request_url", f"Unsupported endpoint: {method} {path}")
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Threaded stand-in server; use start()/stop() to run it in-process."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: StandinConfig = None, users: int = 10, verbose: bool = False):
+        super().__init__((host, port), StandinHandler)
+        self.config = config or StandinConfig()
+        self.store = NotionStore(users)
+        self.stats = RequestStats()
+        self.verbose = verbose
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the Notion API",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --port 8787
+  %(prog)s --port 8787 --latency 120 --jitter 40 --throttle-rate 0.02
+  %(prog)s --port 8787 --rate-limit 3
+
+Then run scripts with:
+  NOTION_API_BASE=http://127.0.0.1:8787/v1 NOTION_TOKEN=dev python3 create-task.py --name "Test"
+        """
+    )
+
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=8787, help="Port (default: 8787)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per request in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latency jitter (+/-) in ms")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Probability of a random 429 response (0-1)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests/second before 429s, like the real API's ~3/s (0 = off)")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--max-payload", type=int, default=MAX_PAYLOAD_BYTES, help="Maximum request body in bytes")
+    parser.add_argument("--users", type=int, default=10, help="Number of fake workspace users")
+    parser.add_argument("--seed", type=int, help="Random seed for jitter and throttling")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Log every request")
+
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        max_payload=args.max_payload,
+        seed=args.seed,
+    )
+    server = StandinServer(args.host, args.port, config, users=args.users, verbose=args.verbose)
+    print(f"Notion stand-in listening on {server.base_url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
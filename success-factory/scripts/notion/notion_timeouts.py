@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Timeouts, deadlines and hedged reads for Notion requests.
+
+Every attempt notion_request makes has a socket timeout (REQUEST_TIMEOUT,
+NOTION_TIMEOUT), so a stalled connection fails instead of hanging a hook
+forever. Timed-out reads are retried like 5xx responses; timed-out writes
+are not, since they may have been applied.
+
+A deadline bounds a whole operation: every attempt's timeout is cut to the
+time left, retries stop waiting at the deadline, and once it has passed
+notion_request raises DeadlineExceeded before sending anything. Set one for
+the whole process (--deadline, NOTION_DEADLINE), for the current thread:
+
+    with request_deadline(10):
+        create_page(token, database_id, properties, blocks)
+
+or with the deadline argument of create_page / update_page. Work that
+notion_client hands to other threads (WriteScheduler jobs, block deletes,
+the query prefetcher, hedges) keeps the deadline it was started under.
+
+Hedged reads: with hedging on (--hedge, NOTION_HEDGE; the default for
+interactive commands), a GET or database query still running after the
+endpoint's recent p95 latency (HEDGE_AFTER until HEDGE_MIN_SAMPLES
+responses were seen) is sent a second time, and whichever response comes
+first wins. The hedge takes its own token from the rate limiter.
+"""
+
+import os
+import time
+import socket
+import threading
+import urllib.error
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from typing import Optional, Dict, Callable, Tuple, Any
+
+
+REQUEST_TIMEOUT = float(os.environ.get("NOTION_TIMEOUT", "30"))  # seconds per attempt
+HEDGE_AFTER = float(os.environ.get("NOTION_HEDGE_AFTER", "1.0"))  # seconds, until p95 is known
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200  # latencies kept per endpoint
+
+
+class DeadlineExceeded(TimeoutError):
+    """The operation's deadline passed before the request could be sent."""
+
+
+def set_request_timeout(seconds: float):
+    """Set the socket timeout of every attempt (seconds)."""
+    global REQUEST_TIMEOUT
+    REQUEST_TIMEOUT = seconds
+
+
+_default_deadline: Optional[float] = None  # time.monotonic() value
+_local = threading.local()
+
+
+def set_default_deadline(seconds: Optional[float]):
+    """Give every request of this process a deadline, seconds from now (None clears it)."""
+    global _default_deadline
+    _default_deadline = time.monotonic() + seconds if seconds else None
+
+
+def current_deadline() -> Optional[float]:
+    """The deadline (a time.monotonic() value) for this thread's requests, if any."""
+    deadlines = [when for when in (getattr(_local, "deadline", None), _default_deadline) if when is not None]
+    return min(deadlines) if deadlines else None
+
+
+@contextmanager
+def deadline_until(when: Optional[float]):
+    """Run the enclosed requests of this thread by a time.monotonic() deadline.
+
+    Nested deadlines never extend an outer one.
+    """
+    previous = getattr(_local, "deadline", None)
+    if when is not None and previous is not None:
+        when = min(when, previous)
+    _local.deadline = when if when is not None else previous
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def request_deadline(seconds: Optional[float]):
+    """Run the enclosed requests of this thread within seconds (None: no extra limit)."""
+    return deadline_until(time.monotonic() + seconds if seconds else None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before this thread's deadline, or None without one."""
+    when = current_deadline()
+    return None if when is None else when - time.monotonic()
+
+
+def check_deadline(what: str = "request"):
+    """Raise DeadlineExceeded if this thread's deadline has passed."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before {what} ({-left:.1f}s ago)")
+
+
+def attempt_timeout() -> float:
+    """Socket timeout for the next attempt: REQUEST_TIMEOUT, cut to the deadline."""
+    left = remaining()
+    return REQUEST_TIMEOUT if left is None else max(0.001, min(REQUEST_TIMEOUT, left))
+
+
+def is_timeout(error: BaseException) -> bool:
+    """True for socket timeouts, including connect timeouts wrapped by urllib."""
+    if isinstance(error, urllib.error.URLError):
+        error = error.reason
+    return isinstance(error, (socket.timeout, TimeoutError))
+
+
+class LatencyTracker:
+    """Recent transport latencies per endpoint, for hedging thresholds."""
+
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, str], deque] = {}
+
+    def observe(self, method: str, endpoint: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get((method, endpoint))
+            if samples is None:
+                samples = self._samples[(method, endpoint)] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def p95(self, method: str, endpoint: str) -> Optional[float]:
+        """p95 latency, or None until HEDGE_MIN_SAMPLES were observed."""
+        with self._lock:
+            samples = sorted(self._samples.get((method, endpoint), ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[int(0.95 * (len(samples) - 1))]
+
+
+LATENCIES = LatencyTracker()
+_hedging = os.environ.get("NOTION_HEDGE", "").lower() in ("1", "true", "yes", "on")
+
+
+def set_hedging(enabled: bool):
+    """Turn hedged reads on or off for this process."""
+    global _hedging
+    _hedging = enabled
+
+
+def hedge_delay(method: str, endpoint: str) -> Optional[float]:
+    """Seconds after which a read of endpoint (a template) gets hedged, or None."""
+    if not _hedging:
+        return None
+    p95 = LATENCIES.p95(method, endpoint)
+    return HEDGE_AFTER if p95 is None else p95
+
+
+def _start(call: Callable[[], Any]) -> Future:
+    # Daemon threads, so an abandoned stalled request never delays exit
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(call())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="notion-hedge", daemon=True).start()
+    return future
+
+
+def hedged_call(call: Callable[[], Any], delay: float, before_hedge: Callable[[], None] = None) -> Tuple[Any, bool]:
+    """Run call(); if it takes longer than delay, run it again and take the first success.
+
+    Returns (result, hedged). Raises the primary's error if both fail.
+    before_hedge runs before the second call (e.g. to take a rate limit token).
+    """
+    primary = _start(call)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result(), False
+
+    if before_hedge:
+        before_hedge()
+    if primary.done():
+        return primary.result(), False
+    secondary = _start(call)
+    pending = {primary, secondary}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), True
+    return primary.result(), True
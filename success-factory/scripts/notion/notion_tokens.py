@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Integration token pools for bulk jobs.
+
+Notion rate limits apply per integration, so large migrations and imports
+can spread independent jobs (different pages or databases) across several
+integrations. Each token already gets its own shared rate limiter and
+concurrency window in notion_client.
+
+Pool sources, first match wins:
+- NOTION_TOKENS: tokens separated by commas or whitespace
+- NOTION_TOKENS_FILE: one token per line (# comments allowed)
+- The single token from get_notion_token()
+
+Every integration in the pool must be shared with the pages it writes to.
+
+A key (page ID, database name) always maps to the same token via
+rendezvous hashing, so one page's writes stay on one token and keep their
+order. Callers pick keys that stay stable for the whole job: sync-tree.py
+uses file paths, flush-spool.py the parent page or database.
+"""
+
+import os
+import hashlib
+from typing import List
+
+from notion_client import get_notion_token
+
+
+def get_notion_tokens() -> List[str]:
+    """Load the integration token pool (at least one token)."""
+    tokens = os.environ.get("NOTION_TOKENS", "").replace(",", " ").split()
+    if not tokens and os.environ.get("NOTION_TOKENS_FILE"):
+        with open(os.path.expanduser(os.environ["NOTION_TOKENS_FILE"]), 'r') as f:
+            tokens = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not tokens:
+        tokens = [get_notion_token()]
+    # Drop duplicates, keep order
+    return list(dict.fromkeys(tokens))
+
+
+class TokenPool:
+    """Maps job keys (page IDs, database names) to pool tokens."""
+
+    def __init__(self, tokens: List[str]):
+        if not tokens:
+            raise ValueError("TokenPool needs at least one token")
+        self.tokens = list(tokens)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def token_for(self, key: str) -> str:
+        """The token for a key: the rendezvous-hash winner."""
+        key = key.replace("-", "")
+        if len(self.tokens) == 1:
+            return self.tokens[0]
+        return max(self.tokens, key=lambda token: hashlib.sha256(f"{token}:{key}".encode('utf-8')).digest())
+
+
+def load_token_pool() -> TokenPool:
+    """TokenPool over get_notion_tokens()."""
+    return TokenPool(get_notion_tokens())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Lightweight phase tracing in Chrome trace-event format.
+
+Spans are recorded only while tracing is enabled (--trace FILE on any CLI,
+or NOTION_TRACE_FILE); otherwise span() is a no-op. The output opens in
+chrome://tracing or https://ui.perfetto.dev.
+
+Usage:
+    from notion_trace import span
+
+    with span("markdown_to_blocks", lines=120):
+        ...
+
+    @traced("parse_problem_md")
+    def parse_problem_md(path): ...
+
+Every notion_request call is traced as an "http" span, so nested phases show
+how much of their time was Python work and how much was network waits.
+"""
+
+import os
+import json
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any
+
+from notion_metrics import add_request_hook
+
+
+class Tracer:
+    """Collects complete ("X") trace events from any thread."""
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._threads: Dict[int, str] = {}
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        """Start recording spans, including one per Notion API request."""
+        if not self.enabled:
+            self.enabled = True
+            add_request_hook(self._record_request)
+
+    def add(self, name: str, cat: str, start: float, end: float, args: Dict[str, Any]):
+        """Record a finished span; start and end are time.perf_counter() values."""
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+
+    @contextmanager
+    def _record(self, name: str, cat: str, args: Dict[str, Any]):
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, cat, start, time.perf_counter(), args)
+
+    def _record_request(self, event: Dict[str, Any]):
+        # Request hooks run right after the request, on the requesting thread
+        end = time.perf_counter()
+        args = {key: event[key] for key in ("status", "bytes_out", "bytes_in", "retries") if key in event}
+        self.add(f"{event['method']} {event['endpoint']}", "http", end - event.get("latency", 0.0), end, args)
+
+    def span(self, name: str, cat: str = "phase", **args):
+        """Context manager timing one phase; yields its args dict for adding results."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._record(name, cat, args)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            metadata = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for tid, name in self._threads.items()
+            ]
+            return {"traceEvents": metadata + list(self.events), "displayTimeUnit": "ms"}
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+TRACER = Tracer()
+span = TRACER.span
+
+
+def traced(name: str):
+    """Decorator tracing every call of a function as one span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with TRACER.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Sync directory trees of markdown files into a Notion page hierarchy.
+
+Each directory becomes a page and each markdown file a child page of its
+directory's page, under one parent page. A state file maps every synced
+path to its page ID and a content hash, so:
+
+- Unchanged files and directories make no requests at all
+- Changed files have their page title and content replaced
+- Pages whose file or directory was removed are archived
+
+Pages are written through a WriteScheduler keyed by the parent page, so
+siblings are created in a stable order (README.md first, then files, then
+subdirectories) while different directories and page bodies upload
+concurrently. Directories without any markdown files are skipped.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import defaultdict
+from typing import Optional, Dict, List, Any, Callable
+
+from notion_client import (
+    CACHE_DIR, WriteScheduler, notion_request, create_child_page, update_page,
+    delete_children, markdown_to_blocks, title_property, document_lock
+)
+from notion_tokens import TokenPool
+from notion_dryrun import is_dry_run
+
+
+TREE_DIR = os.path.join(CACHE_DIR, "tree")
+
+
+def _hash(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode('utf-8')).hexdigest()
+
+
+def _file_title(content: str, file_name: str) -> str:
+    """First H1 of a markdown file, else its name without .md."""
+    for line in content.splitlines():
+        if line.startswith("# "):
+            return line[2:].strip()
+    return file_name[:-3] if file_name.endswith(".md") else file_name
+
+
+def scan_tree(roots: List[str]) -> List[Dict[str, Any]]:
+    """List the directories and markdown files under roots, parents first.
+
+    Paths are relative to each root's parent directory ("knowledge/brand/voice.md").
+    """
+    entries = []
+    for root in roots:
+        root = os.path.abspath(root)
+        base = os.path.dirname(root)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+            rel_dir = os.path.relpath(dirpath, base).replace(os.sep, "/")
+            parent = os.path.dirname(rel_dir) if dirpath != root else None
+            name = os.path.basename(dirpath)
+            entries.append({"path": rel_dir, "kind": "dir", "parent": parent, "title": name, "hash": _hash("dir", name)})
+
+            files = sorted(name for name in filenames if name.endswith(".md") and not name.startswith("."))
+            files.sort(key=lambda name: name.lower() != "readme.md")
+            for file_name in files:
+                file_path = os.path.join(dirpath, file_name)
+                with open(file_path, 'r') as f:
+                    content = f.read()
+                title = _file_title(content, file_name)
+                entries.append({
+                    "path": f"{rel_dir}/{file_name}",
+                    "kind": "file",
+                    "parent": rel_dir,
+                    "title": title,
+                    "file": file_path,
+                    "hash": _hash("file", title, content),
+                })
+
+    # Keep only directories with markdown somewhere below them
+    needed = set()
+    for entry in entries:
+        if entry["kind"] == "file":
+            parent = entry["parent"]
+            while parent and parent not in needed:
+                needed.add(parent)
+                parent = os.path.dirname(parent)
+    entries = [entry for entry in entries if entry["kind"] == "file" or entry["path"] in needed]
+
+    # Files before subdirectories within each directory
+    order = {entry["path"]: index for index, entry in enumerate(entries)}
+    return sorted(entries, key=lambda entry: (order.get(entry["parent"], -1), entry["kind"] == "dir", order[entry["path"]]))
+
+
+def state_path(parent_id: str, tree_dir: str = TREE_DIR) -> str:
+    """Default state file for a tree synced under parent_id."""
+    return os.path.join(tree_dir, f"{parent_id.replace('-', '')}.json")
+
+
+def load_state(path: str) -> Dict[str, Any]:
+    """Load a tree-sync state file ({"pages": {path: {page_id, hash, url}}})."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"pages": {}}
+
+
+def save_state(path: str, state: Dict[str, Any]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+class TreeSync:
+    """One sync of scanned entries into the pages recorded in a state dict."""
+
+    def __init__(self, pool: TokenPool, parent_id: str, state: Dict[str, Any], force: bool = False, log: Callable = None):
+        self.pool = pool
+        self.parent_id = parent_id
+        self.pages: Dict[str, Dict[str, Any]] = state.setdefault("pages", {})
+        self.force = force
+        self.log = log or (lambda message: None)
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._children: Dict[Optional[str], List[Dict]] = defaultdict(list)
+        self._appends: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        self._scheduler: Optional[WriteScheduler] = None
+
+    def run(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create, update and archive pages; returns one result per path."""
+        for entry in entries:
+            self._children[entry["parent"]].append(entry)
+        scanned = {entry["path"] for entry in entries}
+        removed = [path for path in self.pages if path not in scanned]
+
+        with WriteScheduler() as scheduler:
+            self._scheduler = scheduler
+            for entry in self._children[None]:
+                scheduler.submit(self.parent_id, self._sync, entry, self.parent_id)
+            for path in removed:
+                # Archiving a page archives its subpages too
+                if os.path.dirname(path) not in removed:
+                    scheduler.submit(self.pages[path]["page_id"], self._archive, path, removed)
+
+        # A page's content only counts as synced once every append landed
+        for path, appends in self._appends.items():
+            for append in appends:
+                try:
+                    append.result()
+                except (RuntimeError, OSError) as e:
+                    self.pages[path]["hash"] = ""
+                    self.results[path].update({"status": "error", "error": str(e)})
+                    break
+
+        ordered = []
+        for entry in entries:
+            ordered.append(self.results.get(entry["path"]) or {"path": entry["path"], "status": "skipped", "error": "parent page failed"})
+        ordered.extend(self.results[path] for path in removed if path in self.results)
+        return ordered
+
+    def _sync(self, entry: Dict[str, Any], parent_page_id: str):
+        path = entry["path"]
+        token = self.pool.token_for(path)
+        known = self.pages.get(path)
+        appends = []
+        try:
+            if known and (known["hash"] == entry["hash"] and not (self.force and entry["kind"] == "file")):
+                action, page = "unchanged", {"id": known["page_id"], "url": known.get("url")}
+            else:
+                blocks = []
+                if entry["kind"] == "file":
+                    with open(entry["file"], 'r') as f:
+                        blocks = markdown_to_blocks(f.read())
+                page = None
+                if known:
+                    try:
+                        update_page(token, known["page_id"], properties={"title": title_property(entry["title"])["title"]})
+                        if entry["kind"] == "file":
+                            deleted = delete_children(token, known["page_id"])
+                            if deleted["failed"]:
+                                raise RuntimeError(f"Could not clear {len(deleted['failed'])} blocks")
+                        action, page = "updated", {"id": known["page_id"], "url": known.get("url")}
+                        appends = self._scheduler.append_blocks(token, page["id"], blocks)
+                    except RuntimeError as e:
+                        # Deleted in Notion since the last sync: recreate it
+                        if "object_not_found" not in str(e):
+                            raise
+                if page is None:
+                    action, page = "created", create_child_page(token, parent_page_id, entry["title"], blocks[:100])
+                    appends = self._scheduler.append_blocks(token, page["id"], blocks[100:])
+        except (RuntimeError, OSError) as e:
+            with self._lock:
+                self.results[path] = {"path": path, "status": "error", "error": str(e)}
+            self.log(f"  error {path}: {e}")
+            return
+
+        with self._lock:
+            self.pages[path] = {"page_id": page["id"], "hash": entry["hash"], "url": page.get("url")}
+            self._appends[path] = appends
+            self.results[path] = {"path": path, "status": action, "page_id": page["id"], "url": page.get("url")}
+        if action != "unchanged":
+            self.log(f"  {action} {path}")
+
+        for child in self._children[path]:
+            self._scheduler.submit(page["id"], self._sync, child, page["id"])
+
+    def _archive(self, path: str, removed: List[str]):
+        page_id = self.pages[path]["page_id"]
+        try:
+            notion_request("PATCH", f"/pages/{page_id}", self.pool.token_for(path), {"archived": True})
+        except RuntimeError as e:
+            if "object_not_found" not in str(e):
+                with self._lock:
+                    self.results[path] = {"path": path, "status": "error", "error": str(e)}
+                self.log(f"  error {path}: {e}")
+                return
+
+        with self._lock:
+            for other in removed:
+                if other == path or other.startswith(f"{path}/"):
+                    self.pages.pop(other, None)
+            self.results[path] = {"path": path, "status": "archived", "page_id": page_id}
+        self.log(f"  archived {path}")
+
+
+def sync_tree(
+    pool: TokenPool,
+    roots: List[str],
+    parent_id: str,
+    state_file: str = None,
+    force: bool = False,
+    log: Callable = None,
+) -> List[Dict[str, Any]]:
+    """Sync directory trees under a parent page, returning one result per path.
+
+    The state file (default: NOTION_CACHE_DIR/tree/<parent>.json) is saved
+    even when some pages fail, so the next run only retries those. Dry runs
+    never save it.
+
+    Syncs sharing a state file run one at a time, across processes, so a
+    second concurrent sync starts from the first one's state and only
+    writes what changed since.
+    """
+    state_file = state_file or state_path(parent_id)
+    with document_lock(f"tree:{os.path.abspath(state_file)}"):
+        state = load_state(state_file)
+        try:
+            return TreeSync(pool, parent_id, state, force=force, log=log).run(scan_tree(roots))
+        finally:
+            state["parent"] = parent_id
+            if not is_dry_run():
+                save_state(state_file, state)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Cached Notion user directory.
+
+Resolves people by name or email without a per-run API call:
+- Fetches the workspace directory from paginated GET /users
+- Caches it locally (NOTION_CACHE_DIR, default ~/.cache/moovs-factory) with a TTL
+- Builds a normalized index (case-folded, accent-stripped) keyed by full name,
+  first name, email and email local part
+
+Usage:
+    # Refresh the cache and list people
+    python3 notion_users.py --refresh
+
+    # Resolve a name
+    python3 notion_users.py "Márton"
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import unicodedata
+import urllib.parse
+from typing import Optional, Dict, List, Any
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from notion_client import get_notion_token, notion_request, is_offline, CACHE_DIR
+from notion_cli import add_common_arguments, apply_common_arguments
+from notion_dryrun import is_dry_run
+
+
+USERS_CACHE_PATH = os.path.join(CACHE_DIR, "notion-users.json")
+USERS_CACHE_TTL = int(os.environ.get("NOTION_USERS_TTL", str(24 * 3600)))  # seconds
+
+# Nicknames Notion doesn't know about (normalized name -> user ID), checked first
+USER_ALIASES = {
+    "pol": "34e46df4-06b4-46be-b7de-f7b7a66e13b0",  # John Cervantes
+}
+
+
+def normalize_name(text: str) -> str:
+    """Normalize a name or email for lookup: case-folded, accent-stripped, single-spaced."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def list_users(token: str) -> List[Dict[str, Any]]:
+    """Fetch every person in the workspace via paginated GET /users."""
+    users = []
+    cursor = None
+    while True:
+        params = {"page_size": 100}
+        if cursor:
+            params["start_cursor"] = cursor
+        result = notion_request("GET", f"/users?{urllib.parse.urlencode(params)}", token)
+        for user in result.get("results", []):
+            if user.get("type") != "person":
+                continue
+            users.append({
+                "id": user["id"],
+                "name": user.get("name") or "",
+                "email": (user.get("person") or {}).get("email") or "",
+            })
+        cursor = result.get("next_cursor")
+        if not result.get("has_more") or not cursor:
+            return users
+
+
+def build_user_index(users: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Build a normalized name/email -> user ID index.
+
+    Full names and emails always map to their user. First names and email
+    local parts are only indexed when they identify a single person, so two
+    teammates called "Chris" never resolve to the wrong one.
+    """
+    index = {}
+    shared_keys = {}
+
+    for user in users:
+        name = normalize_name(user.get("name", ""))
+        email = normalize_name(user.get("email", ""))
+
+        for key in (name, email):
+            if key:
+                index[key] = user["id"]
+
+        for key in (name.split(" ")[0] if name else "", email.split("@")[0] if email else ""):
+            if key:
+                shared_keys.setdefault(key, set()).add(user["id"])
+
+    for key, user_ids in shared_keys.items():
+        if len(user_ids) == 1 and key not in index:
+            index[key] = next(iter(user_ids))
+
+    return index
+
+
+def _read_cache() -> Optional[Dict[str, Any]]:
+    """Read the cached directory, or None if missing/corrupt."""
+    try:
+        with open(USERS_CACHE_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(cache: Dict[str, Any]):
+    """Write the directory cache atomically."""
+    os.makedirs(os.path.dirname(USERS_CACHE_PATH), exist_ok=True)
+    tmp_path = f"{USERS_CACHE_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, USERS_CACHE_PATH)
+
+
+def refresh_user_directory(token: str) -> Dict[str, Any]:
+    """Fetch the directory from Notion and rewrite the cache."""
+    users = list_users(token)
+    cache = {
+        "fetched_at": time.time(),
+        "users": users,
+        "index": build_user_index(users),
+    }
+    # A dry run only sees an empty placeholder directory
+    if not is_dry_run():
+        _write_cache(cache)
+    return cache
+
+
+def load_user_directory(token: str = None, ttl: int = USERS_CACHE_TTL, refresh: bool = False) -> Dict[str, Any]:
+    """Load the cached directory, refreshing it from Notion once it is older than ttl.
+
+    If the refresh fails (Notion unreachable, missing user capability), a
+    stale cache is still returned rather than failing the caller. Offline
+    (--offline), the cache is never refreshed.
+    """
+    cache = _read_cache()
+    fresh = cache is not None and time.time() - cache.get("fetched_at", 0) < ttl
+
+    if fresh and not refresh:
+        return cache
+    if is_offline():
+        if cache is None:
+            raise RuntimeError("Notion user directory is not cached and Notion can't be called offline")
+        return cache
+
+    try:
+        return refresh_user_directory(token or get_notion_token())
+    except (RuntimeError, OSError) as e:
+        if cache is None:
+            raise
+        print(f"Warning: Could not refresh Notion users, using cached directory: {e}", file=sys.stderr)
+        return cache
+
+
+def resolve_user(name_or_email: str, token: str = None) -> Optional[str]:
+    """Resolve a name, first name or email to a Notion user ID.
+
+    USER_ALIASES are checked first. Returns None if the name is unknown, or
+    if Notion can't be reached and nothing is cached.
+    """
+    key = normalize_name(name_or_email)
+    if not key:
+        return None
+    if key in USER_ALIASES:
+        return USER_ALIASES[key]
+    try:
+        directory = load_user_directory(token)
+    except (RuntimeError, OSError) as e:
+        print(f"Warning: Notion user directory unavailable: {e}", file=sys.stderr)
+        return None
+    return directory.get("index", {}).get(key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve people against the cached Notion user directory")
+    parser.add_argument("names", nargs="*", help="Names or emails to resolve")
+    parser.add_argument("--refresh", action="store_true", help="Refresh the cache from Notion before resolving")
+
+    add_common_arguments(parser, lane="interactive")
+    args = parser.parse_args()
+    apply_common_arguments(args)
+
+    directory = load_user_directory(refresh=args.refresh)
+
+    if not args.names:
+        print(json.dumps(directory["users"], indent=2))
+        return
+
+    index = directory.get("index", {})
+    results = {name: USER_ALIASES.get(normalize_name(name)) or index.get(normalize_name(name)) for name in args.names}
+    print(json.dumps(results, indent=2))
+
+    if not all(results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Run a batch plan of Notion operations in one process.
+
+Steps can refer to the results of earlier steps (${id.page_id}, ${id.url}),
+so a parent page, its child pages and a ticket linking them are created in
+one run instead of copying IDs between scripts. Independent steps run
+concurrently. See notion_plan for the plan format.
+
+Usage:
+    python3 run-plan.py launch.jsonl
+    cat launch.jsonl | python3 run-plan.py -
+
+Example plan (JSONL):
+    {"id": "hub", "op": "create_page", "parent_id": "abc123", "name": "Shuttle Launch"}
+    {"id": "spec", "op": "create_page", "parent_id": "${hub.page_id}", "file": "spec.md"}
+    {"id": "faq", "op": "create_page", "parent_id": "${hub.page_id}", "file": "faq.md"}
+    {"id": "ticket", "op": "create_ticket", "name": "Launch shuttle", "type": "Feature", "body": "Spec: ${spec.url}"}
+    {"op": "append", "page_id": "${hub.page_id}", "body": "Tracking ticket: ${ticket.url}"}
+
+Prints one JSON line per step as it finishes (with its id and op).
+"""
+
+import sys
+import os
+import argparse
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from notion_cli import add_common_arguments, apply_common_arguments
+from notion_plan import load_plan, run_plan
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run a batch plan of Notion operations",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ops: create_page, create_ticket, create_task, create_document, create_feedback, append, update_page
+
+Examples:
+  %(prog)s launch.jsonl
+  %(prog)s launch.yaml
+        """
+    )
+
+    parser.add_argument("plan", help="Plan file (JSONL, JSON array, or YAML with PyYAML); - for stdin")
+
+    add_common_arguments(parser)
+    args = parser.parse_args()
+    apply_common_arguments(args)
+
+    try:
+        if args.plan == "-":
+            steps = load_plan("stdin.jsonl", sys.stdin.read())
+        else:
+            steps = load_plan(args.plan)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Running {len(steps)} steps...", file=sys.stderr)
+    results = run_plan(steps, on_result=lambda result: print(json.dumps(result), flush=True))
+
+    failed = [name for name, result in results.items() if result.get("status") in ("error", "skipped")]
+    if failed:
+        print(f"Failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
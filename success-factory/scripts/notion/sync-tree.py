@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Sync markdown directory trees (knowledge/, factory/) into Notion pages.
+
+Each directory becomes a page and each markdown file a child page, under
+one parent page. Only new and changed files are written; pages whose files
+were removed are archived. Re-syncing an unchanged tree makes no requests.
+
+Usage:
+    # Sync knowledge/ and factory/ (the default roots)
+    python3 sync-tree.py --parent <page_id>
+
+    # Sync one directory
+    python3 sync-tree.py ../../knowledge/customers --parent <page_id>
+
+    # Rewrite every page (e.g. after a markdown converter change)
+    python3 sync-tree.py --parent <page_id> --force
+
+Prints one JSON line per path with its status: created, updated, unchanged,
+archived, skipped or error.
+"""
+
+import sys
+import os
+import argparse
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from notion_cli import add_common_arguments, apply_common_arguments
+from notion_tokens import load_token_pool
+from notion_tree import sync_tree, state_path
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_ROOTS = [os.path.join(REPO_DIR, "knowledge"), os.path.join(REPO_DIR, "factory")]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Sync markdown directory trees into a Notion page hierarchy",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --parent abc123
+  %(prog)s ../../knowledge/customers --parent abc123
+  %(prog)s --parent abc123 --force
+        """
+    )
+
+    parser.add_argument("roots", nargs="*", metavar="dir", help="Directories to sync (default: knowledge/ and factory/)")
+    parser.add_argument("--parent", "-p", required=True, help="Parent page ID")
+    parser.add_argument("--state", help="State file (default: NOTION_CACHE_DIR/tree/<parent>.json)")
+    parser.add_argument("--force", action="store_true", help="Rewrite every file's page even if unchanged")
+
+    add_common_arguments(parser, lane="bulk")
+    args = parser.parse_args()
+    apply_common_arguments(args)
+
+    roots = args.roots or [root for root in DEFAULT_ROOTS if os.path.isdir(root)]
+    for root in roots:
+        if not os.path.isdir(root):
+            parser.error(f"Not a directory: {root}")
+
+    try:
+        pool = load_token_pool()
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Syncing {', '.join(os.path.relpath(root) for root in roots)}...", file=sys.stderr)
+    results = sync_tree(
+        pool,
+        roots,
+        args.parent,
+        state_file=args.state or state_path(args.parent),
+        force=args.force,
+        log=lambda message: print(message, file=sys.stderr),
+    )
+
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        print(json.dumps(result), flush=True)
+    print(", ".join(f"{status} {count}" for status, count in sorted(counts.items())) or "Nothing to sync", file=sys.stderr)
+
+    if counts.get("error") or counts.get("skipped"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
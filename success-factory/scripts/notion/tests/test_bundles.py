@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for creating many documents from one markdown bundle."""
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from notion_client import split_documents
+from notion_standin import StandinServer
+
+
+class SplitDocumentsTest(unittest.TestCase):
+
+    def test_preamble_joins_the_first_document(self):
+        documents = split_documents("Shared intro\n\n# First\nOne\n```\n# not a heading\n```\n# Second\nTwo\n")
+        self.assertEqual(documents, ["Shared intro\n\n# First\nOne\n```\n# not a heading\n```\n", "# Second\nTwo\n"])
+
+
+class CreatePageBundleTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandinServer("127.0.0.1", 0).start()
+        self.addCleanup(self.server.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.env = dict(os.environ, NOTION_API_BASE=self.server.base_url, NOTION_TOKEN="test", NOTION_RATE_LIMIT="0", NOTION_CACHE_DIR=tmp.name)
+        self.parent = self.server.store.create_page({"parent": {"page_id": "root"}, "properties": {}})["id"]
+
+    def create_bundle(self, markdown: str, *options: str) -> list:
+        path = os.path.join(self.tmp, "bundle.md")
+        with open(path, 'w') as f:
+            f.write(markdown)
+        result = subprocess.run(
+            [sys.executable, os.path.join(SCRIPTS_DIR, "create-page.py"), path, "--parent", self.parent, "--bundle", *options],
+            env=self.env, capture_output=True, text=True, timeout=60,
+        )
+        return [json.loads(line) for line in result.stdout.splitlines()]
+
+    def test_a_failing_document_does_not_fail_the_others(self):
+        # Only the second document is too large for the stand-in to accept
+        self.server.config.max_payload = 4000
+        bundle = "# One\nFirst\n# Two\n" + "\n\n".join("x" * 100 for _ in range(60)) + "\n# Three\nThird\n"
+        for options in ((), ("--split-over", "1")):
+            with self.subTest(options=options):
+                results = self.create_bundle(bundle, *options)
+                self.assertEqual([result["status"] for result in results], ["success", "error", "success"])
+
+
+if __name__ == "__main__":
+    unittest.main()
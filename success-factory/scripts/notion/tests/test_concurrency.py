@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Tests for the adaptive (AIMD) concurrency window and concurrent deletes."""
+
+import os
+import sys
+import time
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notion_client
+from notion_client import append_blocks, delete_children, list_children, markdown_to_blocks
+from notion_concurrency import AIMDController
+from notion_standin import StandinServer
+
+
+class AIMDControllerTest(unittest.TestCase):
+
+    def complete(self, controller: AIMDController, status: int, latency: float = 0.01):
+        controller.acquire()
+        controller.release(status, latency)
+
+    def test_window_grows_by_about_one_per_window_of_successes(self):
+        controller = AIMDController(initial=2.0, maximum=8.0)
+        for _ in range(2):
+            self.complete(controller, 200)
+        self.assertAlmostEqual(controller.window, 3.0, delta=0.2)
+        for _ in range(100):
+            self.complete(controller, 200)
+        self.assertEqual(controller.window, 8.0)
+
+    def test_a_burst_of_429s_halves_the_window_once(self):
+        controller = AIMDController(initial=8.0, maximum=8.0)
+        # Three requests in flight together, all throttled
+        for _ in range(3):
+            controller.acquire()
+        for _ in range(3):
+            controller.release(429, 0.01)
+        self.assertEqual(controller.window, 4.0)
+
+    def test_latency_well_above_the_baseline_halves_the_window(self):
+        controller = AIMDController(initial=8.0, maximum=8.0)
+        self.complete(controller, 200, 0.01)
+        self.complete(controller, 200, 1.0)
+        self.assertEqual(controller.window, 4.0)
+
+    def test_window_never_drops_below_the_minimum(self):
+        controller = AIMDController(initial=1.0, minimum=1.0)
+        self.complete(controller, 429)
+        self.assertEqual(controller.window, 1.0)
+
+    def test_acquire_waits_for_a_free_slot(self):
+        controller = AIMDController(initial=1.0, maximum=1.0)
+        controller.acquire()
+        acquired = threading.Event()
+        waiter = threading.Thread(target=lambda: (controller.acquire(), acquired.set()))
+        waiter.start()
+        self.assertFalse(acquired.wait(0.2))
+        controller.release()
+        self.assertTrue(acquired.wait(5))
+        waiter.join()
+
+
+class DeleteChildrenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandinServer("127.0.0.1", 0).start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(setattr, notion_client, "API_BASE", notion_client.API_BASE)
+        notion_client.API_BASE = self.server.base_url
+        self.addCleanup(notion_client.set_rate_limit, notion_client.RATE_LIMIT)
+        notion_client.set_rate_limit(0)
+        self.addCleanup(notion_client.set_read_cache, notion_client.READ_CACHE)
+        notion_client.set_read_cache("off")
+        self.page = self.server.store.create_page({"parent": {"page_id": "root"}, "properties": {}})["id"]
+        append_blocks("token", self.page, markdown_to_blocks("\n\n".join(f"Paragraph {i}" for i in range(20))))
+
+        self.in_flight = self.peak = 0
+        self.lock = threading.Lock()
+        self.vanish = set()
+        transport = notion_client.get_transport()
+
+        def slow_deletes(method, endpoint, headers, payload, timeout=None):
+            if method != "DELETE":
+                return transport(method, endpoint, headers, payload, timeout=timeout)
+            block_id = endpoint.rsplit("/", 1)[-1]
+            if block_id in self.vanish:
+                self.server.store.delete_block(block_id)
+            with self.lock:
+                self.in_flight += 1
+                self.peak = max(self.peak, self.in_flight)
+            try:
+                time.sleep(0.02)
+                return transport(method, endpoint, headers, payload, timeout=timeout)
+            finally:
+                with self.lock:
+                    self.in_flight -= 1
+
+        self.addCleanup(notion_client.set_transport, notion_client.set_transport(slow_deletes))
+
+    def test_children_are_deleted_concurrently(self):
+        result = delete_children("token", self.page)
+        self.assertEqual(result, {"deleted": 20, "failed": {}})
+        self.assertEqual(list_children("token", self.page), [])
+        self.assertGreater(self.peak, 1)
+        self.assertLessEqual(self.peak, notion_client.MAX_CONCURRENCY)
+
+    def test_failed_deletes_are_reported_per_block(self):
+        children = list_children("token", self.page)
+        self.vanish.add(children[3]["id"])
+        result = delete_children("token", self.page)
+        self.assertEqual(result["deleted"], 19)
+        self.assertEqual(list(result["failed"]), [children[3]["id"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
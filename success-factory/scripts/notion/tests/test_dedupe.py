@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Tests for local duplicate detection over mirrored pages."""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion_dedupe import estimate_similarity, find_duplicates, minhash, shingles
+from notion_mirror import snapshot_path
+
+REPORT = (
+    "Customers on the shuttle plan cannot export their trip history to CSV. "
+    "The export button spins forever and the download never starts for large fleets."
+)
+
+
+class MinHashTest(unittest.TestCase):
+
+    def test_similarity_tracks_shared_shingles(self):
+        report = minhash(shingles(REPORT))
+        self.assertEqual(estimate_similarity(report, minhash(shingles(REPORT))), 1.0)
+        reworded = minhash(shingles(REPORT.replace("large fleets", "big fleets today")))
+        self.assertGreater(estimate_similarity(report, reworded), 0.6)
+        unrelated = minhash(shingles("Invoice totals round tax twice when a promo code and a gift card are combined."))
+        self.assertLess(estimate_similarity(report, unrelated), 0.2)
+
+    def test_short_texts_fall_back_to_words(self):
+        self.assertEqual(shingles("Export broken"), {"export", "broken"})
+
+
+class FindDuplicatesTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.mirror_dir = tmp.name
+        self.records = []
+        self.add("page-1", "CSV export hangs", REPORT)
+        self.add("page-2", "Promo codes and tax", "Invoice totals round tax twice when a promo code is applied.")
+
+    def add(self, page_id: str, title: str, text: str):
+        self.records.append({"id": page_id, "url": f"https://notion.so/{page_id}", "properties": {"Name": title}, "text": text})
+        path = snapshot_path("tickets", "jsonl", self.mirror_dir)
+        with open(path, 'w') as f:
+            f.writelines(json.dumps(record) + "\n" for record in self.records)
+        # The index is rebuilt when the snapshot is newer than it
+        os.utime(path, (len(self.records), len(self.records)))
+
+    def find(self, title: str, body: str = "") -> list:
+        return [match["page_id"] for match in find_duplicates("tickets", title, body, mirror_dir=self.mirror_dir)]
+
+    def test_reworded_body_matches_under_another_title(self):
+        body = REPORT.replace("spins forever", "keeps spinning forever")
+        self.assertEqual(self.find("Trip history download stuck", body), ["page-1"])
+
+    def test_title_overlap_matches_without_a_body(self):
+        self.assertEqual(self.find("CSV export hangs"), ["page-1"])
+        self.assertEqual(self.find("Driver app crashes on login"), [])
+
+    def test_pages_added_to_the_snapshot_are_indexed(self):
+        self.assertEqual(self.find("Dark mode for the dispatch board"), [])
+        self.add("page-3", "Dark mode for the dispatch board", "Dispatchers want a dark theme for night shifts.")
+        self.assertEqual(self.find("Dark mode for the dispatch board"), ["page-3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Tests for incremental mirror runs and planning them without writing snapshots (dry runs)."""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notion_client
+from notion_client import DATABASES, create_page, update_page, title_property
+from notion_mirror import mirror_database, load_state, load_snapshot, snapshot_path
+from notion_standin import StandinServer
+
+
+class MirrorPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandinServer("127.0.0.1", 0).start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(setattr, notion_client, "API_BASE", notion_client.API_BASE)
+        notion_client.API_BASE = self.server.base_url
+        self.addCleanup(notion_client.set_rate_limit, notion_client.RATE_LIMIT)
+        notion_client.set_rate_limit(0)
+        self.addCleanup(notion_client.set_read_cache, notion_client.READ_CACHE)
+        notion_client.set_read_cache("off")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.mirror_dir = tmp.name
+
+        self.queries = []
+        transport = notion_client.get_transport()
+
+        def recording(method, endpoint, headers, payload, timeout=None):
+            if endpoint.endswith("/query"):
+                self.queries.append(json.loads(payload or b"{}"))
+            return transport(method, endpoint, headers, payload, timeout=timeout)
+
+        self.addCleanup(notion_client.set_transport, notion_client.set_transport(recording))
+
+    def test_plan_uses_the_existing_watermark_and_writes_nothing(self):
+        for title in ("One", "Two"):
+            create_page("token", DATABASES["tickets"], {"Name": title_property(title)})
+        mirror_database("token", "tickets", mirror_dir=self.mirror_dir)
+        state = load_state("tickets", self.mirror_dir)
+        path = snapshot_path("tickets", "jsonl", self.mirror_dir)
+        with open(path, 'rb') as f:
+            snapshot = f.read()
+
+        self.queries.clear()
+        result = mirror_database("token", "tickets", mirror_dir=self.mirror_dir, write=False)
+
+        self.assertEqual(result["mode"], "incremental")
+        self.assertEqual(result["pages"], 2)
+        self.assertEqual(self.queries[0]["filter"]["last_edited_time"]["on_or_after"], state["watermark"])
+        self.assertEqual(load_state("tickets", self.mirror_dir), state)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), snapshot)
+
+    def test_incremental_run_fetches_from_the_watermark_and_merges(self):
+        old, unchanged, latest = (
+            create_page("token", DATABASES["tickets"], {"Name": title_property(title)})["id"]
+            for title in ("Old", "Unchanged", "Latest")
+        )
+        edited = {old: "2026-01-01T00:00:00.000Z", unchanged: "2026-01-01T00:00:00.000Z", latest: "2026-01-02T00:00:00.000Z"}
+        for page_id, timestamp in edited.items():
+            self.server.store.pages[page_id]["last_edited_time"] = timestamp
+        first = mirror_database("token", "tickets", mirror_dir=self.mirror_dir)
+        self.assertEqual((first["mode"], first["fetched"], first["watermark"]), ("full", 3, edited[latest]))
+
+        update_page("token", old, {"Name": title_property("Renamed")})
+        created = create_page("token", DATABASES["tickets"], {"Name": title_property("New")})["id"]
+        second = mirror_database("token", "tickets", mirror_dir=self.mirror_dir)
+
+        # The boundary page is re-fetched; the unchanged page is not
+        self.assertEqual((second["mode"], second["fetched"], second["pages"]), ("incremental", 3, 4))
+        self.assertGreater(second["watermark"], edited[latest])
+        titles = {record["id"]: record["properties"]["Name"] for record in load_snapshot("tickets", mirror_dir=self.mirror_dir)}
+        self.assertEqual(titles, {old: "Renamed", unchanged: "Unchanged", latest: "Latest", created: "New"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Tests for running batch plans as a dependency graph."""
+
+import os
+import sys
+import json
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notion_client
+from notion_client import list_children
+from notion_plan import load_plan, run_plan
+from notion_standin import StandinServer
+
+
+class RunPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandinServer("127.0.0.1", 0).start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(setattr, notion_client, "API_BASE", notion_client.API_BASE)
+        notion_client.API_BASE = self.server.base_url
+        self.addCleanup(notion_client.set_rate_limit, notion_client.RATE_LIMIT)
+        notion_client.set_rate_limit(0)
+        self.addCleanup(notion_client.set_read_cache, notion_client.READ_CACHE)
+        notion_client.set_read_cache("off")
+        environ = mock.patch.dict(os.environ, {"NOTION_TOKEN": "token"})
+        environ.start()
+        self.addCleanup(environ.stop)
+        self.parent = self.server.store.create_page({"parent": {"page_id": "root"}, "properties": {}})["id"]
+
+    def run_steps(self, *steps: dict) -> dict:
+        text = "\n".join(json.dumps(step) for step in steps)
+        return run_plan(load_plan("plan.jsonl", text=text))
+
+    def test_steps_behind_a_failed_step_are_skipped(self):
+        results = self.run_steps(
+            {"id": "spec", "op": "create_page", "parent_id": self.parent, "name": "Spec"},
+            {"id": "broken", "op": "append", "page_id": "00000000-0000-0000-0000-000000000000", "body": "Lost"},
+            {"id": "link", "op": "append", "page_id": "${broken.page_id}", "body": "Never sent"},
+            {"id": "later", "op": "append", "page_id": "${spec.page_id}", "body": "Also skipped", "after": ["link"]},
+            {"id": "notes", "op": "append", "page_id": "${spec.page_id}", "body": "Tracked"},
+        )
+
+        statuses = {name: result["status"] for name, result in results.items()}
+        self.assertEqual(statuses, {"spec": "success", "broken": "error", "link": "skipped", "later": "skipped", "notes": "success"})
+        self.assertIn("broken", results["link"]["error"])
+        self.assertIn("link", results["later"]["error"])
+        texts = [block["paragraph"]["rich_text"][0]["text"]["content"] for block in list_children("token", results["spec"]["page_id"])]
+        self.assertEqual(texts, ["Tracked"])
+
+    def test_references_resolve_to_earlier_results(self):
+        results = self.run_steps(
+            {"id": "spec", "op": "create_page", "parent_id": self.parent, "name": "Spec"},
+            {"id": "child", "op": "create_page", "parent_id": "${spec.page_id}", "name": "Child", "body": "See ${spec.url}"},
+        )
+        self.assertEqual(results["child"]["status"], "success")
+        body = list_children("token", results["child"]["page_id"])[0]["paragraph"]["rich_text"][0]["text"]["content"]
+        self.assertEqual(body, f"See {results['spec']['url']}")
+
+    def test_cycles_are_rejected_before_running(self):
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            self.run_steps(
+                {"id": "a", "op": "append", "page_id": self.parent, "body": "A", "after": "b"},
+                {"id": "b", "op": "append", "page_id": self.parent, "body": "B", "after": "a"},
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
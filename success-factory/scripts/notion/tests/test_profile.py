@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Tests for --profile=cpu covering worker threads."""
+
+import io
+import os
+import sys
+import pstats
+import tempfile
+import contextlib
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion_client import WriteScheduler
+from notion_profile import Profiler
+
+
+def convert_in_worker(count: int) -> int:
+    return sum(len(str(i)) for i in range(count))
+
+
+class CpuProfileThreadsTest(unittest.TestCase):
+
+    def test_worker_thread_functions_are_profiled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = Profiler("cpu", os.path.join(tmp, "cpu.pstats"))
+            profiler.start()
+            scheduler = WriteScheduler(workers=2)
+            futures = [scheduler.submit(f"page-{i}", convert_in_worker, 1000) for i in range(4)]
+            for future in futures:
+                future.result()
+            scheduler.close()
+            with contextlib.redirect_stderr(io.StringIO()):
+                profiler.report()
+            stats = pstats.Stats(profiler.output)
+
+        calls = {name: stat[1] for (_, _, name), stat in stats.stats.items()}
+        self.assertEqual(calls.get("convert_in_worker"), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
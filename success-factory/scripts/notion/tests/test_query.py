@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Tests for paginated database queries with background prefetch."""
+
+import os
+import sys
+import json
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notion_client
+from notion_client import DATABASES, create_page, query_database, title_property
+from notion_standin import StandinServer
+
+
+class QueryPrefetchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandinServer("127.0.0.1", 0).start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(setattr, notion_client, "API_BASE", notion_client.API_BASE)
+        notion_client.API_BASE = self.server.base_url
+        self.addCleanup(notion_client.set_rate_limit, notion_client.RATE_LIMIT)
+        notion_client.set_rate_limit(0)
+        self.addCleanup(notion_client.set_read_cache, notion_client.READ_CACHE)
+        notion_client.set_read_cache("off")
+
+        self.titles = [f"Ticket {i}" for i in range(5)]
+        for title in self.titles:
+            create_page("token", DATABASES["tickets"], {"Name": title_property(title)})
+
+        self.cursors = []
+        self.fetched = threading.Event()
+        transport = notion_client.get_transport()
+
+        def recording(method, endpoint, headers, payload, timeout=None):
+            result = transport(method, endpoint, headers, payload, timeout=timeout)
+            if endpoint.endswith("/query"):
+                self.cursors.append(json.loads(payload).get("start_cursor"))
+                if len(self.cursors) > 1:
+                    self.fetched.set()
+            return result
+
+        self.addCleanup(notion_client.set_transport, notion_client.set_transport(recording))
+
+    def titles_of(self, pages) -> list:
+        return [page["properties"]["Name"]["title"][0]["plain_text"] for page in pages]
+
+    def test_prefetch_returns_every_page_in_order(self):
+        for prefetch in (True, False):
+            with self.subTest(prefetch=prefetch):
+                self.cursors.clear()
+                pages = list(query_database("token", DATABASES["tickets"], page_size=2, prefetch=prefetch))
+                self.assertEqual(self.titles_of(pages), self.titles)
+                self.assertEqual(len(self.cursors), 3)
+                self.assertIsNone(self.cursors[0])
+
+    def test_next_page_is_fetched_while_the_caller_processes_the_current_one(self):
+        pages = query_database("token", DATABASES["tickets"], page_size=2)
+        next(pages)
+        self.assertTrue(self.fetched.wait(5))
+        pages.close()
+
+    def test_without_prefetch_an_early_stop_fetches_one_page(self):
+        pages = query_database("token", DATABASES["tickets"], page_size=2, prefetch=False)
+        next(pages)
+        pages.close()
+        self.assertEqual(self.cursors, [None])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Tests for the read cache and its invalidation by our own writes."""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notion_client
+from notion_client import DATABASES, append_blocks, create_page, list_children, markdown_to_blocks, query_database, title_property
+from notion_readcache import ResponseCache, request_tags
+from notion_standin import StandinServer
+
+PAGE = "1429989f-e8ac-4eff-bc8f-57f56486db54"
+BLOCK = "22c2b3c1-7f4e-4c6d-9d9f-5a0e5f0e4b11"
+
+
+class RequestTagsTest(unittest.TestCase):
+
+    def test_tags_cover_endpoint_ids_and_returned_objects(self):
+        response = {"results": [{"id": BLOCK, "parent": {"type": "page_id", "page_id": PAGE}}]}
+        tags = request_tags(f"/blocks/{PAGE.upper()}/children?page_size=100", None, response)
+        self.assertEqual(tags, {PAGE.replace("-", ""), BLOCK.replace("-", "")})
+
+    def test_write_tags_include_the_parent_in_the_body(self):
+        tags = request_tags("/pages", {"parent": {"database_id": PAGE}}, None)
+        self.assertEqual(tags, {PAGE.replace("-", "")})
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def test_invalidating_a_tag_drops_only_its_responses(self):
+        cache = ResponseCache()
+        cache.put("children", b"[1]", {"page", "block"})
+        cache.put("other", b"[2]", {"other"})
+        cache.invalidate({"block"})
+        self.assertIsNone(cache.get("children"))
+        self.assertEqual(cache.get("other"), b"[2]")
+        self.assertEqual(cache.invalidated, 1)
+
+    def test_responses_expire_after_the_ttl(self):
+        cache = ResponseCache(ttl=0)
+        cache.put("children", b"[1]", {"page"})
+        self.assertIsNone(cache.get("children"))
+
+    def test_a_read_overtaken_by_a_write_is_not_cached(self):
+        cache = ResponseCache()
+        generation = cache.generation()
+        cache.invalidate({"page"})
+        cache.put("children", b"[1]", {"page"}, generation)
+        self.assertIsNone(cache.get("children"))
+
+    def test_disk_tier_is_shared_and_invalidated_across_caches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "responses.db")
+            writer, reader = ResponseCache(path=path), ResponseCache(path=path)
+            writer.put("children", b"[1]", {"page"})
+            self.assertEqual(reader.get("children"), b"[1]")
+            writer.invalidate({"page"})
+            self.assertIsNone(ResponseCache(path=path).get("children"))
+
+
+class CachedRequestTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandinServer("127.0.0.1", 0).start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(setattr, notion_client, "API_BASE", notion_client.API_BASE)
+        notion_client.API_BASE = self.server.base_url
+        self.addCleanup(notion_client.set_rate_limit, notion_client.RATE_LIMIT)
+        notion_client.set_rate_limit(0)
+        self.addCleanup(notion_client.set_read_cache, notion_client.READ_CACHE)
+        notion_client.set_read_cache("memory")
+
+        self.reads = []
+        transport = notion_client.get_transport()
+
+        def recording(method, endpoint, headers, payload, timeout=None):
+            if method == "GET" or endpoint.endswith("/query"):
+                self.reads.append(endpoint)
+            return transport(method, endpoint, headers, payload, timeout=timeout)
+
+        self.addCleanup(notion_client.set_transport, notion_client.set_transport(recording))
+
+    def test_appending_refetches_the_page_children(self):
+        page = self.server.store.create_page({"parent": {"page_id": "root"}, "properties": {}})["id"]
+        append_blocks("token", page, markdown_to_blocks("First"))
+        self.assertEqual(len(list_children("token", page)), 1)
+        self.assertEqual(len(list_children("token", page)), 1)
+        self.assertEqual(len(self.reads), 1)
+
+        append_blocks("token", page, markdown_to_blocks("Second"))
+        self.assertEqual(len(list_children("token", page)), 2)
+        self.assertEqual(len(self.reads), 2)
+
+    def test_creating_a_page_drops_the_database_queries(self):
+        self.assertEqual(list(query_database("token", DATABASES["tickets"])), [])
+        self.assertEqual(list(query_database("token", DATABASES["tickets"])), [])
+        self.assertEqual(len(self.reads), 1)
+
+        create_page("token", DATABASES["tickets"], {"Name": title_property("New")})
+        self.assertEqual(len(list(query_database("token", DATABASES["tickets"]))), 1)
+        self.assertEqual(len(self.reads), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Tests for per-key ordering and fail-through in WriteScheduler."""
+
+import os
+import sys
+import time
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notion_client import WriteScheduler
+from notion_priority import current_lane, priority_lane
+
+
+class WriteSchedulerTest(unittest.TestCase):
+
+    def test_jobs_run_in_order_per_key_and_never_overlap(self):
+        started = {"a": [], "b": []}
+        running = {"a": 0, "b": 0}
+        overlaps = []
+        lock = threading.Lock()
+
+        def job(key: str, index: int):
+            with lock:
+                running[key] += 1
+                overlaps.append(running[key] > 1)
+                started[key].append(index)
+            time.sleep(0.002)
+            with lock:
+                running[key] -= 1
+
+        with WriteScheduler(workers=4) as scheduler:
+            for index in range(20):
+                for key in started:
+                    scheduler.submit(key, job, key, index)
+
+        self.assertEqual(started, {"a": list(range(20)), "b": list(range(20))})
+        self.assertFalse(any(overlaps))
+
+    def test_different_keys_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        with WriteScheduler(workers=2) as scheduler:
+            futures = [scheduler.submit(key, barrier.wait) for key in ("a", "b")]
+        self.assertEqual(sorted(future.result() for future in futures), [0, 1])
+
+    def test_a_failed_job_fails_the_rest_of_its_key_only(self):
+        gate = threading.Event()
+
+        def fail():
+            gate.wait(5)
+            raise RuntimeError("append rejected")
+
+        with WriteScheduler(workers=2) as scheduler:
+            failing = scheduler.submit("a", fail)
+            skipped = [scheduler.submit("a", lambda: "written") for _ in range(3)]
+            other = scheduler.submit("b", lambda: "written")
+            gate.set()
+            skipped[-1].exception(5)
+            # The key takes new jobs once its failed queue has drained
+            retried = scheduler.submit("a", lambda: "written")
+
+        self.assertRaisesRegex(RuntimeError, "append rejected", failing.result)
+        for future in skipped:
+            self.assertRaisesRegex(RuntimeError, "Skipped", future.result)
+        self.assertEqual((other.result(), retried.result()), ("written", "written"))
+
+    def test_jobs_run_in_the_lane_they_were_submitted_from(self):
+        with WriteScheduler() as scheduler:
+            with priority_lane("bulk"):
+                bulk = scheduler.submit("a", current_lane)
+            with priority_lane("interactive"):
+                interactive = scheduler.submit("b", current_lane)
+        self.assertEqual((bulk.result(), interactive.result()), ("bulk", "interactive"))
+
+    def test_closed_scheduler_rejects_new_jobs(self):
+        scheduler = WriteScheduler()
+        scheduler.close()
+        self.assertRaises(RuntimeError, scheduler.submit, "a", print)
+
+
+if __name__ == "__main__":
+    unittest.main()
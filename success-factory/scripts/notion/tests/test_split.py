@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Tests for splitting long page bodies into child pages at H2 headings."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notion_client
+from notion_client import DATABASES, create_page, list_children, markdown_to_blocks, split_sections, title_property
+from notion_standin import StandinServer
+
+
+def block_text(block: dict) -> str:
+    if block["type"] == "child_page":
+        return f"[{block['child_page']['title']}]"
+    return "".join(part["text"]["content"] for part in block[block["type"]]["rich_text"])
+
+
+class SplitSectionsTest(unittest.TestCase):
+
+    def test_blocks_are_grouped_under_their_h2(self):
+        intro, sections = split_sections(markdown_to_blocks("Intro\n\n## One\n\nA\n\n### Detail\n\nB\n\n##  \n\nC"))
+        self.assertEqual([block_text(block) for block in intro], ["Intro"])
+        self.assertEqual(
+            [(title, [block_text(block) for block in blocks]) for title, blocks in sections],
+            [("One", ["A", "Detail", "B"]), ("Untitled", ["C"])],
+        )
+
+
+class SplitUploadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandinServer("127.0.0.1", 0).start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(setattr, notion_client, "API_BASE", notion_client.API_BASE)
+        notion_client.API_BASE = self.server.base_url
+        self.addCleanup(notion_client.set_rate_limit, notion_client.RATE_LIMIT)
+        notion_client.set_rate_limit(0)
+        self.addCleanup(notion_client.set_read_cache, notion_client.READ_CACHE)
+        notion_client.set_read_cache("off")
+
+    def paragraphs(self, prefix: str, count: int) -> list:
+        return [f"{prefix} {i}" for i in range(count)]
+
+    def test_sections_become_child_pages_in_document_order(self):
+        # Over 100 blocks in the intro and in one section, so both need appends
+        intro = self.paragraphs("Intro", 120)
+        sections = [(f"Section {n}", self.paragraphs(f"S{n}", 130 if n == 2 else 5)) for n in range(1, 5)]
+        markdown = "\n\n".join(intro + [f"## {title}\n\n" + "\n\n".join(body) for title, body in sections])
+
+        result = create_page(
+            "token", DATABASES["documents"], {"Name": title_property("Spec")}, markdown_to_blocks(markdown), split_over=50,
+        )
+
+        children = [block_text(block) for block in list_children("token", result["id"])]
+        self.assertEqual(children, intro + [f"[{title}]" for title, _ in sections])
+        self.assertEqual(len(result["subpages"]), len(sections))
+        for subpage, (title, body) in zip(result["subpages"], sections):
+            with self.subTest(section=title):
+                self.assertEqual([block_text(block) for block in list_children("token", subpage["id"])], body)
+
+    def test_short_bodies_are_not_split(self):
+        blocks = markdown_to_blocks("Intro\n\n## One\n\nA")
+        result = create_page("token", DATABASES["documents"], {"Name": title_property("Short")}, blocks, split_over=50)
+        self.assertNotIn("subpages", result)
+        self.assertEqual([block_text(block) for block in list_children("token", result["id"])], ["Intro", "One", "A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
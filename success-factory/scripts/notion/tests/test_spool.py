@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Tests for --offline page creation through the spool."""
+
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+import subprocess
+import unittest
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import notion_client
+from notion_client import DATABASES, markdown_to_blocks, title_property
+from notion_spool import Spool, flush_spool
+from notion_standin import StandinServer
+from notion_tokens import TokenPool
+
+# Nothing listens on the discard port, so any request would fail with URLError
+UNREACHABLE = "http://127.0.0.1:9/v1"
+
+
+class OfflineFeedbackTest(unittest.TestCase):
+
+    def test_offline_feedback_is_spooled_without_calling_notion(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, NOTION_CACHE_DIR=tmp, NOTION_API_BASE=UNREACHABLE, NOTION_TOKEN="offline")
+            result = subprocess.run(
+                [
+                    sys.executable, os.path.join(SCRIPTS_DIR, "create-feedback.py"),
+                    "--title", "Offline feedback", "--submitted-by", "Nate", "--offline", "--skip-duplicate-check",
+                ],
+                env=env, capture_output=True, text=True, timeout=60,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            output = json.loads(result.stdout)
+            self.assertEqual(output["status"], "spooled")
+            self.assertTrue(os.path.exists(os.path.join(tmp, "spool.db")))
+
+
+class RetryFailedTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.spool = Spool(os.path.join(tmp.name, "spool.db"))
+
+    def add(self, title: str, status: str, updated: str = None) -> int:
+        item_id = self.spool.add({"parent": {"database_id": DATABASES["tasks"]}, "properties": {"Name": title_property(title)}})
+        conn = sqlite3.connect(self.spool.path)
+        conn.execute("UPDATE spool SET status = ?, updated = COALESCE(?, updated) WHERE id = ?", (status, updated, item_id))
+        conn.commit()
+        conn.close()
+        return item_id
+
+    def test_retry_failed_skips_incomplete_and_running_items(self):
+        pending = self.add("Pending", "pending")
+        failed = self.add("Failed", "failed")
+        self.add("Incomplete", "incomplete")
+        self.add("Flushing now", "flushing")
+        stale = self.add("Interrupted", "flushing", "2000-01-01T00:00:00+00:00")
+
+        claimed = [item["id"] for item in self.spool.claim(retry_failed=True)]
+        self.assertEqual(claimed, [pending, failed, stale])
+
+    def test_created_but_incomplete_pages_are_never_uploaded_again(self):
+        server = StandinServer("127.0.0.1", 0).start()
+        self.addCleanup(server.stop)
+        self.addCleanup(setattr, notion_client, "API_BASE", notion_client.API_BASE)
+        notion_client.API_BASE = server.base_url
+        self.addCleanup(notion_client.set_rate_limit, notion_client.RATE_LIMIT)
+        notion_client.set_rate_limit(0)
+
+        # The stand-in rejects the second batch: rich text over 2,000 characters
+        blocks = markdown_to_blocks("\n\n".join(f"Paragraph {i}" for i in range(120)))
+        blocks[110]["paragraph"]["rich_text"][0]["text"]["content"] = "x" * 2001
+        item_id = self.spool.add({
+            "parent": {"database_id": DATABASES["documents"]},
+            "properties": {"Name": title_property("Half uploaded")},
+            "blocks": blocks,
+        })
+        pool = TokenPool(["token"])
+
+        [result] = flush_spool(self.spool, pool)
+        self.assertEqual(result["status"], "incomplete")
+        [item] = self.spool.items()
+        self.assertEqual((item["id"], item["status"], item["page_id"]), (item_id, "incomplete", result["page_id"]))
+
+        self.assertEqual(flush_spool(self.spool, pool, retry_failed=True), [])
+        self.assertEqual(len(server.store.database_pages[DATABASES["documents"]]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Tests for deadlines reaching the threads that send requests."""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notion_client
+import notion_timeouts
+from notion_client import DATABASES, create_page, delete_children, query_database, update_page, markdown_to_blocks, title_property
+from notion_standin import StandinServer, StandinConfig
+from notion_timeouts import DeadlineExceeded, request_deadline
+
+
+class DeadlinePropagationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = StandinConfig()
+        self.server = StandinServer("127.0.0.1", 0, self.config).start()
+        # Requests cut off by a deadline leave broken pipes behind; don't log them
+        self.server.handle_error = lambda request, client_address: None
+        self.addCleanup(self.server.stop)
+        self.addCleanup(setattr, notion_client, "API_BASE", notion_client.API_BASE)
+        notion_client.API_BASE = self.server.base_url
+        self.addCleanup(notion_client.set_rate_limit, notion_client.RATE_LIMIT)
+        notion_client.set_rate_limit(0)
+        self.addCleanup(notion_client.set_read_cache, notion_client.READ_CACHE)
+        notion_client.set_read_cache("off")
+
+    def test_replacing_blocks_stops_deleting_at_the_deadline(self):
+        blocks = markdown_to_blocks("\n\n".join(f"Paragraph {i}" for i in range(60)))
+        page = create_page("token", DATABASES["documents"], {"Name": title_property("Deadline")}, blocks)
+        self.config.latency_ms = 100
+
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            update_page("token", page["id"], blocks=blocks[:1], replace_blocks=True, deadline=0.5)
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_delete_workers_inherit_the_deadline(self):
+        blocks = markdown_to_blocks("\n\n".join(f"Paragraph {i}" for i in range(60)))
+        page = create_page("token", DATABASES["documents"], {"Name": title_property("Fan-out")}, blocks)
+        self.config.latency_ms = 100
+
+        start = time.monotonic()
+        with request_deadline(0.5):
+            result = delete_children("token", page["id"])
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertLess(result["deleted"], 60)
+        self.assertTrue(any("Deadline exceeded" in error for error in result["failed"].values()))
+
+    def test_paged_query_prefetcher_inherits_the_deadline(self):
+        for i in range(30):
+            create_page("token", DATABASES["tasks"], {"Name": title_property(f"Task {i}")})
+        self.config.latency_ms = 100
+
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            with request_deadline(0.5):
+                for _ in query_database("token", DATABASES["tasks"], page_size=1):
+                    pass
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_hedged_attempts_get_the_deadline_timeout(self):
+        timeouts = []
+        transport = notion_client.get_transport()
+
+        def slow(method, endpoint, headers, payload, timeout=None):
+            timeouts.append(timeout)
+            time.sleep(0.2)
+            return transport(method, endpoint, headers, payload, timeout=timeout)
+
+        self.addCleanup(notion_client.set_transport, notion_client.set_transport(slow))
+        self.addCleanup(notion_timeouts.set_hedging, notion_timeouts._hedging)
+        notion_timeouts.set_hedging(True)
+        self.addCleanup(setattr, notion_timeouts, "HEDGE_AFTER", notion_timeouts.HEDGE_AFTER)
+        notion_timeouts.HEDGE_AFTER = 0.05
+
+        with request_deadline(5):
+            notion_client.notion_request("GET", "/users", "token")
+        self.assertEqual(len(timeouts), 2)
+        self.assertTrue(all(timeout <= 5 for timeout in timeouts))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Tests for syncing markdown trees with content hashes."""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notion_client
+from notion_client import list_children
+from notion_standin import StandinServer
+from notion_tokens import TokenPool
+from notion_tree import sync_tree
+
+
+class TreeSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StandinServer("127.0.0.1", 0).start()
+        self.addCleanup(self.server.stop)
+        self.addCleanup(setattr, notion_client, "API_BASE", notion_client.API_BASE)
+        notion_client.API_BASE = self.server.base_url
+        self.addCleanup(notion_client.set_rate_limit, notion_client.RATE_LIMIT)
+        notion_client.set_rate_limit(0)
+        self.addCleanup(notion_client.set_read_cache, notion_client.READ_CACHE)
+        notion_client.set_read_cache("off")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = os.path.join(tmp.name, "knowledge")
+        self.state_file = os.path.join(tmp.name, "state.json")
+        self.parent = self.server.store.create_page({"parent": {"page_id": "root"}, "properties": {}})["id"]
+
+        self.write("README.md", "# Knowledge\n\nStart here")
+        self.write("voice.md", "# Voice\n\nFriendly")
+        self.write("brand/colors.md", "Navy and white")
+
+        self.writes = []
+        transport = notion_client.get_transport()
+
+        def recording(method, endpoint, headers, payload, timeout=None):
+            if method != "GET":
+                self.writes.append((method, endpoint))
+            return transport(method, endpoint, headers, payload, timeout=timeout)
+
+        self.addCleanup(notion_client.set_transport, notion_client.set_transport(recording))
+
+    def write(self, path: str, content: str):
+        path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def sync(self) -> dict:
+        self.writes.clear()
+        results = sync_tree(TokenPool(["token"]), [self.root], self.parent, state_file=self.state_file)
+        return {result["path"]: result for result in results}
+
+    def text_of(self, page_id: str) -> list:
+        return [
+            "".join(part["text"]["content"] for part in block[block["type"]].get("rich_text", []))
+            for block in list_children("token", page_id)
+        ]
+
+    def test_unchanged_files_make_no_writes(self):
+        first = self.sync()
+        self.assertEqual({result["status"] for result in first.values()}, {"created"})
+        second = self.sync()
+        self.assertEqual({result["status"] for result in second.values()}, {"unchanged"})
+        self.assertEqual(self.writes, [])
+
+    def test_only_changed_files_are_rewritten(self):
+        first = self.sync()
+        self.write("voice.md", "# Tone of voice\n\nWarm and direct")
+        second = self.sync()
+
+        voice = "knowledge/voice.md"
+        self.assertEqual({path: result["status"] for path, result in second.items() if path != voice}, {
+            "knowledge": "unchanged", "knowledge/README.md": "unchanged",
+            "knowledge/brand": "unchanged", "knowledge/brand/colors.md": "unchanged",
+        })
+        self.assertEqual(second[voice]["status"], "updated")
+        self.assertEqual(second[voice]["page_id"], first[voice]["page_id"])
+        self.assertEqual(self.text_of(second[voice]["page_id"]), ["Warm and direct"])
+        title = self.server.store.pages[second[voice]["page_id"]]["properties"]["title"]["title"]
+        self.assertEqual(title[0]["text"]["content"], "Tone of voice")
+        # No page other than the edited one was created or touched
+        self.assertEqual([write for write in self.writes if write[1].startswith("/pages")], [("PATCH", f"/pages/{first[voice]['page_id']}")])
+
+    def test_removed_files_and_emptied_directories_are_archived(self):
+        first = self.sync()
+        os.remove(os.path.join(self.root, "voice.md"))
+        os.remove(os.path.join(self.root, "brand", "colors.md"))
+        second = self.sync()
+        # Archiving the directory page archives the file page under it
+        self.assertEqual(second["knowledge/voice.md"]["status"], "archived")
+        self.assertEqual(second["knowledge/brand"]["status"], "archived")
+        self.assertNotIn("knowledge/brand/colors.md", second)
+        for path in ("knowledge/voice.md", "knowledge/brand"):
+            self.assertTrue(self.server.store.pages[first[path]["page_id"]]["archived"])
+        self.assertEqual(self.sync(), {
+            "knowledge": dict(second["knowledge"], status="unchanged"),
+            "knowledge/README.md": dict(second["knowledge/README.md"], status="unchanged"),
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Tests for the cached user directory when Notion can't be reached."""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import notion_client
+import notion_users
+
+# Nothing listens on the discard port, so every request fails with URLError
+UNREACHABLE = "http://127.0.0.1:9/v1"
+
+
+class UnreachableUserDirectoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for module, name, value in (
+            (notion_users, "USERS_CACHE_PATH", os.path.join(self.tmp.name, "notion-users.json")),
+            (notion_client, "API_BASE", UNREACHABLE),
+        ):
+            self.addCleanup(setattr, module, name, getattr(module, name))
+            setattr(module, name, value)
+        notion_client.set_rate_limit(0)
+
+    def write_cache(self, fetched_at: float):
+        users = [{"id": "user-1", "name": "Nate Moovs", "email": "nate@example.com"}]
+        with open(notion_users.USERS_CACHE_PATH, 'w') as f:
+            json.dump({"fetched_at": fetched_at, "users": users, "index": notion_users.build_user_index(users)}, f)
+
+    def test_stale_cache_is_used(self):
+        self.write_cache(time.time() - 2 * notion_users.USERS_CACHE_TTL)
+        directory = notion_users.load_user_directory("token")
+        self.assertEqual(directory["users"][0]["id"], "user-1")
+        self.assertEqual(notion_users.resolve_user("nate", "token"), "user-1")
+
+    def test_no_cache_resolves_to_none(self):
+        with self.assertRaises(OSError):
+            notion_users.load_user_directory("token")
+        self.assertIsNone(notion_users.resolve_user("Nate", "token"))
+
+    def test_aliases_resolve_without_the_directory(self):
+        self.assertEqual(notion_users.resolve_user("Pol", "token"), "34e46df4-06b4-46be-b7de-f7b7a66e13b0")
+
+    def test_offline_never_refreshes(self):
+        def no_network(*args, **kwargs):
+            raise AssertionError("Notion was called while offline")
+
+        self.addCleanup(notion_client.set_transport, notion_client.set_transport(no_network))
+        self.addCleanup(notion_client.set_spool, None, "off")
+        notion_client.set_spool(object(), "always")
+
+        self.assertIsNone(notion_users.resolve_user("Nate", "token"))
+        self.write_cache(time.time() - 2 * notion_users.USERS_CACHE_TTL)
+        self.assertEqual(notion_users.resolve_user("Nate Moovs", "token"), "user-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Analytics over mirrored ticket/task snapshots.
+
+Loads a snapshot written by mirror-databases.py into columnar arrays
+(dictionary-encoded categories, float timestamps) and computes:
+- Aging of open items by Stage (tasks: by Status)
+- Throughput per Team over a trailing window
+- Priority mix of open items
+- operator_id concentration of open tickets
+
+Usage:
+    # Tickets, table output
+    python3 ticket-analytics.py
+
+    # Tasks as JSON, 14-day throughput window
+    python3 ticket-analytics.py --database tasks --format json --window 14
+"""
+
+import sys
+import os
+import argparse
+import json
+import statistics
+from array import array
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import compress
+from typing import Optional, Dict, List, Any
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from notion_mirror import iter_snapshot_values, MIRROR_DIR, SNAPSHOT_FORMATS
+from notion_cli import add_common_arguments, apply_common_arguments
+
+
+# Property names per database: stage grouping, team, priority, status, operator
+COLUMN_MAP = {
+    "tickets": {"stage": "Stage", "team": "Team", "priority": "Priority", "status": "Status", "operator": "operator_id"},
+    "tasks": {"stage": "Status", "team": None, "priority": "Priority", "status": "Status", "operator": None},
+}
+
+CLOSED_STATUS = {"Done", "Archived", "Not doing anymore", "Completed"}
+CLOSED_STAGE = {"Deployed / Done"}
+NONE_LABEL = "(none)"
+
+
+class Columns:
+    """Columnar view of a snapshot: float timestamps plus dictionary-encoded categories."""
+
+    def __init__(self):
+        self.created = array('d')
+        self.edited = array('d')
+        self.codes = {}
+        self.labels = {}
+
+    def __len__(self) -> int:
+        return len(self.created)
+
+    def add_category(self, field: str, values: List[str]):
+        """Dictionary-encode a category column."""
+        lookup = {}
+        self.codes[field] = array('i', [lookup.setdefault(value, len(lookup)) for value in values])
+        self.labels[field] = list(lookup)
+
+    def decode(self, field: str, code: int) -> str:
+        return self.labels[field][code]
+
+
+@lru_cache(maxsize=None)
+def _epoch(timestamp: Optional[str]) -> float:
+    # Notion timestamps are minute-rounded, so the cache hit rate is high
+    if not timestamp:
+        return 0.0
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+
+
+def load_columns(rows, fields: List[str]) -> Columns:
+    """Load (created_time, last_edited_time, *values) rows into columns."""
+    created, edited, *values = list(zip(*rows)) or [()] * (len(fields) + 2)
+    columns = Columns()
+    columns.created = array('d', map(_epoch, created))
+    columns.edited = array('d', map(_epoch, edited))
+    for field, column in zip(fields, values):
+        columns.add_category(field, [value or NONE_LABEL for value in column])
+    return columns
+
+
+def _open_mask(columns: Columns) -> List[bool]:
+    """Mask of items that are neither closed by Status nor by Stage."""
+    closed_status = {code for code, label in enumerate(columns.labels["status"]) if label in CLOSED_STATUS}
+    closed_stage = {code for code, label in enumerate(columns.labels["stage"]) if label in CLOSED_STAGE}
+    return [
+        status not in closed_status and stage not in closed_stage
+        for status, stage in zip(columns.codes["status"], columns.codes["stage"])
+    ]
+
+
+def _mix(counts: Counter, total: int, labels: List[str]) -> List[Dict[str, Any]]:
+    return [
+        {"value": labels[code], "count": count, "share": round(count / total, 4) if total else 0.0}
+        for code, count in counts.most_common()
+    ]
+
+
+def aging_by_stage(columns: Columns, open_mask: List[bool], now: float) -> List[Dict[str, Any]]:
+    """Age in days of open items, grouped by stage."""
+    groups = defaultdict(list)
+    for stage, created in zip(compress(columns.codes["stage"], open_mask), compress(columns.created, open_mask)):
+        groups[stage].append((now - created) / 86400)
+
+    rows = []
+    for stage, ages in groups.items():
+        ages.sort()
+        rows.append({
+            "stage": columns.decode("stage", stage),
+            "open": len(ages),
+            "median_days": round(statistics.median(ages), 1),
+            "p90_days": round(ages[int(0.9 * (len(ages) - 1))], 1),
+            "max_days": round(ages[-1], 1),
+        })
+    return sorted(rows, key=lambda row: row["median_days"], reverse=True)
+
+
+def throughput_by_team(columns: Columns, open_mask: List[bool], now: float, window_days: int) -> List[Dict[str, Any]]:
+    """Items closed per team within the window.
+
+    Snapshots have no status history, so the close time is approximated by
+    last_edited_time of items that are now closed.
+    """
+    since = now - window_days * 86400
+    closed_recently = [not is_open and edited >= since for is_open, edited in zip(open_mask, columns.edited)]
+    counts = Counter(compress(columns.codes["team"], closed_recently))
+    total = sum(counts.values())
+    weeks = window_days / 7
+    return [
+        dict(row, per_week=round(row["count"] / weeks, 1))
+        for row in _mix(counts, total, columns.labels["team"])
+    ]
+
+
+def operator_concentration(columns: Columns, open_mask: List[bool], top: int) -> Dict[str, Any]:
+    """How concentrated open tickets are across operators (HHI and top-N share)."""
+    none_code = columns.labels["operator"].index(NONE_LABEL) if NONE_LABEL in columns.labels["operator"] else -1
+    counts = Counter(code for code in compress(columns.codes["operator"], open_mask) if code != none_code)
+    total = sum(counts.values())
+    shares = [count / total for count in counts.values()] if total else []
+    return {
+        "open_with_operator": total,
+        "operators": len(counts),
+        "hhi": round(sum(share * share for share in shares), 4),
+        "top_share": round(sum(sorted(shares, reverse=True)[:top]), 4),
+        "top": _mix(Counter(dict(counts.most_common(top))), total, columns.labels["operator"]),
+    }
+
+
+def analyze(columns: Columns, window_days: int = 30, top: int = 10, now: float = None) -> Dict[str, Any]:
+    """Compute all analytics for a loaded snapshot."""
+    now = now or datetime.now(timezone.utc).timestamp()
+    open_mask = _open_mask(columns)
+    open_count = sum(open_mask)
+
+    report = {
+        "total": len(columns),
+        "open": open_count,
+        "aging_by_stage": aging_by_stage(columns, open_mask, now),
+        "priority_mix": _mix(Counter(compress(columns.codes["priority"], open_mask)), open_count, columns.labels["priority"]),
+    }
+    if "team" in columns.codes:
+        report["throughput_by_team"] = throughput_by_team(columns, open_mask, now, window_days)
+    if "operator" in columns.codes:
+        report["operator_concentration"] = operator_concentration(columns, open_mask, top)
+    return report
+
+
+def _table(title: str, rows: List[Dict[str, Any]]) -> str:
+    if not rows:
+        return f"{title}\n  (no data)\n"
+    headers = list(rows[0])
+    widths = [max(len(str(h)), *(len(str(row[h])) for row in rows)) for h in headers]
+    lines = [title, "  " + "  ".join(str(h).ljust(w) for h, w in zip(headers, widths))]
+    for row in rows:
+        lines.append("  " + "  ".join(str(row[h]).ljust(w) for h, w in zip(headers, widths)))
+    return "\n".join(lines) + "\n"
+
+
+def format_table(report: Dict[str, Any]) -> str:
+    """Render a report as plain-text tables."""
+    sections = [f"Items: {report['total']} total, {report['open']} open\n"]
+    sections.append(_table("Aging of open items by stage", report["aging_by_stage"]))
+    sections.append(_table("Priority mix (open)", report["priority_mix"]))
+    if "throughput_by_team" in report:
+        sections.append(_table("Throughput by team", report["throughput_by_team"]))
+    if "operator_concentration" in report:
+        concentration = report["operator_concentration"]
+        sections.append(
+            f"Operator concentration (open): {concentration['open_with_operator']} tickets across "
+            f"{concentration['operators']} operators, HHI {concentration['hhi']}, "
+            f"top share {concentration['top_share']}\n"
+        )
+        sections.append(_table("Top operators", concentration["top"]))
+    return "\n".join(sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analytics over mirrored ticket/task snapshots",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Run mirror-databases.py first to create or refresh the snapshot.
+
+Examples:
+  %(prog)s
+  %(prog)s --database tasks --format json --window 14
+        """
+    )
+
+    parser.add_argument("--database", "-d", choices=list(COLUMN_MAP), default="tickets", help="Snapshot to analyze")
+    parser.add_argument("--format", "-f", choices=["table", "json"], default="table", help="Output format")
+    parser.add_argument("--snapshot-format", choices=SNAPSHOT_FORMATS, help="Snapshot format (default: last mirrored)")
+    parser.add_argument("--window", "-w", type=int, default=30, help="Throughput window in days (default: 30)")
+    parser.add_argument("--top", type=int, default=10, help="Operators to list (default: 10)")
+    parser.add_argument("--dir", default=MIRROR_DIR, help=f"Snapshot directory (default: {MIRROR_DIR})")
+
+    add_common_arguments(parser)
+    args = parser.parse_args()
+    apply_common_arguments(args)
+
+    fields = [field for field, prop in COLUMN_MAP[args.database].items() if prop]
+    properties = [COLUMN_MAP[args.database][field] for field in fields]
+    try:
+        rows = list(iter_snapshot_values(args.database, properties, args.snapshot_format, args.dir))
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    columns = load_columns(rows, fields)
+    report = analyze(columns, window_days=args.window, top=args.top)
+
+    if args.format == "json":
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_table(report))
+
+
+if __name__ == "__main__":
+    main()
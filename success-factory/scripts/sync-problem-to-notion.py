@@ -1,70 +1,54 @@
 #!/usr/bin/env python3
 """
-Sync a problem.md file to Notion Problem Docs database.
+Sync problem.md files to Notion Problem Docs database.
 
-Usage: python3 sync-problem-to-notion.py <path-to-problem.md>
+Usage: python3 sync-problem-to-notion.py <path-to-problem.md> [more.md ...] [--stats] [--metrics-file PATH] [--trace PATH]
 
 This script:
 1. Parses the problem.md file to extract title and metadata
 2. Checks if a page with the same title already exists in Notion
 3. Creates a new page or updates the existing one
 4. Syncs the markdown content as Notion blocks
+
+Several files are synced concurrently (one ordered write queue per file),
+printing one JSON result line per file.
+
+Each document is synced under a lock keyed by its title, shared with other
+processes: a second run syncing the same document (another hook run or
+terminal) waits instead of creating a duplicate page, and reuses the
+first run's result if the content is unchanged.
 """
 
 import sys
 import os
 import re
 import json
+import argparse
+import hashlib
 import subprocess
-import urllib.request
-import urllib.error
+import time
 from typing import Optional, Dict, List, Any
 
-# Notion database ID for Problem Docs
-PROBLEM_DOCS_DATABASE_ID = "2e88aeaa-3759-8063-ae62-e4005676ae46"
-
-
-def get_notion_token():
-    """Get Notion token from Claude config."""
-    config_path = os.path.expanduser("~/.claude.json")
-    try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        headers_str = config.get("mcpServers", {}).get("notion", {}).get("env", {}).get("OPENAPI_MCP_HEADERS", "{}")
-        headers = json.loads(headers_str)
-        auth = headers.get("Authorization", "")
-        if auth.startswith("Bearer "):
-            return auth[7:]
-    except Exception as e:
-        print(f"Warning: Could not read Notion token from claude config: {e}", file=sys.stderr)
-    return None
-
+# Shared Notion transport (auth, NOTION_API_BASE override)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "notion"))
 
-def notion_request(method: str, endpoint: str, token: str, data: dict = None) -> dict:
-    """Make a request to the Notion API."""
-    url = f"https://api.notion.com/v1{endpoint}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Notion-Version": "2022-06-28",
-        "Content-Type": "application/json"
-    }
+from notion_client import notion_request, append_blocks, delete_children, document_lock, WriteScheduler, NotionAPIError
+from notion_dryrun import is_dry_run
+from notion_cli import add_common_arguments, apply_common_arguments
+from notion_trace import span, traced
+from notion_tokens import load_token_pool
 
-    req = urllib.request.Request(url, method=method, headers=headers)
-    if data:
-        req.data = json.dumps(data).encode('utf-8')
+# Notion database ID for Problem Docs
+PROBLEM_DOCS_DATABASE_ID = "2e88aeaa-3759-8063-ae62-e4005676ae46"
 
-    try:
-        with urllib.request.urlopen(req) as response:
-            return json.loads(response.read().decode('utf-8'))
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8')
-        print(f"Notion API error: {e.code} - {error_body}", file=sys.stderr)
-        raise
+# Database queries can miss a page created this recently; trust the lock's record instead
+SEARCH_LAG = 300  # seconds
 
 
+@traced("parse_problem_md")
 def parse_problem_md(file_path: str) -> dict:
     """Parse a problem.md file and extract structured data."""
-    with open(file_path, 'r') as f:
+    with span("read_file", path=file_path), open(file_path, 'r') as f:
         content = f.read()
 
     # Extract title from first H1
@@ -153,6 +137,7 @@ def parse_inline_formatting(text: str) -> List[Dict[str, Any]]:
     return rich_text
 
 
+@traced("markdown_to_blocks")
 def markdown_to_notion_blocks(markdown: str) -> list:
     """Convert markdown to Notion block objects."""
     blocks = []
@@ -308,6 +293,7 @@ def markdown_to_notion_blocks(markdown: str) -> list:
     return blocks
 
 
+@traced("search")
 def search_existing_page(token: str, title: str) -> Optional[str]:
     """Search for an existing page with the same title."""
     try:
@@ -349,14 +335,12 @@ def create_notion_page(token: str, data: dict, blocks: list) -> dict:
         "children": blocks[:100]
     }
 
-    result = notion_request("POST", "/pages", token, page_data)
+    with span("create_page", blocks=len(blocks)):
+        result = notion_request("POST", "/pages", token, page_data)
 
-    # If there are more blocks, append them in batches
-    if len(blocks) > 100:
-        page_id = result["id"]
-        for i in range(100, len(blocks), 100):
-            batch = blocks[i:i+100]
-            notion_request("PATCH", f"/blocks/{page_id}/children", token, {"children": batch})
+        # If there are more blocks, append them in batches
+        if len(blocks) > 100:
+            append_blocks(token, result["id"], blocks[100:])
 
     return result
 
@@ -375,82 +359,138 @@ def update_notion_page(token: str, page_id: str, data: dict, blocks: list) -> di
         }
     }
 
-    result = notion_request("PATCH", f"/pages/{page_id}", token, page_data)
+    with span("update_properties"):
+        result = notion_request("PATCH", f"/pages/{page_id}", token, page_data)
 
-    # Get ALL existing blocks and delete them (handle pagination)
+    # Delete ALL existing blocks (concurrently, within the adaptive window)
     try:
-        has_more = True
-        while has_more:
-            existing_blocks = notion_request("GET", f"/blocks/{page_id}/children?page_size=100", token)
-            for block in existing_blocks.get("results", []):
-                try:
-                    notion_request("DELETE", f"/blocks/{block['id']}", token)
-                except Exception as e:
-                    print(f"Warning: Could not delete block {block['id']}: {e}", file=sys.stderr)
-            has_more = existing_blocks.get("has_more", False)
+        deletion = delete_children(token, page_id)
+        for block_id, error in deletion["failed"].items():
+            print(f"Warning: Could not delete block {block_id}: {error}", file=sys.stderr)
     except Exception as e:
         print(f"Warning: Could not delete existing blocks: {e}", file=sys.stderr)
 
     # Add new blocks
     if blocks:
-        for i in range(0, len(blocks), 100):
-            batch = blocks[i:i+100]
-            notion_request("PATCH", f"/blocks/{page_id}/children", token, {"children": batch})
+        append_blocks(token, page_id, blocks)
 
     return result
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: sync-problem-to-notion.py <path-to-problem.md>", file=sys.stderr)
-        sys.exit(1)
-
-    file_path = sys.argv[1]
-
-    if not os.path.exists(file_path):
-        print(f"Error: File not found: {file_path}", file=sys.stderr)
-        sys.exit(1)
-
-    if not file_path.endswith('.md'):
-        print(f"Skipping non-markdown file: {file_path}", file=sys.stderr)
-        sys.exit(0)
-
-    # Get Notion token
-    token = get_notion_token()
-    if not token:
-        print("Error: Could not get Notion token from ~/.claude.json", file=sys.stderr)
-        sys.exit(1)
-
-    print(f"Syncing {file_path} to Notion...", file=sys.stderr)
+def sync_file(token: str, file_path: str, log) -> dict:
+    """Sync one problem.md file, creating or updating its page."""
+    started = time.time()
+    log(f"Syncing {file_path} to Notion...")
 
     # Parse the problem file
     data = parse_problem_md(file_path)
-    print(f"  Title: {data['title']}", file=sys.stderr)
-    print(f"  Priority: {data['priority']}", file=sys.stderr)
+    log(f"  Title: {data['title']}")
+    log(f"  Priority: {data['priority']}")
 
     # Convert markdown to Notion blocks
     blocks = markdown_to_notion_blocks(data["content"])
-    print(f"  Blocks: {len(blocks)}", file=sys.stderr)
+    log(f"  Blocks: {len(blocks)}")
+
+    digest = hashlib.sha256(json.dumps([data["title"], data["priority"], data["content"]]).encode('utf-8')).hexdigest()
+    with document_lock(f"problem:{data['title']}") as lock:
+        if lock.waited > 1:
+            log(f"  Waited {lock.waited:.1f}s for another sync of this document")
+        result = None if is_dry_run() else lock.completed_since(started, digest)
+        if result:
+            log(f"  Already synced by a concurrent run: {result.get('url')}")
+            return dict(result, coalesced=True)
+
+        last = lock.state()
+        known_page_id = last.get("result", {}).get("page_id") if time.time() - last.get("finished", 0) < SEARCH_LAG else None
+        result = _sync_page(token, data, blocks, log, known_page_id)
+        if not is_dry_run():
+            lock.record(digest, result)
+    return result
 
+
+def _sync_page(token: str, data: dict, blocks: list, log, known_page_id: Optional[str] = None) -> dict:
+    """Create or update the page for parsed problem data."""
     # Check for existing page
     existing_page_id = search_existing_page(token, data["title"])
+    if not existing_page_id and known_page_id:
+        # Created by a concurrent run, but maybe not searchable yet
+        try:
+            if not notion_request("GET", f"/pages/{known_page_id}", token).get("archived"):
+                existing_page_id = known_page_id
+        except NotionAPIError:
+            pass
 
     if existing_page_id:
-        print(f"  Updating existing page: {existing_page_id}", file=sys.stderr)
+        log(f"  Updating existing page: {existing_page_id}")
         result = update_notion_page(token, existing_page_id, data, blocks)
-        print(f"  Updated: {result.get('url', 'success')}", file=sys.stderr)
+        log(f"  Updated: {result.get('url', 'success')}")
     else:
-        print(f"  Creating new page...", file=sys.stderr)
+        log(f"  Creating new page...")
         result = create_notion_page(token, data, blocks)
-        print(f"  Created: {result.get('url', 'success')}", file=sys.stderr)
+        log(f"  Created: {result.get('url', 'success')}")
 
-    # Output the result
-    print(json.dumps({
+    return {
         "status": "success",
         "page_id": result.get("id"),
         "url": result.get("url"),
         "title": data["title"]
-    }))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync problem.md files to the Notion Problem Docs database")
+    parser.add_argument("files", nargs="+", metavar="file", help="Path to problem.md (several files sync concurrently)")
+    add_common_arguments(parser)
+    args = parser.parse_args()
+    apply_common_arguments(args)
+
+    files = []
+    seen = set()
+    for file_path in args.files:
+        if not os.path.exists(file_path):
+            print(f"Error: File not found: {file_path}", file=sys.stderr)
+            sys.exit(1)
+        if not file_path.endswith('.md'):
+            print(f"Skipping non-markdown file: {file_path}", file=sys.stderr)
+            continue
+        if os.path.realpath(file_path) in seen:
+            continue
+        seen.add(os.path.realpath(file_path))
+        files.append(file_path)
+    if not files:
+        sys.exit(0)
+
+    # Get Notion token(s)
+    try:
+        pool = load_token_pool()
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    def logger(file_path: str):
+        prefix = f"[{os.path.relpath(file_path)}] " if len(files) > 1 else ""
+        return lambda message: print(f"{prefix}{message}", file=sys.stderr)
+
+    # One ordered queue per file; different files interleave
+    failed = False
+    with WriteScheduler() as scheduler:
+        futures = [
+            (file_path, scheduler.submit(file_path, sync_file, pool.token_for(file_path), file_path, logger(file_path)))
+            for file_path in files
+        ]
+        for file_path, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                failed = True
+                print(f"Error: {file_path}: {e}", file=sys.stderr)
+                result = {"status": "error", "file": file_path, "error": str(e)}
+
+            # Output the result
+            print(json.dumps(result), flush=True)
+
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":